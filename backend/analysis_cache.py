@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class AnalysisCache:
+    """Two-tier cache of Gemini analyses keyed on resume content hashes.
+
+    Tier one is an in-process LRU bounded by ``max_entries`` with a per-entry
+    TTL. Tier two is a Mongo collection whose ``created_at`` TTL index expires
+    documents after the same ``ttl_seconds``. Each document is stored once under
+    its normalized-text hash and carries every raw-bytes hash seen for it, so
+    byte-identical re-uploads skip PDF parsing entirely and re-exports of the
+    same resume still skip Gemini.
+    """
+
+    def __init__(self, collection, max_entries: int = 1024, ttl_seconds: int = 86400):
+        self.collection = collection
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def raw_key(sha256_hexdigest: str) -> str:
+        return "raw:" + sha256_hexdigest
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        normalized = _WHITESPACE_RE.sub(" ", text).strip().lower()
+        return "text:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    async def ensure_indexes(self):
+        try:
+            await self.collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+            await self.collection.create_index("raw_keys")
+        except Exception as e:
+            logger.error(f"Error creating analysis cache indexes: {e}")
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put_local(self, key: str, entry: Dict[str, Any], expires_at: Optional[float] = None):
+        if expires_at is None:
+            expires_at = time.monotonic() + self.ttl_seconds
+        self._entries[key] = (expires_at, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._get_local(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        query = {"raw_keys": key} if key.startswith("raw:") else {"_id": key}
+        try:
+            doc = await self.collection.find_one(query)
+        except Exception as e:
+            logger.warning(f"Analysis cache lookup failed: {e}")
+            doc = None
+
+        if doc is not None:
+            # The TTL monitor only runs periodically, so expired documents can linger
+            age = (datetime.utcnow() - doc["created_at"]).total_seconds()
+            if age < self.ttl_seconds:
+                entry = {"analysis": doc["analysis"], "resume_text": doc["resume_text"]}
+                self._put_local(key, entry, time.monotonic() + self.ttl_seconds - age)
+                self.mongo_hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    async def put(self, raw_key: str, text_key: str, entry: Dict[str, Any]):
+        self._put_local(raw_key, entry)
+        self._put_local(text_key, entry)
+        try:
+            await self.collection.update_one(
+                {"_id": text_key},
+                {
+                    "$set": {
+                        "analysis": entry["analysis"],
+                        "resume_text": entry["resume_text"],
+                        "created_at": datetime.utcnow(),
+                    },
+                    "$addToSet": {"raw_keys": raw_key},
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Analysis cache write failed: {e}")
+
+    async def link(self, raw_key: str, text_key: str, entry: Dict[str, Any]):
+        """Remember a new raw-bytes hash for an entry found by its text hash."""
+        self._put_local(raw_key, entry)
+        try:
+            await self.collection.update_one({"_id": text_key}, {"$addToSet": {"raw_keys": raw_key}})
+        except Exception as e:
+            logger.warning(f"Analysis cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
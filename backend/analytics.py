@@ -0,0 +1,454 @@
+import argparse
+import asyncio
+import calendar
+import heapq
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Rating histograms count analyses per whole rating point, 0 to 10
+RATING_BINS = 11
+SKETCHES = ("weaknesses", "suggestions", "skills", "internships")
+
+
+def _item_key(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()[:200]
+
+
+def _empty_ratings() -> Dict[str, Any]:
+    return {"analyses": 0, "rating_sum": 0.0, "counts": [0] * RATING_BINS}
+
+
+def _add_ratings(target: Dict[str, Any], ratings: Dict[str, Any]):
+    target["analyses"] += ratings["analyses"]
+    target["rating_sum"] += ratings["rating_sum"]
+    target["counts"] = [count + extra for count, extra in zip(target["counts"], ratings["counts"])]
+
+
+class SpaceSaving:
+    """Approximate top-k counts in ``capacity`` entries (Metwally et al.'s Space-Saving).
+
+    Each entry is ``[count, error, label]``: the true count of the item is
+    between ``count - error`` and ``count``. A new item that finds the
+    summary full replaces the entry with the lowest count and inherits that
+    count as its error. Summaries merge by adding counts, so rollups written
+    by several workers combine into one with the same guarantee.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries: Dict[str, List[Any]] = {}
+        # (count, key) pairs, some stale: entries only ever grow, so a stale pair is skipped on pop
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def offer(self, key: str, label: str, count: int = 1):
+        entry = self.entries.get(key)
+        if entry is None:
+            error = 0
+            if len(self.entries) >= self.capacity:
+                error = self._evict()
+            entry = self.entries[key] = [error, error, label]
+        entry[0] += count
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(entry[0], key) for key, entry in self.entries.items()]
+            heapq.heapify(self._heap)
+
+    def _evict(self) -> int:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == count:
+                del self.entries[key]
+                return count
+
+    def min_count(self) -> int:
+        """What an item missing from a full summary may have been counted, at most."""
+        if len(self.entries) < self.capacity:
+            return 0
+        return min(entry[0] for entry in self.entries.values())
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        mine, theirs = self.min_count(), other.min_count()
+        merged: Dict[str, List[Any]] = {}
+        for key in self.entries.keys() | other.entries.keys():
+            count, error, label = self.entries.get(key) or (mine, mine, None)
+            other_count, other_error, other_label = other.entries.get(key) or (theirs, theirs, None)
+            merged[key] = [count + other_count, error + other_error, label or other_label]
+        result = SpaceSaving(max(self.capacity, other.capacity))
+        result.entries = dict(heapq.nlargest(result.capacity, merged.items(), key=lambda item: item[1][0]))
+        result._heap = [(entry[0], key) for key, entry in result.entries.items()]
+        heapq.heapify(result._heap)
+        return result
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        best = heapq.nlargest(n, self.entries.items(), key=lambda item: item[1][0])
+        return [{"key": key, "item": label, "count": count, "error": error} for key, (count, error, label) in best]
+
+    def to_items(self) -> List[List[Any]]:
+        # A list rather than a dict: free-text keys may contain "." or start with "$"
+        return [[key, label, count, error] for key, (count, error, label) in self.entries.items()]
+
+    @classmethod
+    def from_items(cls, capacity: int, items: Iterable[List[Any]]) -> "SpaceSaving":
+        summary = cls(capacity)
+        for key, label, count, error in items:
+            summary.entries[key] = [count, error, label]
+        # A summary written with a larger capacity keeps its heaviest entries
+        if len(summary.entries) > capacity:
+            summary.entries = dict(heapq.nlargest(capacity, summary.entries.items(), key=lambda item: item[1][0]))
+        summary._heap = [(entry[0], key) for key, entry in summary.entries.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+
+class AnalyticsRollups:
+    """Dashboard rollups over ``resume_analyses``, kept up to date as analyses are stored.
+
+    ``record`` runs on the analysis write path and only touches memory: it
+    bumps the analysis's rating in an all-time histogram and in a
+    ``bucket_seconds`` time bucket, and offers its weaknesses, suggestions,
+    resume skills and recommended internships to one Space-Saving summary
+    each. A background task flushes the changes every ``flush_interval``
+    seconds: histogram deltas with ``$inc`` and summaries merged into the
+    stored ones under a version check, so several workers can share the
+    collection. It then reloads the last ``window_buckets`` buckets and the
+    summaries, so ``report`` reflects every worker's analyses and costs the
+    same however many are stored.
+
+    Rollup documents in ``collection``:
+
+    * ``totals``: the all-time rating histogram;
+    * ``ratings:<bucket start, epoch seconds>``: one time bucket's histogram;
+    * ``top:<name>``: a summary, with a ``version`` for optimistic updates;
+    * ``meta``: ``live_since``, when live counting began, and when a
+      backfill last ran (see ``backfill``).
+    """
+
+    def __init__(
+        self,
+        collection,
+        bucket_seconds: int = 3600,
+        window_buckets: int = 168,
+        sketch_size: int = 200,
+        flush_interval: float = 5.0,
+        max_retries: int = 5,
+    ):
+        self.collection = collection
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = window_buckets
+        self.sketch_size = sketch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._totals = _empty_ratings()
+        self._buckets: Dict[int, Dict[str, Any]] = {}
+        self._sketches = {name: SpaceSaving(sketch_size) for name in SKETCHES}
+        # Changes not yet flushed, in the same shapes
+        self._pending_totals = _empty_ratings()
+        self._pending_buckets: Dict[int, Dict[str, Any]] = {}
+        self._pending_sketches = {name: SpaceSaving(sketch_size) for name in SKETCHES}
+        self._flusher: Optional[asyncio.Task] = None
+        self._live_since: Optional[datetime] = None
+        self._flush_lock = asyncio.Lock()
+        self.refreshed_at: Optional[datetime] = None
+        self.recorded = 0
+        self.flushes = 0
+        self.conflicts = 0
+        self.last_flush_ms = 0.0
+
+    async def ensure_indexes(self):
+        try:
+            await self.collection.create_index([("kind", 1), ("start", 1)])
+        except Exception as e:
+            logger.error(f"Error creating analytics indexes: {e}")
+
+    async def start(self):
+        # Taken now rather than when the upsert lands, so every analysis counted live is after it
+        self._live_since = datetime.utcnow()
+        self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        await self.flush()
+
+    async def _run(self):
+        # The first pass runs straight away, off the startup path; until it has
+        # refreshed, reports cover this worker's analyses only
+        marked_live = False
+        while True:
+            try:
+                if not marked_live:
+                    await self.collection.update_one(
+                        {"_id": "meta"}, {"$setOnInsert": {"live_since": self._live_since}}, upsert=True
+                    )
+                    marked_live = True
+                await self.flush()
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error flushing analytics rollups: {e}")
+            await asyncio.sleep(self.flush_interval)
+
+    @property
+    def pending(self) -> bool:
+        return self._pending_totals["analyses"] > 0 or any(len(sketch) for sketch in self._pending_sketches.values())
+
+    def _bucket_of(self, timestamp: datetime) -> int:
+        # Stored timestamps are naive UTC
+        seconds = calendar.timegm(timestamp.utctimetuple())
+        return seconds - seconds % self.bucket_seconds
+
+    def _window_start(self) -> int:
+        return self._bucket_of(datetime.utcnow()) - (self.window_buckets - 1) * self.bucket_seconds
+
+    def record(self, document: Dict[str, Any]):
+        """Count one ``resume_analyses`` document; only memory is touched."""
+        analysis = document.get("analysis") or {}
+        timestamp = document.get("timestamp") or datetime.utcnow()
+        try:
+            rating = float(analysis["overall_rating"])
+        except (KeyError, TypeError, ValueError):
+            rating = None
+        if rating is not None:
+            rating_bin = min(RATING_BINS - 1, max(0, int(rating)))
+            bucket = self._bucket_of(timestamp)
+            targets = [self._totals, self._pending_totals, self._pending_buckets.setdefault(bucket, _empty_ratings())]
+            if bucket >= self._window_start():
+                targets.append(self._buckets.setdefault(bucket, _empty_ratings()))
+            for ratings in targets:
+                ratings["analyses"] += 1
+                ratings["rating_sum"] += rating
+                ratings["counts"][rating_bin] += 1
+
+        profile = document.get("profile") or {}
+        items = {
+            "weaknesses": analysis.get("weaknesses") or (),
+            "suggestions": analysis.get("suggestions") or (),
+            "skills": profile.get("skills") or (),
+        }
+        for name, texts in items.items():
+            # Each item once per analysis, under its normalized text
+            unique = {_item_key(text): text.strip() for text in texts if isinstance(text, str) and text.strip()}
+            for key, label in unique.items():
+                self._sketches[name].offer(key, label)
+                self._pending_sketches[name].offer(key, label)
+        for internship_id in set(document.get("recommended_ids") or ()):
+            self._sketches["internships"].offer(str(internship_id), str(internship_id))
+            self._pending_sketches["internships"].offer(str(internship_id), str(internship_id))
+        self.recorded += 1
+
+    async def flush(self):
+        """Write the changes recorded since the last flush; what fails is kept for the next one."""
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            started = time.perf_counter()
+            totals, self._pending_totals = self._pending_totals, _empty_ratings()
+            buckets, self._pending_buckets = self._pending_buckets, {}
+            sketches = self._pending_sketches
+            self._pending_sketches = {name: SpaceSaving(self.sketch_size) for name in SKETCHES}
+
+            requests = []
+            for document_id, start, ratings in [("totals", None, totals)] + [
+                (f"ratings:{bucket}", datetime.utcfromtimestamp(bucket), ratings) for bucket, ratings in buckets.items()
+            ]:
+                if not ratings["analyses"]:
+                    continue
+                increments = {"analyses": ratings["analyses"], "rating_sum": ratings["rating_sum"]}
+                increments.update({f"counts.{rating_bin}": count for rating_bin, count in enumerate(ratings["counts"]) if count})
+                on_insert = {"kind": "ratings", "start": start} if start is not None else {"kind": "totals"}
+                requests.append(UpdateOne({"_id": document_id}, {"$inc": increments, "$setOnInsert": on_insert}, upsert=True))
+            try:
+                if requests:
+                    await self.collection.bulk_write(requests, ordered=False)
+            except Exception as e:
+                # Increments that did apply before the error are counted again on retry
+                logger.error(f"Error writing rating rollups, retrying on the next flush: {e}")
+                _add_ratings(self._pending_totals, totals)
+                for bucket, ratings in buckets.items():
+                    _add_ratings(self._pending_buckets.setdefault(bucket, _empty_ratings()), ratings)
+
+            for name, sketch in sketches.items():
+                if len(sketch) and not await self._merge_sketch(name, sketch):
+                    self._pending_sketches[name] = self._pending_sketches[name].merge(sketch)
+            self.flushes += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _merge_sketch(self, name: str, sketch: SpaceSaving) -> bool:
+        try:
+            for _ in range(self.max_retries):
+                stored = await self.collection.find_one({"_id": f"top:{name}"})
+                version = stored["version"] if stored else 0
+                merged = SpaceSaving.from_items(self.sketch_size, stored["items"] if stored else ()).merge(sketch)
+                try:
+                    await self.collection.replace_one(
+                        {"_id": f"top:{name}", "version": version},
+                        {"kind": "top", "version": version + 1, "items": merged.to_items()},
+                        upsert=True,
+                    )
+                    return True
+                except DuplicateKeyError:
+                    # Another worker merged first: the upsert collided with its newer version
+                    self.conflicts += 1
+            logger.warning(f"The {name} rollup kept changing under {self.max_retries} merges, retrying on the next flush")
+        except Exception as e:
+            logger.error(f"Error merging the {name} rollup, retrying on the next flush: {e}")
+        return False
+
+    async def refresh(self):
+        """Reload the rollups from the collection, keeping changes not yet flushed."""
+        window_start = self._window_start()
+        totals = _empty_ratings()
+        buckets: Dict[int, Dict[str, Any]] = {}
+        sketches = {name: SpaceSaving(self.sketch_size) for name in SKETCHES}
+        cursor = self.collection.find({"$or": [
+            {"_id": "totals"},
+            {"kind": "ratings", "start": {"$gte": datetime.utcfromtimestamp(window_start)}},
+            {"kind": "top"},
+        ]})
+        async for document in cursor:
+            if document.get("kind") == "top":
+                name = document["_id"].split(":", 1)[1]
+                if name in sketches:
+                    sketches[name] = SpaceSaving.from_items(self.sketch_size, document.get("items", ()))
+                continue
+            ratings = totals if document["_id"] == "totals" else buckets.setdefault(
+                self._bucket_of(document["start"]), _empty_ratings()
+            )
+            ratings["analyses"] = document.get("analyses", 0)
+            ratings["rating_sum"] = document.get("rating_sum", 0.0)
+            counts = document.get("counts") or {}
+            ratings["counts"] = [counts.get(str(rating_bin), 0) for rating_bin in range(RATING_BINS)]
+
+        # What this worker recorded since the flush is not in the collection yet
+        _add_ratings(totals, self._pending_totals)
+        for bucket, ratings in self._pending_buckets.items():
+            if bucket >= window_start:
+                _add_ratings(buckets.setdefault(bucket, _empty_ratings()), ratings)
+        for name, pending in self._pending_sketches.items():
+            if len(pending):
+                sketches[name] = sketches[name].merge(pending)
+
+        self._totals, self._buckets, self._sketches = totals, buckets, sketches
+        self.refreshed_at = datetime.utcnow()
+
+    def report(self, top_n: int = 10) -> Dict[str, Any]:
+        """Rating distributions and top items, from memory."""
+        window_start = self._window_start()
+
+        def ratings_summary(ratings: Dict[str, Any]) -> Dict[str, Any]:
+            analyses = ratings["analyses"]
+            return {
+                "analyses": analyses,
+                "mean_rating": round(ratings["rating_sum"] / analyses, 2) if analyses else None,
+                "histogram": list(ratings["counts"]),
+            }
+
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "since": datetime.utcfromtimestamp(window_start),
+            "refreshed_at": self.refreshed_at,
+            "ratings": ratings_summary(self._totals),
+            "rating_buckets": [
+                {"start": datetime.utcfromtimestamp(bucket), **ratings_summary(self._buckets[bucket])}
+                for bucket in sorted(self._buckets) if bucket >= window_start
+            ],
+            "top": {name: sketch.top(top_n) for name, sketch in self._sketches.items()},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "conflicts": self.conflicts,
+            "last_flush_ms": self.last_flush_ms,
+            "refreshed_at": self.refreshed_at,
+        }
+
+    async def backfill(self, analyses, batch_size: int = 1000, force: bool = False) -> int:
+        """Count the analyses stored before live counting began; returns how many.
+
+        Analyses from ``live_since`` on were counted as they were stored, so
+        the two never overlap. A second backfill would count everything
+        again and is refused unless ``force``, which deletes the rollups and
+        recounts every stored analysis; analyses stored by running workers
+        while it deletes may be counted twice or not at all.
+        """
+        meta = await self.collection.find_one({"_id": "meta"}) or {}
+        if meta.get("backfilled_at") and not force:
+            raise RuntimeError(f"Rollups were already backfilled at {meta['backfilled_at']}; use --force to rebuild them")
+        live_since = meta.get("live_since")
+        if force or live_since is None:
+            live_since = datetime.utcnow()
+            await self.collection.delete_many({})
+            await self.collection.insert_one({"_id": "meta", "live_since": live_since})
+
+        count = 0
+        cursor = analyses.find(
+            {"timestamp": {"$lt": live_since}},
+            {
+                "timestamp": 1, "analysis.overall_rating": 1, "analysis.weaknesses": 1,
+                "analysis.suggestions": 1, "profile.skills": 1, "recommended_ids": 1,
+            },
+        ).batch_size(batch_size)
+        async for document in cursor:
+            self.record(document)
+            count += 1
+            if count % batch_size == 0:
+                await self.flush()
+        await self.flush()
+        await self.collection.update_one(
+            {"_id": "meta"}, {"$set": {"backfilled_at": datetime.utcnow(), "backfilled": count}}
+        )
+        return count
+
+
+async def _backfill(args) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    try:
+        db = client[os.environ["DB_NAME"]]
+        rollups = AnalyticsRollups(db.analytics_rollups, bucket_seconds=args.bucket_seconds, sketch_size=args.sketch_size)
+        await rollups.ensure_indexes()
+        return await rollups.backfill(db.resume_analyses, batch_size=args.batch_size, force=args.force)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the analytics rollups over resume_analyses.")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--bucket-seconds", type=int, default=int(os.environ.get("ANALYTICS_BUCKET_SECONDS", "3600")),
+                        help="Must match the server's ANALYTICS_BUCKET_SECONDS")
+    parser.add_argument("--sketch-size", type=int, default=int(os.environ.get("ANALYTICS_SKETCH_SIZE", "200")))
+    parser.add_argument("--force", action="store_true", help="Delete the rollups and recount every analysis")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        count = asyncio.run(_backfill(args))
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    print(f"Backfilled {count} analyses in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+import zipfile
+import zlib
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile
+from pymongo import ReturnDocument
+
+from uploads import CHUNK_SIZE, PDF_MAGIC, PDF_MAGIC_WINDOW
+
+logger = logging.getLogger(__name__)
+
+PrepareFn = Callable[[str, str], Awaitable[Any]]
+CompleteFn = Callable[[Any, Optional[str], Dict[str, Any]], Awaitable[dict]]
+
+
+class BatchJobError(Exception):
+    pass
+
+
+# Raised while reading a zip member that is encrypted, corrupt, truncated or
+# compressed with an unsupported method
+_MEMBER_ERRORS = (RuntimeError, NotImplementedError, EOFError, zipfile.BadZipFile, zlib.error)
+
+
+def _copy_limited(src, dst_path: Path, max_bytes: int) -> Dict[str, Any]:
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    with open(dst_path, "wb") as dst:
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if len(head) < PDF_MAGIC_WINDOW:
+                head += chunk[:PDF_MAGIC_WINDOW - len(head)]
+            size += len(chunk)
+            if size > max_bytes:
+                raise BatchJobError(f"File exceeds the {max_bytes} byte limit")
+            digest.update(chunk)
+            dst.write(chunk)
+    if PDF_MAGIC not in head:
+        raise BatchJobError("Only PDF files are supported")
+    return {"size": size, "content_hash": digest.hexdigest()}
+
+
+class BatchJobManager:
+    """Bulk resume analysis backed by Mongo and a local spool directory.
+
+    Submitted PDFs (or PDFs inside zip archives) are written to
+    ``spool_dir/<job_id>/`` and one document per file is recorded in
+    ``items``. A fixed set of worker tasks drains an in-memory queue, running
+    the ``prepare`` stage (cache lookup + extraction) under
+    ``extract_concurrency`` and the ``complete`` stage (Gemini + ranking)
+    under ``gemini_concurrency``. A worker claims an item by switching it
+    from ``pending`` to ``running`` in one atomic update, so when several
+    processes share the collections each item is analysed once. Every
+    finished item is written back immediately, so after a restart
+    ``resume_pending`` re-queues only the items that had not finished:
+    pending ones, and running ones whose claim is older than
+    ``claim_timeout`` seconds because the worker holding it died.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        items,
+        spool_dir: Path,
+        prepare: PrepareFn,
+        complete: CompleteFn,
+        extract_concurrency: int = 2,
+        gemini_concurrency: int = 4,
+        max_files: int = 500,
+        max_file_bytes: int = 10 * 1024 * 1024,
+        claim_timeout: float = 900.0,
+    ):
+        self.jobs = jobs
+        self.items = items
+        self.spool_dir = Path(spool_dir)
+        self.prepare = prepare
+        self.complete = complete
+        self.extract_concurrency = extract_concurrency
+        self.gemini_concurrency = gemini_concurrency
+        self.max_files = max_files
+        self.max_file_bytes = max_file_bytes
+        self.claim_timeout = claim_timeout
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._resumer: Optional[asyncio.Task] = None
+        self._extract_slots: Optional[asyncio.Semaphore] = None
+        self._gemini_slots: Optional[asyncio.Semaphore] = None
+
+    async def ensure_indexes(self):
+        try:
+            await self.items.create_index([("job_id", 1), ("index", 1)])
+            await self.items.create_index([("job_id", 1), ("status", 1)])
+            await self.jobs.create_index("status")
+        except Exception as e:
+            logger.error(f"Error creating batch job indexes: {e}")
+
+    async def start(self):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._extract_slots = asyncio.Semaphore(self.extract_concurrency)
+        self._gemini_slots = asyncio.Semaphore(self.gemini_concurrency)
+        # Enough workers to keep both stages saturated at the same time
+        for _ in range(self.extract_concurrency + self.gemini_concurrency):
+            self._workers.append(asyncio.create_task(self._worker()))
+        # Off the startup path: the workers pick up what it re-queues whenever Mongo answers
+        self._resumer = asyncio.create_task(self.resume_pending())
+
+    async def stop(self):
+        tasks = self._workers + ([self._resumer] if self._resumer is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._resumer = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def resume_pending(self):
+        try:
+            stale = datetime.utcnow() - timedelta(seconds=self.claim_timeout)
+            async for job in self.jobs.find({"status": {"$in": ["queued", "running"]}}, {"_id": 1}):
+                # Release claims left behind by a worker that died mid-item
+                await self.items.update_many(
+                    {"job_id": job["_id"], "status": "running", "claimed_at": {"$lt": stale}},
+                    {"$set": {"status": "pending", "updated_at": datetime.utcnow()}},
+                )
+                async for item in self.items.find({"job_id": job["_id"], "status": "pending"}, {"_id": 1, "path": 1}):
+                    if os.path.exists(item["path"]):
+                        self._queue.put_nowait(item["_id"])
+                    else:
+                        await self._finish_item(job["_id"], item["_id"], error="Upload was lost during a restart")
+        except Exception as e:
+            logger.error(f"Error resuming batch jobs: {e}")
+
+    def _spool_files(self, job_dir: Path, uploads: List[UploadFile]) -> List[Dict[str, Any]]:
+        entries = []
+
+        def add(filename: str, open_file=None, error: Optional[str] = None):
+            if len(entries) >= self.max_files:
+                raise HTTPException(status_code=413, detail=f"A batch may contain at most {self.max_files} files")
+            entry = {
+                "index": len(entries),
+                "filename": filename,
+                "path": str(job_dir / f"{len(entries)}.pdf"),
+                "result": None,
+                "error": None,
+            }
+            if error is None:
+                try:
+                    with open_file() as src:
+                        entry.update(_copy_limited(src, Path(entry["path"]), self.max_file_bytes))
+                except BatchJobError as e:
+                    error = str(e)
+                except _MEMBER_ERRORS as e:
+                    # One unreadable member fails on its own; the rest of the archive is still analysed
+                    error = f"Could not read the file from the archive: {e}"
+            if error is None:
+                entry["status"] = "pending"
+            else:
+                Path(entry["path"]).unlink(missing_ok=True)
+                entry["status"] = "error"
+                entry["error"] = error
+            entries.append(entry)
+
+        for upload in uploads:
+            upload.file.seek(0)
+            if zipfile.is_zipfile(upload.file):
+                upload.file.seek(0)
+                try:
+                    archive = zipfile.ZipFile(upload.file)
+                except _MEMBER_ERRORS as e:
+                    add(upload.filename or "archive.zip", error=f"Could not read the archive: {e}")
+                    continue
+                with archive:
+                    for info in archive.infolist():
+                        if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                            continue
+                        # _copy_limited counts the decompressed bytes, so a zip bomb stops at the cap
+                        add(info.filename, lambda info=info: archive.open(info))
+            else:
+                upload.file.seek(0)
+                add(upload.filename or "resume.pdf", lambda: nullcontext(upload.file))
+
+        if not entries:
+            raise HTTPException(status_code=400, detail="No files were submitted")
+        return entries
+
+    async def submit(self, uploads: List[UploadFile], options: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = str(uuid.uuid4())
+        job_dir = self.spool_dir / job_id
+        job_dir.mkdir(parents=True)
+        try:
+            entries = await asyncio.to_thread(self._spool_files, job_dir, uploads)
+        except Exception:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+
+        now = datetime.utcnow()
+        failed = sum(1 for entry in entries if entry["status"] == "error")
+        job = {
+            "_id": job_id,
+            "status": "queued" if failed < len(entries) else "completed",
+            "total": len(entries),
+            "completed": 0,
+            "failed": failed,
+            "options": options,
+            "created_at": now,
+            "updated_at": now,
+        }
+        items = [
+            dict(entry, _id=f"{job_id}:{entry['index']}", job_id=job_id, updated_at=now)
+            for entry in entries
+        ]
+        await self.jobs.insert_one(job)
+        await self.items.insert_many(items, ordered=False)
+        if job["status"] == "completed":
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+        for item in items:
+            if item["status"] == "pending":
+                self._queue.put_nowait(item["_id"])
+        return self._job_status(job)
+
+    async def _worker(self):
+        while True:
+            item_id = await self._queue.get()
+            try:
+                await self._process(item_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Batch item {item_id} failed unexpectedly: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, item_id: str):
+        # Claimed atomically: another worker (or process) that queued the same item gets None
+        now = datetime.utcnow()
+        item = await self.items.find_one_and_update(
+            {"_id": item_id, "status": "pending"},
+            {"$set": {"status": "running", "claimed_at": now, "updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if item is None:
+            return
+        job = await self.jobs.find_one_and_update(
+            {"_id": item["job_id"]},
+            {"$set": {"status": "running", "updated_at": datetime.utcnow()}},
+            projection={"options": 1},
+        )
+        options = (job or {}).get("options", {})
+
+        try:
+            async with self._extract_slots:
+                prepared = await self.prepare(item["path"], item["content_hash"])
+            async with self._gemini_slots:
+                result = await self.complete(prepared, item["filename"], options)
+        except HTTPException as e:
+            await self._finish_item(item["job_id"], item_id, error=str(e.detail))
+        except Exception as e:
+            logger.error(f"Error analyzing batch item {item_id}: {e}")
+            await self._finish_item(item["job_id"], item_id, error="Failed to analyze resume")
+        else:
+            await self._finish_item(item["job_id"], item_id, result=result)
+
+    async def _finish_item(self, job_id: str, item_id: str, result: Optional[dict] = None, error: Optional[str] = None):
+        status = "error" if error is not None else "done"
+        finished = await self.items.update_one(
+            {"_id": item_id, "status": {"$in": ["pending", "running"]}},
+            {"$set": {"status": status, "result": result, "error": error, "updated_at": datetime.utcnow()}},
+        )
+        if not finished.modified_count:
+            # Already finished by a worker that took over a stale claim; count it once
+            return
+        job = await self.jobs.find_one_and_update(
+            {"_id": job_id},
+            {
+                "$inc": {"completed" if error is None else "failed": 1},
+                "$set": {"updated_at": datetime.utcnow()},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        path = Path(self.spool_dir / job_id / f"{item_id.rsplit(':', 1)[1]}.pdf")
+        path.unlink(missing_ok=True)
+
+        if job is not None and job["completed"] + job["failed"] >= job["total"]:
+            await self.jobs.update_one({"_id": job_id}, {"$set": {"status": "completed"}})
+            shutil.rmtree(self.spool_dir / job_id, ignore_errors=True)
+
+    @staticmethod
+    def _job_status(job: dict) -> Dict[str, Any]:
+        done = job["completed"] + job["failed"]
+        return {
+            "job_id": job["_id"],
+            "status": job["status"],
+            "total": job["total"],
+            "completed": job["completed"],
+            "failed": job["failed"],
+            "progress": round(done / job["total"], 4) if job["total"] else 1.0,
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.jobs.find_one({"_id": job_id})
+        return self._job_status(job) if job is not None else None
+
+    def results(self, job_id: str):
+        """Cursor over a job's items in submission order, for streaming download."""
+        return self.items.find(
+            {"job_id": job_id},
+            {"_id": 0, "index": 1, "filename": 1, "status": 1, "result": 1, "error": 1},
+        ).sort("index", 1)
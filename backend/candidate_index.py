@@ -0,0 +1,418 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+
+class Candidate(NamedTuple):
+    analysis_id: str
+    rating: float
+    match_percentage: int
+    matched_skills: List[str]
+
+
+class _Segment(NamedTuple):
+    ratings: np.ndarray  # float64, one per row
+    bits: np.ndarray     # uint64, shape (words, rows): skill bit ``b`` is bit ``b % 64`` of word ``b // 64``
+    seqs: np.ndarray     # int64 insertion sequence numbers
+    alive: np.ndarray    # bool, False once a newer analysis of the same resume replaces the row
+
+
+def _empty_segment(words: int) -> _Segment:
+    return _Segment(np.empty(0, np.float64), np.zeros((words, 0), np.uint64), np.empty(0, np.int64), np.empty(0, bool))
+
+
+def _grow(array: np.ndarray, size: int, axis: int = 0) -> np.ndarray:
+    if array.shape[axis] >= size:
+        return array
+    shape = list(array.shape)
+    shape[axis] = max(size, 2 * array.shape[axis], 1024)
+    grown = np.zeros(shape, dtype=array.dtype)
+    index = [slice(None)] * array.ndim
+    index[axis] = slice(0, array.shape[axis])
+    grown[tuple(index)] = array
+    return grown
+
+
+class CandidateIndex:
+    """Reverse matching: the stored resumes that best fit one internship.
+
+    Every analysis stored with a profile (see ``resume_profile``) becomes one
+    row: its rating and its skills as a bitset. Skill bits are assigned by
+    canonical skill name in the order the index first sees them, so they
+    survive catalog reloads, which renumber the matcher's skill IDs. Rows
+    live in two segments:
+
+    * the main segment, sorted by rating, so the rows within ``score_range``
+      widened by ``tolerance`` are one contiguous slice found by binary search;
+    * a small delta segment in insertion order, scanned in full, which takes
+      new analyses and is merged into the main segment once it reaches
+      ``merge_ratio`` of it (at least ``min_merge`` rows).
+
+    Bitsets are stored word-major, so skill overlap for a slice is an AND
+    and a popcount (``np.bitwise_count``) per word the internship touches.
+    Ranking mirrors ``RecommendationEngine.top_k`` from the other side:
+    candidates must be within the widened range and either share a skill or
+    sit inside the range itself, and are ordered by ``(max(match %, 10),
+    -|rating - range midpoint|)``, newest analysis first on ties. A histogram
+    of the overlap counts tells which match percentage the k-th candidate
+    has, so only rows at or above it are scored in full.
+
+    Resumes are identified by content hash: analysing the same file again
+    replaces its row, so re-uploads do not crowd the results.
+
+    Each worker indexes its own analyses as it stores them. Those stored by
+    other workers are picked up by a background task started with
+    ``start()``, which every ``refresh_interval`` seconds reads the analyses
+    with an ``_id`` above the newest one seen so far into the delta segment.
+    ObjectIds from different workers are only roughly in time order and
+    writes are batched, so each catch-up reaches back ``refresh_overlap``
+    seconds; analyses already indexed are skipped.
+    """
+
+    def __init__(
+        self,
+        merge_ratio: float = 0.0625,
+        min_merge: int = 4096,
+        refresh_interval: float = 30.0,
+        refresh_overlap: float = 120.0,
+    ):
+        self.merge_ratio = merge_ratio
+        self.min_merge = min_merge
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = refresh_overlap
+        self._bit_of: Dict[str, int] = {}
+        self.skill_names: List[str] = []
+        self._words = 1
+        self._main = _empty_segment(1)
+        self._delta = _empty_segment(1)
+        self._delta_size = 0
+        # Per sequence number: the analysis ObjectId (12 bytes each) and where its row is
+        self._ids = bytearray()
+        self._row_of = np.zeros(0, dtype=np.int64)
+        self._in_main = np.zeros(0, dtype=bool)
+        self._next_seq = 0
+        self._by_hash: Dict[int, int] = {}
+        self._defer_merge = False
+        self._last_seen: Optional[ObjectId] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.live = 0
+        self.merges = 0
+        self.caught_up = 0
+        self.last_rebuild_ms = 0.0
+
+    def __len__(self) -> int:
+        return self.live
+
+    def _bit(self, name: str) -> int:
+        key = name.lower()
+        bit = self._bit_of.get(key)
+        if bit is None:
+            bit = self._bit_of[key] = len(self.skill_names)
+            self.skill_names.append(name)
+        return bit
+
+    def _widen(self):
+        """Add bitset words until every known skill has a bit."""
+        while len(self.skill_names) > 64 * self._words:
+            self._words += 1
+            for name in ("_main", "_delta"):
+                segment = getattr(self, name)
+                extra = np.zeros((1, segment.bits.shape[1]), np.uint64)
+                setattr(self, name, segment._replace(bits=np.vstack([segment.bits, extra])))
+
+    def _kill(self, seq: int):
+        segment = self._main if self._in_main[seq] else self._delta
+        segment.alive[self._row_of[seq]] = False
+        self.live -= 1
+
+    def add(self, analysis_id: ObjectId, profile: Dict[str, Any]) -> bool:
+        """Index one analysis; returns False if a newer analysis of the same resume is already indexed."""
+        return self.add_many([(analysis_id, profile)]) == 1
+
+    def add_many(self, analyses: Iterable[Tuple[ObjectId, Dict[str, Any]]]) -> int:
+        """Index ``(analysis_id, profile)`` pairs in one batch; returns how many became rows."""
+        ratings: List[float] = []
+        masks: List[int] = []
+        seqs: List[int] = []
+        batch_start = self._next_seq
+        for analysis_id, profile in analyses:
+            try:
+                key = int(profile["content_hash"][:16], 16)
+                rating = float(profile["rating"])
+                skills = [name for name in profile.get("skills") or () if isinstance(name, str)]
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Not indexing analysis {analysis_id} with a malformed profile: {e}")
+                continue
+            oid = analysis_id.binary
+            previous = self._by_hash.get(key)
+            if previous is not None:
+                if self._ids[12 * previous:12 * previous + 12] >= oid:
+                    continue
+                if previous >= batch_start:
+                    # Replaced within this batch: simply never written
+                    index = seqs.index(previous)
+                    del ratings[index], masks[index], seqs[index]
+                    self.live -= 1
+                else:
+                    self._kill(previous)
+            mask = 0
+            for name in skills:
+                mask |= 1 << self._bit(name)
+            seq = self._next_seq
+            self._next_seq += 1
+            self._ids += oid
+            self._by_hash[key] = seq
+            self.live += 1
+            ratings.append(rating)
+            masks.append(mask)
+            seqs.append(seq)
+
+        if not seqs:
+            return 0
+        self._widen()
+        count = len(seqs)
+        start, stop = self._delta_size, self._delta_size + count
+        delta = _Segment(
+            _grow(self._delta.ratings, stop), _grow(self._delta.bits, stop, axis=1),
+            _grow(self._delta.seqs, stop), _grow(self._delta.alive, stop),
+        )
+        delta.ratings[start:stop] = ratings
+        for word in range(self._words):
+            delta.bits[word, start:stop] = np.fromiter(
+                ((mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for mask in masks), dtype=np.uint64, count=count
+            )
+        delta.seqs[start:stop] = seqs
+        delta.alive[start:stop] = True
+        self._delta = delta
+        self._delta_size = stop
+        self._row_of = _grow(self._row_of, self._next_seq)
+        self._in_main = _grow(self._in_main, self._next_seq)
+        self._row_of[seqs] = np.arange(start, stop)
+        self._in_main[seqs] = False
+        if not self._defer_merge and self._delta_size >= max(self.min_merge, self.merge_ratio * len(self._main.ratings)):
+            self.merge()
+        return count
+
+    def merge(self):
+        """Fold the delta segment into the main one, dropping replaced rows."""
+        size = self._delta_size
+        main_keep = self._main.alive
+        delta_keep = self._delta.alive[:size]
+        ratings = np.concatenate([self._main.ratings[main_keep], self._delta.ratings[:size][delta_keep]])
+        bits = np.concatenate([self._main.bits[:, main_keep], self._delta.bits[:, :size][:, delta_keep]], axis=1)
+        seqs = np.concatenate([self._main.seqs[main_keep], self._delta.seqs[:size][delta_keep]])
+        # The main part is already sorted, which a stable sort handles in close to linear time
+        order = np.argsort(ratings, kind="stable")
+        self._main = _Segment(ratings[order], np.ascontiguousarray(bits[:, order]), seqs[order], np.ones(len(order), bool))
+        self._row_of[self._main.seqs] = np.arange(len(order))
+        self._in_main[self._main.seqs] = True
+        self._delta = _empty_segment(self._words)
+        self._delta_size = 0
+        self.merges += 1
+
+    async def _load(self, collection, query: Dict[str, Any], batch_size: int) -> int:
+        count = 0
+        batch: List[Tuple[ObjectId, Dict[str, Any]]] = []
+        cursor = collection.find(
+            {**query, "profile": {"$exists": True}},
+            {"profile.content_hash": 1, "profile.rating": 1, "profile.skills": 1},
+        ).sort("_id", 1).batch_size(batch_size)
+        # In _id order, so a load that fails part way still leaves ``_last_seen`` where a catch-up should resume
+        async for document in cursor:
+            batch.append((document["_id"], document["profile"]))
+            if self._last_seen is None or document["_id"] > self._last_seen:
+                self._last_seen = document["_id"]
+            if len(batch) == batch_size:
+                count += self.add_many(batch)
+                batch = []
+        return count + self.add_many(batch)
+
+    async def rebuild(self, collection, batch_size: int = 5000):
+        """Index every stored analysis that has a profile; analyses added meanwhile are kept."""
+        started = time.perf_counter()
+        self._defer_merge = True
+        count = 0
+        try:
+            count = await self._load(collection, {}, batch_size)
+        finally:
+            self._defer_merge = False
+            self.merge()
+        self.last_rebuild_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"Candidate index rebuilt from {count} analyses in {self.last_rebuild_ms}ms ({self.live} resumes)")
+
+    async def catch_up(self, collection, batch_size: int = 5000) -> int:
+        """Index analyses stored since the newest one seen, e.g. by other workers; returns how many became rows."""
+        query: Dict[str, Any] = {}
+        if self._last_seen is not None:
+            since = self._last_seen.generation_time - timedelta(seconds=self.refresh_overlap)
+            query = {"_id": {"$gt": ObjectId.from_datetime(since)}}
+        count = await self._load(collection, query, batch_size)
+        self.caught_up += count
+        if count:
+            logger.info(f"Candidate index caught up with {count} analyses ({self.live} resumes)")
+        return count
+
+    def start(self, collection):
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._run(collection))
+
+    async def stop(self):
+        if self._refresher is None:
+            return
+        self._refresher.cancel()
+        await asyncio.gather(self._refresher, return_exceptions=True)
+        self._refresher = None
+
+    async def _run(self, collection):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.catch_up(collection)
+            except Exception as e:
+                logger.error(f"Error catching up the candidate index: {e}")
+
+    @staticmethod
+    def _matched(segment: _Segment, rows, masks: List[Tuple[int, np.uint64]]) -> np.ndarray:
+        """Skills each of ``rows`` shares with the internship; 0 for replaced rows."""
+        matched = np.zeros(len(segment.ratings[rows]), dtype=np.uint8)
+        for word, mask in masks:
+            matched += np.bitwise_count(segment.bits[word, rows] & mask)
+        return matched * segment.alive[rows]
+
+    @staticmethod
+    def _tier10_rows(segment: _Segment, rows: slice, overlap: np.ndarray, tier_of: np.ndarray, low: float, high: float, k: int) -> np.ndarray:
+        """Rows of a sorted slice that can make the top ``k`` when the k-th candidate is in tier 10.
+
+        Tier 10 rows rank by distance from the range midpoint alone, so only
+        the ones in a rating window around it with ``k`` eligible rows can
+        win; rows in higher tiers (fewer than ``k``) are taken from anywhere.
+        """
+        mid = (low + high) / 2
+        ratings = segment.ratings[rows]
+        alive = segment.alive[rows]
+        # Overlap counts from here up rank above tier 10
+        higher = int(np.searchsorted(tier_of, 11))
+
+        def eligible(first: int, last: int) -> np.ndarray:
+            window, counts = ratings[first:last], overlap[first:last]
+            in_range = alive[first:last] & (window >= low) & (window <= high)
+            return ((counts > 0) | in_range) & (counts < higher)
+
+        centre = int(np.searchsorted(ratings, mid))
+        width = k
+        while True:
+            first, last = max(centre - width, 0), min(centre + width, len(ratings))
+            near = eligible(first, last)
+            if np.count_nonzero(near) >= k or (first == 0 and last == len(ratings)):
+                break
+            width *= 4
+        # Every row as close to the midpoint as the farthest of those is a contender too
+        distance = float(np.abs(ratings[first:last][near] - mid).max()) + 1e-9 if near.any() else 0.0
+        first = int(np.searchsorted(ratings, mid - distance, side="left"))
+        last = int(np.searchsorted(ratings, mid + distance, side="right"))
+        return np.concatenate([np.flatnonzero(eligible(first, last)) + first, np.flatnonzero(overlap >= higher)])
+
+    def top_k(
+        self,
+        skills: Sequence[str],
+        score_range: Sequence[float],
+        k: int = 10,
+        tolerance: float = 1.0,
+    ) -> List[Candidate]:
+        """Return up to ``k`` candidates for an internship requiring ``skills`` within ``score_range``.
+
+        ``skills`` should be canonical names (``SkillMatcher.skill_names``), so
+        aliases resolve the same way they did when the resumes were matched.
+        """
+        if k <= 0 or not self.live:
+            return []
+        low, high = float(score_range[0]), float(score_range[1])
+        total = len(skills)
+        required = [(name, self._bit_of.get(name.lower())) for name in skills if isinstance(name, str)]
+        mask_words: Dict[int, int] = {}
+        for _, bit in required:
+            if bit is not None:
+                mask_words[bit // 64] = mask_words.get(bit // 64, 0) | (1 << (bit % 64))
+        masks = [(word, np.uint64(mask)) for word, mask in mask_words.items()]
+
+        start = int(np.searchsorted(self._main.ratings, low - tolerance, side="left"))
+        stop = int(np.searchsorted(self._main.ratings, high + tolerance, side="right"))
+        delta_ratings = self._delta.ratings[:self._delta_size]
+        delta_rows = np.flatnonzero((delta_ratings >= low - tolerance) & (delta_ratings <= high + tolerance))
+        views = [(self._main, slice(start, stop)), (self._delta, delta_rows)]
+        matched = [self._matched(segment, rows, masks) for segment, rows in views]
+
+        # Match percentage and its ranking tier (at least 10) for each possible overlap count
+        percentage_of = (np.arange(total + 1) / max(total, 1) * 100).astype(np.int64)
+        tier_of = np.maximum(percentage_of, 10)
+        # The k-th candidate's tier: count rows from the highest overlap down until there are k.
+        # Tier 10 also admits in-range rows without any overlap.
+        tier = 10
+        for level in range(total, 0, -1):
+            if tier_of[level] == 10:
+                break
+            if sum(int(np.count_nonzero(overlap >= level)) for overlap in matched) >= k:
+                tier = tier_of[level]
+                break
+        min_overlap = int(np.searchsorted(tier_of, tier)) if tier > 10 else 0
+
+        parts = []
+        for (segment, rows), overlap in zip(views, matched):
+            if min_overlap:
+                keep = np.flatnonzero(overlap >= min_overlap)
+            elif isinstance(rows, slice):
+                keep = self._tier10_rows(segment, rows, overlap, tier_of, low, high, k)
+            else:
+                ratings = segment.ratings[rows]
+                in_range = segment.alive[rows] & (ratings >= low) & (ratings <= high)
+                keep = np.flatnonzero((overlap > 0) | in_range)
+            positions = keep + rows.start if isinstance(rows, slice) else rows[keep]
+            parts.append((positions, overlap[keep], segment.ratings[positions], segment.seqs[positions]))
+        positions, overlap, ratings, seqs = (np.concatenate([part[field] for part in parts]) for field in range(4))
+        if not len(positions):
+            return []
+        in_main = np.arange(len(positions)) < len(parts[0][0])
+
+        # Whole percentage points always outweigh the distance, which stays well under 1000
+        key = tier_of[overlap] * 1000.0 - np.abs(ratings - (low + high) / 2)
+        if k < len(key):
+            threshold = np.partition(key, len(key) - k)[len(key) - k]
+            candidates = np.flatnonzero(key >= threshold)
+        else:
+            candidates = np.arange(len(key))
+        best = candidates[np.lexsort((-seqs[candidates], -key[candidates]))][:k]
+
+        results = []
+        for candidate in best:
+            segment = self._main if in_main[candidate] else self._delta
+            row_words = segment.bits[:, positions[candidate]]
+            seq = int(seqs[candidate])
+            results.append(Candidate(
+                analysis_id=self._ids[12 * seq:12 * seq + 12].hex(),
+                rating=float(ratings[candidate]),
+                match_percentage=int(percentage_of[overlap[candidate]]),
+                matched_skills=[
+                    name for name, bit in required
+                    if bit is not None and int(row_words[bit // 64]) >> (bit % 64) & 1
+                ],
+            ))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "resumes": self.live,
+            "skills": len(self.skill_names),
+            "main_rows": len(self._main.ratings),
+            "delta_rows": self._delta_size,
+            "merges": self.merges,
+            "caught_up": self.caught_up,
+            "last_seen": str(self._last_seen) if self._last_seen is not None else None,
+            "last_rebuild_ms": self.last_rebuild_ms,
+        }
@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+
+from catalog_snapshot import CatalogFile
+from internship_listing import InternshipListing
+from recommendation_engine import RecommendationEngine
+from semantic_ranker import SemanticRanker
+from skill_matcher import SkillMatcher
+
+try:
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogLoadError(Exception):
+    pass
+
+
+class InternshipRecord(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: int
+    title: str
+    company: str
+    location: str
+    skills_required: List[str]
+    score_range: List[int]
+    category: str
+    description: str
+
+    @field_validator("score_range")
+    @classmethod
+    def check_score_range(cls, value: List[int]) -> List[int]:
+        if len(value) != 2 or value[0] > value[1]:
+            raise ValueError("score_range must be [low, high] with low <= high")
+        return value
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One immutable catalog version together with every index derived from it."""
+
+    version: int
+    content_hash: str
+    loaded_at: datetime
+    source: str
+    internships: Sequence[dict]
+    matcher: SkillMatcher
+    engine: RecommendationEngine
+    listing: InternshipListing
+    rejected: int = 0
+    by_id: Mapping[int, dict] = field(default_factory=dict)
+    semantic: Optional[SemanticRanker] = None
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "content_hash": self.content_hash,
+            "loaded_at": self.loaded_at,
+            "source": self.source,
+            "count": len(self.internships),
+            "rejected": self.rejected,
+        }
+
+
+def validate_records(raw_records: Any) -> Tuple[List[dict], int]:
+    if not isinstance(raw_records, list):
+        raise CatalogLoadError("Catalog must be a list of internships")
+
+    records = []
+    seen_ids = set()
+    rejected = 0
+    for index, raw in enumerate(raw_records):
+        try:
+            record = InternshipRecord.model_validate(raw).model_dump()
+        except ValidationError as e:
+            logger.warning(f"Skipping invalid internship at index {index}: {e.errors()}")
+            rejected += 1
+            continue
+        if record["id"] in seen_ids:
+            logger.warning(f"Skipping duplicate internship id {record['id']}")
+            rejected += 1
+            continue
+        seen_ids.add(record["id"])
+        records.append(record)
+    return records, rejected
+
+
+def build_snapshot(raw_records: Any, content_hash: str, version: int, source: str) -> CatalogSnapshot:
+    records, rejected = validate_records(raw_records)
+    if raw_records and not records:
+        raise CatalogLoadError("Catalog has no valid internships")
+
+    matcher = SkillMatcher.from_internships(records)
+    return CatalogSnapshot(
+        version=version,
+        content_hash=content_hash,
+        loaded_at=datetime.utcnow(),
+        source=source,
+        internships=records,
+        matcher=matcher,
+        engine=RecommendationEngine(records, matcher),
+        listing=InternshipListing(records, matcher, version),
+        rejected=rejected,
+        by_id={record["id"]: record for record in records},
+        semantic=SemanticRanker(records, matcher),
+    )
+
+
+def build_snapshot_from_file(catalog_file: CatalogFile, content_hash: str, version: int, source: str) -> CatalogSnapshot:
+    """Indexes over a mapped snapshot file, whose records were validated when it was compiled.
+
+    Every index is built from the file's columns, so no record is decoded here.
+    """
+    records = catalog_file.records
+    matcher = SkillMatcher(catalog_file.skill_names)
+    columns = catalog_file.columns(matcher)
+    return CatalogSnapshot(
+        version=version,
+        content_hash=content_hash,
+        loaded_at=datetime.utcnow(),
+        source=source,
+        internships=records,
+        matcher=matcher,
+        engine=RecommendationEngine(records, matcher, columns),
+        listing=InternshipListing(
+            records, matcher, version,
+            index=catalog_file.listing_index(columns), full_page=catalog_file.full_page,
+        ),
+        rejected=catalog_file.rejected,
+        by_id=catalog_file.by_id,
+        semantic=SemanticRanker(records, matcher, text_index=catalog_file.text_index(), columns=columns),
+    )
+
+
+class CatalogManager:
+    """Loads, validates and hot-swaps the internship catalog.
+
+    The catalog is read from a JSON file, with ``source="mongo"`` from a
+    collection, or with ``source="snapshot"`` from a compiled snapshot file
+    (see ``catalog_snapshot``) that is memory-mapped rather than parsed. Each successful load builds a complete ``CatalogSnapshot`` in a
+    worker thread and then replaces ``current`` with a single reference
+    assignment. A request that reads ``current`` once therefore sees one
+    consistent version from start to finish, and in-flight requests are never
+    blocked by a rebuild. Failed reloads keep serving the previous version.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        collection=None,
+        source: str = "file",
+        poll_interval: float = 5.0,
+    ):
+        if source not in ("file", "mongo", "snapshot"):
+            raise ValueError(f"Unknown catalog source: {source}")
+        if source == "mongo" and collection is None:
+            raise ValueError("A collection is required for the mongo catalog source")
+        self.path = Path(path)
+        self.collection = collection
+        self.source = source
+        self.poll_interval = poll_interval
+        self._current: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._reload_lock = asyncio.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    @property
+    def current(self) -> CatalogSnapshot:
+        if self._current is None:
+            raise CatalogLoadError("Catalog has not been loaded")
+        return self._current
+
+    @property
+    def loaded(self) -> bool:
+        return self._current is not None
+
+    async def _fetch(self) -> Tuple[Any, str]:
+        if self.source == "snapshot":
+            catalog_file = await asyncio.to_thread(CatalogFile, self.path)
+            return catalog_file, catalog_file.content_hash
+        if self.source == "file":
+            raw = await asyncio.to_thread(self.path.read_bytes)
+            return json.loads(raw), hashlib.sha256(raw).hexdigest()
+
+        docs = await self.collection.find({}, {"_id": 0}).sort("id", 1).to_list(None)
+        canonical = json.dumps(docs, sort_keys=True, default=str).encode("utf-8")
+        return docs, hashlib.sha256(canonical).hexdigest()
+
+    async def reload(self, force: bool = False) -> bool:
+        """Load the catalog and swap it in if its content changed."""
+        async with self._reload_lock:
+            try:
+                raw_records, content_hash = await self._fetch()
+            except Exception as e:
+                raise CatalogLoadError(f"Error reading catalog from {self.source}: {e}") from e
+
+            if not force and self._current is not None and self._current.content_hash == content_hash:
+                return False
+
+            build = build_snapshot_from_file if self.source == "snapshot" else build_snapshot
+            snapshot = await asyncio.to_thread(build, raw_records, content_hash, self._version + 1, self.source)
+            self._version = snapshot.version
+            self._current = snapshot
+            logger.info(
+                f"Catalog version {snapshot.version} loaded from {self.source}: "
+                f"{len(snapshot.internships)} internships, {snapshot.rejected} rejected"
+            )
+            return True
+
+    async def _try_reload(self):
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Catalog reload failed, keeping version {self._version}: {e}")
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    async def _watch_file(self):
+        if awatch is not None:
+            # Watch the directory so atomic replace-by-rename is picked up too
+            async for changes in awatch(self.path.parent, stop_event=self._stop):
+                if any(Path(changed).name == self.path.name for _, changed in changes):
+                    await self._try_reload()
+            return
+
+        signature = self._file_signature()
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            current = self._file_signature()
+            if current is not None and current != signature:
+                signature = current
+                await self._try_reload()
+
+    async def _watch_mongo(self):
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                await self._try_reload()
+
+    def start_watching(self):
+        if self._watch_task is None:
+            self._stop.clear()
+            watch = self._watch_mongo if self.source == "mongo" else self._watch_file
+            self._watch_task = asyncio.create_task(watch())
+
+    async def stop_watching(self):
+        if self._watch_task is not None:
+            self._stop.set()
+            try:
+                await asyncio.wait_for(self._watch_task, timeout=5)
+            except asyncio.TimeoutError:
+                self._watch_task.cancel()
+            except Exception as e:
+                logger.error(f"Catalog watcher stopped with an error: {e}")
+            self._watch_task = None
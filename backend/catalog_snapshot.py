@@ -0,0 +1,378 @@
+"""Compiled, memory-mappable catalog snapshots.
+
+A snapshot file holds one validated catalog in columnar form so that every
+worker can map the same file read-only instead of parsing JSON into its own
+list of dicts: the page cache keeps one physical copy however many workers
+there are, and opening it costs a header parse.
+
+Layout (little-endian)::
+
+    magic (8 bytes) | header length (uint32) | JSON header | sections...
+
+The header records the catalog's content hash, count and the offset, dtype
+and length of every section. Sections start on 8-byte boundaries:
+
+* ``id`` (int64) and ``score_range`` (int16 pairs), one entry per internship;
+* ``title``, ``company``, ``location``, ``category``, ``description``: uint32
+  indexes into the shared, de-duplicated ``strings`` table;
+* ``skills_indptr``/``skills``: each internship's required skills as uint32
+  IDs into the ``skill_names`` table, interned in first-seen order so the IDs
+  match ``SkillMatcher.from_internships``;
+* ``extras``: a JSON string per internship for fields outside the schema;
+* ``text_*``: the semantic ranker's TF-IDF postings, so workers need not
+  tokenize the catalog again;
+* ``full_page``: the whole catalog serialized as the unfiltered
+  ``GET /api/internships`` body, whose ETag is in the header.
+
+Workers build their ranking and filter indexes from these columns without
+decoding any record; records are decoded only when a response needs them.
+
+A string table is a uint64 offsets section and a byte section.
+
+Build one with ``python catalog_snapshot.py --output catalog.snapshot`` (from
+``thing.json``) or ``--mongo`` (from the catalog collection), and serve it
+with ``CATALOG_SOURCE=snapshot``.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from internship_listing import ListingIndex, ListingPage, serialize_page
+from recommendation_engine import CatalogColumns, group_positions
+from semantic_ranker import TextIndex, build_text_index
+from skill_matcher import SkillMatcher
+
+MAGIC = b"SSCATv1\n"
+FORMAT_VERSION = 2
+STRING_COLUMNS = ("title", "company", "location", "category", "description")
+SCHEMA_FIELDS = frozenset(("id", "skills_required", "score_range") + STRING_COLUMNS)
+_ALIGN = 8
+
+
+class SnapshotFormatError(Exception):
+    pass
+
+
+class _Interner:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        return self.ids.setdefault(value, len(self.ids))
+
+    def table(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode("utf-8") for value in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def write_catalog_snapshot(
+    records: List[dict],
+    path: Path,
+    content_hash: str,
+    source: str,
+    rejected: int = 0,
+    text_index: Optional[TextIndex] = None,
+):
+    """Write validated ``records`` to ``path``, atomically replacing any previous snapshot."""
+    count = len(records)
+    strings, skill_names, extras = _Interner(), _Interner(), _Interner()
+    columns = {name: np.empty(count, dtype="<u4") for name in STRING_COLUMNS}
+    ids = np.empty(count, dtype="<i8")
+    score_range = np.empty((count, 2), dtype="<i2")
+    skills_indptr = np.zeros(count + 1, dtype="<u4")
+    skills: List[int] = []
+    extra_ids = np.empty(count, dtype="<u4")
+
+    for position, record in enumerate(records):
+        ids[position] = record["id"]
+        score_range[position] = record["score_range"]
+        for name in STRING_COLUMNS:
+            columns[name][position] = strings(record[name])
+        skills.extend(skill_names(skill) for skill in record["skills_required"])
+        skills_indptr[position + 1] = len(skills)
+        extra = {key: value for key, value in record.items() if key not in SCHEMA_FIELDS}
+        extra_ids[position] = extras(json.dumps(extra, separators=(",", ":"), ensure_ascii=False) if extra else "")
+
+    if text_index is None:
+        text_index = build_text_index(records)
+    text_terms = _Interner()
+    for term in text_index.terms:
+        text_terms(term)
+
+    sections: Dict[str, np.ndarray] = {"id": ids, "score_range": score_range.reshape(-1), **columns}
+    sections["skills_indptr"] = skills_indptr
+    sections["skills"] = np.asarray(skills, dtype="<u4")
+    sections["extras"] = extra_ids
+    for name, interner in (("strings", strings), ("skill_names", skill_names), ("extras_table", extras), ("text_terms", text_terms)):
+        sections[f"{name}_offsets"], sections[f"{name}_data"] = interner.table()
+    sections["text_idf"] = text_index.idf.astype("<f4")
+    sections["text_indptr"] = text_index.indptr.astype("<i8")
+    sections["text_docs"] = text_index.docs.astype("<i4")
+    sections["text_weights"] = text_index.weights.astype("<f4")
+    full_page = serialize_page(records)
+    sections["full_page"] = np.frombuffer(full_page.body, dtype=np.uint8)
+
+    header: Dict[str, Any] = {
+        "format": FORMAT_VERSION,
+        "count": count,
+        "content_hash": content_hash,
+        "source": source,
+        "rejected": rejected,
+        "built_at": datetime.utcnow().isoformat(),
+        "fields": sorted({key for record in records for key in record}),
+        "full_page_etag": full_page.etag,
+        "sections": {},
+    }
+    # Offsets depend on the header's own length, so size it with placeholder offsets first
+    offset = 0
+    for name, array in sections.items():
+        header["sections"][name] = {"offset": offset, "dtype": array.dtype.str, "length": int(array.size)}
+        offset += -(-array.nbytes // _ALIGN) * _ALIGN
+    placeholder = json.dumps(header).encode("utf-8")
+    # Leave room for the offsets to grow by the header size itself
+    base = -(-(len(MAGIC) + 4 + len(placeholder) + 16 * len(sections)) // _ALIGN) * _ALIGN
+    for entry in header["sections"].values():
+        entry["offset"] += base
+    encoded = json.dumps(header).encode("utf-8")
+    encoded += b" " * (base - len(MAGIC) - 4 - len(encoded))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as f:
+        try:
+            f.write(MAGIC)
+            f.write(len(encoded).to_bytes(4, "little"))
+            f.write(encoded)
+            for array in sections.values():
+                data = array.tobytes()
+                f.write(data)
+                f.write(b"\0" * (-len(data) % _ALIGN))
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            os.unlink(f.name)
+            raise
+    # Workers still mapping the old file keep their inode until they reload
+    os.replace(f.name, path)
+
+
+class CatalogFile:
+    """A snapshot file mapped read-only; columns are NumPy views straight onto the mapping."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise SnapshotFormatError(f"{self.path} is not a catalog snapshot")
+        header_length = int.from_bytes(self._map[len(MAGIC):len(MAGIC) + 4], "little")
+        try:
+            self.header = json.loads(self._map[len(MAGIC) + 4:len(MAGIC) + 4 + header_length])
+        except ValueError as e:
+            raise SnapshotFormatError(f"Corrupt snapshot header in {self.path}: {e}") from e
+        if self.header.get("format") != FORMAT_VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot format {self.header.get('format')}")
+
+        self.count: int = self.header["count"]
+        self.content_hash: str = self.header["content_hash"]
+        self.rejected: int = self.header.get("rejected", 0)
+        self._sections: Dict[str, np.ndarray] = {}
+        for name, entry in self.header["sections"].items():
+            if entry["offset"] + entry["length"] * np.dtype(entry["dtype"]).itemsize > len(self._map):
+                raise SnapshotFormatError(f"Section {name} runs past the end of {self.path}")
+            self._sections[name] = np.frombuffer(
+                self._map, dtype=entry["dtype"], count=entry["length"], offset=entry["offset"]
+            )
+        self._ids = self._sections["id"]
+        # record() runs once per internship on every index build, so it reads through memoryviews,
+        # whose items are plain ints, and slices string bytes straight off the mapping
+        self._tables = {
+            table: (memoryview(self._sections[f"{table}_offsets"]), self.header["sections"][f"{table}_data"]["offset"])
+            for table in ("strings", "skill_names", "extras_table", "text_terms")
+        }
+        self._ids_view = memoryview(self._ids)
+        self._score_range = memoryview(self._sections["score_range"])
+        self._skills_indptr = memoryview(self._sections["skills_indptr"])
+        self._skills = memoryview(self._sections["skills"])
+        self._extras = memoryview(self._sections["extras"])
+        self._string_columns = [(name, memoryview(self._sections[name])) for name in STRING_COLUMNS]
+        self.skill_names = self._strings("skill_names")
+        self.records = CatalogRecords(self)
+        self.by_id = CatalogIdIndex(self)
+
+    def _string(self, table: str, index: int) -> str:
+        offsets, base = self._tables[table]
+        return self._map[base + offsets[index]:base + offsets[index + 1]].decode("utf-8")
+
+    def _strings(self, table: str) -> List[str]:
+        offsets, base = self._tables[table]
+        data = self._map[base:base + offsets[len(offsets) - 1]]
+        bounds = offsets.tolist()
+        return [data[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+
+    def record(self, position: int) -> dict:
+        """The internship at ``position`` as the same dict the JSON catalog would produce."""
+        record: Dict[str, Any] = {"id": self._ids_view[position]}
+        for name, column in self._string_columns[:3]:
+            record[name] = self._string("strings", column[position])
+        start, end = self._skills_indptr[position], self._skills_indptr[position + 1]
+        record["skills_required"] = [self.skill_names[skill_id] for skill_id in self._skills[start:end]]
+        record["score_range"] = [self._score_range[2 * position], self._score_range[2 * position + 1]]
+        for name, column in self._string_columns[3:]:
+            record[name] = self._string("strings", column[position])
+        extra = self._string("extras_table", self._extras[position])
+        if extra:
+            record.update(json.loads(extra))
+        return record
+
+    def _skill_ids(self, matcher: SkillMatcher) -> np.ndarray:
+        """``matcher``'s ID for every skill occurrence, -1 where it has none."""
+        known = np.array([
+            -1 if skill_id is None else skill_id
+            for skill_id in map(matcher.skill_id, self.skill_names)
+        ], dtype=np.int64)
+        return known[self._sections["skills"]] if len(known) else np.empty(0, dtype=np.int64)
+
+    def columns(self, matcher: SkillMatcher) -> CatalogColumns:
+        score_range = self._sections["score_range"].reshape(-1, 2)
+        return CatalogColumns(
+            lows=score_range[:, 0],
+            highs=score_range[:, 1],
+            skills_indptr=self._sections["skills_indptr"].astype(np.int64),
+            skill_ids=self._skill_ids(matcher),
+        )
+
+    def _string_groups(self, column: str) -> Dict[str, List[int]]:
+        """Positions per lowercased value of a string column, ascending."""
+        groups: Dict[str, List[int]] = {}
+        for string_id, positions in group_positions(self._sections[column], np.arange(self.count)).items():
+            key = self._string("strings", string_id).lower()
+            # Values differing only in case share a key
+            groups[key] = sorted(groups[key] + positions) if key in groups else positions
+        return groups
+
+    def listing_index(self, columns: CatalogColumns) -> ListingIndex:
+        skill_ids, owners = columns.skill_positions()
+        # Each skill once per position, ordered by skill then position
+        pairs = np.unique(skill_ids * max(self.count, 1) + owners)
+        ranges: Dict[Tuple[int, int], List[int]] = {}
+        for position, bounds in enumerate(zip(columns.lows.tolist(), columns.highs.tolist())):
+            ranges.setdefault(bounds, []).append(position)
+        return ListingIndex(
+            fields=frozenset(self.header["fields"]),
+            positions_by_id=dict(zip(self._ids.tolist(), range(self.count))),
+            by_category=self._string_groups("category"),
+            by_location=self._string_groups("location"),
+            by_skill=group_positions(pairs // max(self.count, 1), pairs % max(self.count, 1)),
+            ranges=sorted(ranges.items()),
+        )
+
+    def full_page(self) -> ListingPage:
+        """The stored unfiltered listing; copies the body out of the mapping."""
+        entry = self.header["sections"]["full_page"]
+        body = self._map[entry["offset"]:entry["offset"] + entry["length"]]
+        return ListingPage(body=body, etag=self.header["full_page_etag"], total=self.count, next_cursor=None)
+
+    def text_index(self) -> TextIndex:
+        return TextIndex(
+            terms=self._strings("text_terms"),
+            idf=self._sections["text_idf"],
+            indptr=self._sections["text_indptr"],
+            docs=self._sections["text_docs"],
+            weights=self._sections["text_weights"],
+        )
+
+
+class CatalogRecords(Sequence):
+    """Read-only list-like view of a snapshot's internships, decoded on access."""
+
+    def __init__(self, catalog_file: CatalogFile):
+        self._file = catalog_file
+
+    def __len__(self) -> int:
+        return self._file.count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._file.record(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("catalog position out of range")
+        return self._file.record(position)
+
+    def __iter__(self) -> Iterator[dict]:
+        for position in range(len(self)):
+            yield self._file.record(position)
+
+
+class CatalogIdIndex(Mapping):
+    """Read-only ``{id: internship}`` view of a snapshot, searched in a sorted copy of the id column."""
+
+    def __init__(self, catalog_file: CatalogFile):
+        self._file = catalog_file
+        self._order = np.argsort(catalog_file._ids, kind="stable")
+        self._sorted_ids = catalog_file._ids[self._order]
+
+    def __getitem__(self, internship_id) -> dict:
+        if not isinstance(internship_id, (int, np.integer)):
+            raise KeyError(internship_id)
+        index = int(np.searchsorted(self._sorted_ids, internship_id))
+        if index == len(self._sorted_ids) or self._sorted_ids[index] != internship_id:
+            raise KeyError(internship_id)
+        return self._file.record(int(self._order[index]))
+
+    def __len__(self) -> int:
+        return self._file.count
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(internship_id) for internship_id in self._file._ids)
+
+
+def main():
+    # Imported here: catalog imports this module for the loader
+    from catalog import validate_records
+
+    parser = argparse.ArgumentParser(description="Compile the internship catalog into a snapshot file.")
+    parser.add_argument("--input", default=Path(__file__).parent.parent / "frontend" / "public" / "thing.json",
+                        help="Catalog JSON file (default: frontend/public/thing.json)")
+    parser.add_argument("--mongo", action="store_true",
+                        help="Read the catalog from MONGO_URL / DB_NAME / CATALOG_COLLECTION instead")
+    parser.add_argument("--output", default=Path(__file__).parent / "catalog.snapshot")
+    args = parser.parse_args()
+
+    if args.mongo:
+        from pymongo import MongoClient
+
+        client = MongoClient(os.environ["MONGO_URL"])
+        collection = client[os.environ["DB_NAME"]][os.environ.get("CATALOG_COLLECTION", "internships")]
+        raw_records = list(collection.find({}, {"_id": 0}).sort("id", 1))
+        # Same hash as CatalogManager computes for the mongo source
+        content_hash = hashlib.sha256(json.dumps(raw_records, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        source = "mongo"
+    else:
+        raw = Path(args.input).read_bytes()
+        raw_records, content_hash, source = json.loads(raw), hashlib.sha256(raw).hexdigest(), "file"
+
+    records, rejected = validate_records(raw_records)
+    if not records:
+        sys.exit("Catalog has no valid internships")
+    write_catalog_snapshot(records, Path(args.output), content_hash, source, rejected)
+    print(f"Wrote {len(records)} internships ({rejected} rejected) to {args.output} "
+          f"({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import re
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Sequence
+
+from resume_sections import detect_sections
+from skill_matcher import SkillMatcher
+
+# The skill vocabulary the Gemini prompt draws its suggestions from
+SUGGESTED_SKILLS = [
+    "Node.js", "Express", "PostgreSQL", "Docker", "React", "TypeScript", "TailwindCSS", "REST APIs",
+    "MERN Stack", "GitHub Actions", "Git", "AWS", "Kubernetes", "CI/CD", "Jenkins", "Linux", "Flutter",
+    "Firebase", "Dart", "Python", "NLP", "Transformers", "FastAPI", "OpenCV", "TensorFlow",
+    "Deep Learning", "SQL", "ETL", "Apache Spark", "SIEM Tools", "Threat Analysis", "Networking",
+    "Burp Suite", "OWASP", "Solidity", "Ethereum", "Web3.js", "Smart Contracts",
+]
+
+# Skills that usually travel together, used to pick the most relevant suggestions
+SKILL_FAMILIES: Dict[str, List[str]] = {
+    "web development": ["React", "Node.js", "Express", "TypeScript", "REST APIs", "PostgreSQL", "TailwindCSS", "MERN Stack"],
+    "cloud and DevOps": ["Docker", "Kubernetes", "CI/CD", "AWS", "GitHub Actions", "Jenkins", "Linux", "Git"],
+    "mobile development": ["Flutter", "Dart", "Firebase", "REST APIs", "Git"],
+    "machine learning": ["Python", "TensorFlow", "Deep Learning", "NLP", "Transformers", "OpenCV", "FastAPI"],
+    "data engineering": ["SQL", "Python", "ETL", "Apache Spark", "PostgreSQL", "AWS"],
+    "cybersecurity": ["Networking", "Linux", "Threat Analysis", "SIEM Tools", "Burp Suite", "OWASP"],
+    "blockchain": ["Solidity", "Ethereum", "Smart Contracts", "Web3.js", "Node.js"],
+}
+
+# Broadly useful skills suggested when no family stands out
+FOUNDATION_SKILLS = ["Git", "SQL", "REST APIs", "Docker", "Python", "Linux"]
+
+ACTION_VERBS = frozenset({
+    "built", "developed", "designed", "implemented", "led", "created", "deployed", "optimized",
+    "optimised", "improved", "automated", "architected", "launched", "managed", "integrated",
+    "reduced", "increased", "migrated", "engineered", "delivered", "mentored", "analyzed", "analysed",
+})
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+_PROFILE_RE = re.compile(r"(linkedin\.com|github\.com|gitlab\.com|portfolio)", re.IGNORECASE)
+_YEARS_RE = re.compile(r"(\d{1,2})\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+_DATE_RANGE_RE = re.compile(
+    r"((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now|ongoing)",
+    re.IGNORECASE,
+)
+_METRIC_RE = re.compile(r"\d+(?:\.\d+)?\s*(?:%|x\b|\+|k\b|ms\b|users|customers|requests)", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+class FastAnalyzer:
+    """Deterministic, local resume analyzer used when Gemini is not.
+
+    The rating comes from section coverage, skills found in the same
+    vocabulary the Gemini prompt uses, experience signals (stated years,
+    date ranges under the experience section), quantified impact and action
+    verbs, contact details and length. Strengths, weaknesses and suggestions
+    use the same phrasing as the Gemini prompt asks for, so the frontend
+    renders both alike. Cost is linear in the resume's length.
+    """
+
+    def __init__(self, vocabulary: Sequence[str] = SUGGESTED_SKILLS):
+        self.vocabulary = list(vocabulary)
+        self.matcher = SkillMatcher(self.vocabulary)
+
+    def _experience_years(self, text: str, experience: str) -> float:
+        stated = [int(years) for years in _YEARS_RE.findall(text)]
+        spans = 0.0
+        current_year = datetime.utcnow().year
+        for start, end in _DATE_RANGE_RE.findall(experience):
+            end_year = current_year if not end[:2].isdigit() else int(end)
+            spans += max(0, min(end_year, current_year) - int(start)) or 0.5
+        return max(max(stated, default=0), spans)
+
+    def _suggest(self, found: FrozenSet[str]) -> List[str]:
+        def family_score(item):
+            _, skills = item
+            return sum(skill in found for skill in skills)
+
+        ranked = [item for item in sorted(SKILL_FAMILIES.items(), key=family_score, reverse=True) if family_score(item)]
+        suggestions: List[str] = []
+        for _, skills in ranked[:2]:
+            suggestions.extend(skill for skill in skills if skill not in found and skill not in suggestions)
+        suggestions.extend(skill for skill in FOUNDATION_SKILLS if skill not in found and skill not in suggestions)
+        return suggestions[:4]
+
+    def analyze(self, resume_text: str, mode: str = "fast") -> dict:
+        sections = detect_sections(resume_text)
+        words = _WORD_RE.findall(resume_text.lower())
+        found = frozenset(self.matcher.skill_names[skill_id] for skill_id in self.matcher.match(resume_text))
+        found_ordered = [skill for skill in self.vocabulary if skill in found]
+        experience = sections.get("experience", "")
+        years = self._experience_years(resume_text, experience)
+        impact = sections.get("experience", "") + "\n" + sections.get("projects", "")
+        metrics = len(_METRIC_RE.findall(impact))
+        verbs = sum(word in ACTION_VERBS for word in _WORD_RE.findall(impact.lower()))
+        has_contact = bool(_EMAIL_RE.search(resume_text) or _PHONE_RE.search(resume_text))
+        has_profile = bool(_PROFILE_RE.search(resume_text))
+
+        # Each signal is capped so the components add up to at most 10
+        rating = 1.0
+        rating += 0.5 * sum(name in sections for name in ("education", "skills", "summary"))
+        rating += 1.0 if "experience" in sections else 0.0
+        rating += 1.0 if "projects" in sections else 0.0
+        rating += min(len(found), 10) * 0.2
+        rating += min(years, 3) * 0.5
+        rating += min(metrics, 4) * 0.25
+        rating += min(verbs, 5) * 0.1
+        rating += 0.25 if has_contact else 0.0
+        rating += 0.25 if has_profile else 0.0
+        if len(words) < 150:
+            rating -= 1.0
+        elif len(words) > 1200:
+            rating -= 0.5
+        rating = round(max(0.0, min(10.0, rating)) * 2) / 2
+
+        strengths = [f"  Strong in {skill}" for skill in found_ordered[:3]]
+        if years >= 1:
+            strengths.append(f"  Strong in hands-on experience ({years:g}+ years)")
+        if metrics >= 2:
+            strengths.append("  Strong in presenting quantified impact")
+        if "projects" in sections and verbs >= 3:
+            strengths.append("  Strong in describing project ownership")
+        if not strengths:
+            strengths.append("  Strong in willingness to learn")
+
+        weaknesses = []
+        if "experience" not in sections:
+            weaknesses.append("  Needs improvement in professional or internship experience")
+        if "projects" not in sections:
+            weaknesses.append("  Weak in showcasing projects")
+        if len(found) < 3:
+            weaknesses.append("  Weak in listed technical skills")
+        if metrics == 0:
+            weaknesses.append("  Needs improvement in quantifying achievements")
+        if not has_profile:
+            weaknesses.append("  Needs improvement in linking GitHub or LinkedIn profiles")
+        if len(words) < 150:
+            weaknesses.append("  Needs improvement in resume detail and length")
+        if not weaknesses:
+            weaknesses.append("  Needs improvement in depth of specialised skills")
+
+        suggestions = [f"  Suggest adding {skill}" for skill in self._suggest(found)]
+        if metrics == 0:
+            suggestions.append("  Suggest improving bullet points with measurable results")
+
+        missing = [name for name in ("education", "experience", "projects", "skills") if name not in sections]
+        raw_analysis = (
+            f"Heuristic analysis. Sections found: {', '.join(sorted(sections)) or 'none'}. "
+            f"Missing sections: {', '.join(missing) or 'none'}. "
+            f"Recognised skills: {', '.join(found_ordered) or 'none'}. "
+            f"Estimated experience: {years:g} years. Quantified results: {metrics}. "
+            f"Word count: {len(words)}."
+        )
+        return {
+            "overall_rating": rating,
+            "strengths": strengths[:4],
+            "weaknesses": weaknesses[:4],
+            "suggestions": suggestions[:5],
+            "raw_analysis": raw_analysis,
+            "analysis_mode": mode,
+        }
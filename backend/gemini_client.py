@@ -0,0 +1,236 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_MODEL = "gemini-2.0-flash"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class GeminiError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        # Transport errors and timeouts carry no status code and are worth retrying
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _candidate_parts(data: Any) -> Optional[List[Dict[str, Any]]]:
+    """Parts of the first candidate, or None when the body has no candidates (e.g. a safety block)."""
+    if not isinstance(data, dict):
+        raise GeminiError(f"Malformed Gemini response: expected an object, got {type(data).__name__}")
+    candidates = data.get('candidates')
+    if not candidates:
+        return None
+    parts = candidates[0].get('content', {}).get('parts', []) if isinstance(candidates[0], dict) else None
+    if not isinstance(parts, list):
+        raise GeminiError("Malformed Gemini response: candidate has no parts list")
+    return parts
+
+
+def _block_reason(data: Dict[str, Any]) -> str:
+    return (data.get('promptFeedback') or {}).get('blockReason', 'none given')
+
+
+class GeminiClient:
+    """Async Gemini client sharing one keep-alive connection pool per worker.
+
+    The pool is opened by ``start()`` from the app lifespan and released by
+    ``aclose()`` on shutdown, so every request reuses warm connections instead
+    of paying a TCP/TLS handshake per upload.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = GEMINI_BASE_URL,
+        model: str = GEMINI_MODEL,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        write_timeout: float = 10.0,
+        pool_timeout: float = 5.0,
+        http2: bool = True,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self.http2 = http2 and _http2_available()
+        self._client: Optional[httpx.AsyncClient] = None
+        # Token totals from the usageMetadata Gemini reports with each response
+        self.metered_responses = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    @property
+    def generate_url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:generateContent"
+
+    @property
+    def stream_url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:streamGenerateContent"
+
+    def _auth_headers(self) -> dict:
+        # Sent as a header rather than ?key= so the key never lands in access logs
+        return {"x-goog-api-key": self.api_key} if self.api_key else {}
+
+    def _record_usage(self, usage: Optional[Dict[str, Any]]):
+        if not usage:
+            return
+        self.metered_responses += 1
+        self.prompt_tokens += usage.get("promptTokenCount", 0)
+        self.output_tokens += usage.get("candidatesTokenCount", 0)
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                headers={"Content-Type": "application/json"},
+            )
+            logger.info(
+                f"Gemini client started (http2={self.http2}, "
+                f"max_connections={self.limits.max_connections})"
+            )
+
+    async def warm_up(self) -> bool:
+        """Open a pooled connection (DNS, TCP, TLS and HTTP/2 set-up) with a free model lookup.
+
+        Returns whether Gemini answered at all; any status code counts, since
+        only the connection matters here.
+        """
+        if self._client is None:
+            raise GeminiError("Gemini client is not started")
+        try:
+            await self._client.get(f"{self.base_url}/models/{self.model}", headers=self._auth_headers())
+        except httpx.HTTPError as e:
+            logger.warning(f"Gemini warm-up request failed: {e!r}")
+            return False
+        return True
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate_content(self, prompt: str) -> str:
+        if self._client is None:
+            raise GeminiError("Gemini client is not started")
+
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        try:
+            response = await self._client.post(
+                self.generate_url,
+                headers=self._auth_headers(),
+                json=payload,
+            )
+        except httpx.HTTPError as e:
+            raise GeminiError(f"Error calling Gemini API: {e!r}") from e
+
+        if response.status_code != 200:
+            raise GeminiError(
+                f"Gemini API error: {response.status_code} - {response.text}",
+                status_code=response.status_code,
+                retry_after=_retry_after(response),
+            )
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise GeminiError(f"Malformed Gemini response: {e}", status_code=response.status_code) from e
+        parts = _candidate_parts(data)
+        self._record_usage(data.get('usageMetadata'))
+        if not parts:
+            raise GeminiError(
+                f"Gemini returned no content (block reason: {_block_reason(data)})",
+                status_code=response.status_code,
+            )
+        return parts[0].get('text', '')
+
+    async def stream_generate_content(self, prompt: str) -> AsyncIterator[str]:
+        """Yield response text as Gemini produces it, via ``streamGenerateContent?alt=sse``.
+
+        The connection is released when the iterator is exhausted or closed,
+        so callers that stop early should close it (``contextlib.aclosing``).
+        """
+        if self._client is None:
+            raise GeminiError("Gemini client is not started")
+
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        usage = None
+        try:
+            async with self._client.stream(
+                "POST",
+                self.stream_url,
+                params={"alt": "sse"},
+                headers=self._auth_headers(),
+                json=payload,
+            ) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    raise GeminiError(
+                        f"Gemini API error: {response.status_code} - {body}",
+                        status_code=response.status_code,
+                        retry_after=_retry_after(response),
+                    )
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = json.loads(line[5:])
+                    parts = _candidate_parts(data)
+                    # Each event repeats the running totals; the last one counts
+                    usage = data.get('usageMetadata', usage)
+                    if parts is None and 'promptFeedback' in data:
+                        raise GeminiError(f"Gemini returned no content (block reason: {_block_reason(data)})", status_code=200)
+                    for part in parts or []:
+                        if part.get('text'):
+                            yield part['text']
+        except httpx.HTTPError as e:
+            raise GeminiError(f"Error calling Gemini API: {e!r}") from e
+        except ValueError as e:
+            raise GeminiError(f"Malformed Gemini stream event: {e}") from e
+        finally:
+            self._record_usage(usage)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "metered_responses": self.metered_responses,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+        }
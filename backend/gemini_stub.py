@@ -0,0 +1,86 @@
+"""Local stand-in for the Gemini ``generateContent`` and ``streamGenerateContent`` APIs.
+
+Mounted only when ``GEMINI_STUB_ENABLED`` is set. Point ``GEMINI_BASE_URL`` at
+``http://127.0.0.1:8001/api/stub/gemini`` to load-test the analysis path with a
+fixed, configurable upstream latency and no network access.
+The streaming endpoint spreads the same latency over several SSE chunks.
+``GEMINI_STUB_ERROR_RATE`` makes that fraction of calls fail with 503, to
+exercise retries and the circuit breaker. Responses carry ``usageMetadata``
+with token counts estimated at four characters per token. ``GET
+/models/{model}`` answers the client's warm-up request immediately.
+"""
+import asyncio
+import json
+import os
+import random
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STUB_LATENCY_MS = float(os.environ.get('GEMINI_STUB_LATENCY_MS', '800'))
+STUB_ERROR_RATE = float(os.environ.get('GEMINI_STUB_ERROR_RATE', '0'))
+
+STUB_ANALYSIS = {
+    "overall_rating": 7.0,
+    "strengths": ["  Strong in Python", "  Strong in REST APIs"],
+    "weaknesses": ["  Weak in cloud deployment", "  Needs improvement in testing"],
+    "suggestions": ["  Suggest adding Docker", "  Suggest adding AWS", "  Suggest adding Kubernetes", "  Suggest adding CI/CD"],
+    "raw_analysis": "Stub analysis generated locally for load testing.",
+}
+
+stub_router = APIRouter(prefix="/stub/gemini")
+
+
+async def _usage(request: Request, output: str) -> dict:
+    payload = await request.json()
+    prompt = "".join(part.get("text", "") for content in payload.get("contents", []) for part in content.get("parts", []))
+    prompt_tokens = -(-len(prompt) // 4)
+    output_tokens = -(-len(output) // 4)
+    return {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens, "totalTokenCount": prompt_tokens + output_tokens}
+
+
+@stub_router.get("/models/{model}")
+async def stub_get_model(model: str):
+    return {"name": f"models/{model}", "displayName": "SkillSync Gemini stub"}
+
+
+@stub_router.post("/models/{model}:generateContent")
+async def stub_generate_content(request: Request, model: str, latency_ms: Optional[float] = Query(None, ge=0)):
+    delay = STUB_LATENCY_MS if latency_ms is None else latency_ms
+    await asyncio.sleep(delay / 1000)
+    if STUB_ERROR_RATE and random.random() < STUB_ERROR_RATE:
+        return JSONResponse(status_code=503, content={"error": {"code": 503, "status": "UNAVAILABLE"}})
+    text = json.dumps(STUB_ANALYSIS)
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}]}}],
+        "usageMetadata": await _usage(request, text),
+        "modelVersion": model,
+    }
+
+
+@stub_router.post("/models/{model}:streamGenerateContent")
+async def stub_stream_generate_content(
+    request: Request,
+    model: str,
+    latency_ms: Optional[float] = Query(None, ge=0),
+    chunks: int = Query(8, ge=1, le=100),
+):
+    delay = (STUB_LATENCY_MS if latency_ms is None else latency_ms) / 1000
+    if STUB_ERROR_RATE and random.random() < STUB_ERROR_RATE:
+        await asyncio.sleep(delay)
+        return JSONResponse(status_code=503, content={"error": {"code": 503, "status": "UNAVAILABLE"}})
+
+    text = json.dumps(STUB_ANALYSIS)
+    size = -(-len(text) // chunks)
+    usage = await _usage(request, text)
+
+    async def events():
+        for start in range(0, len(text), size):
+            await asyncio.sleep(delay / chunks)
+            event = {"candidates": [{"content": {"parts": [{"text": text[start:start + size]}]}}], "modelVersion": model}
+            if start + size >= len(text):
+                event["usageMetadata"] = usage
+            yield f"data: {json.dumps(event)}\r\n\r\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+FieldCallback = Callable[[str, Any], None]
+
+_WHITESPACE = " \t\r\n"
+_VALUE_STARTS = '{["-0123456789tfn'
+
+
+class IncrementalJSONError(ValueError):
+    pass
+
+
+class IncrementalJSONParser:
+    """Parses one JSON object fed in arbitrary chunks, member by member.
+
+    ``feed`` returns each top-level ``(key, value)`` pair as soon as its value
+    is complete, so the first fields of a streamed response can be used while
+    the rest is still arriving. Anything that cannot be the start of the
+    expected object raises ``IncrementalJSONError`` at the offending
+    character rather than once the response has ended. Up to
+    ``max_preamble`` characters before the opening brace are skipped, which
+    covers a Markdown code fence or a short lead-in sentence; text after the
+    closing brace is ignored.
+    """
+
+    def __init__(self, max_preamble: int = 256):
+        self.max_preamble = max_preamble
+        self.result: Dict[str, Any] = {}
+        self._state = "preamble"
+        self._skipped = 0
+        self._key = ""
+        self._token: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self._state == "done"
+
+    def _fail(self, message: str):
+        raise IncrementalJSONError(message)
+
+    def _finish_value(self, out: List[Tuple[str, Any]]):
+        text = "".join(self._token)
+        try:
+            value = json.loads(text)
+        except ValueError:
+            self._fail(f"Invalid JSON value for {self._key!r}: {text[:80]!r}")
+        self.result[self._key] = value
+        out.append((self._key, value))
+        self._token = []
+        self._state = "comma_or_end"
+
+    def _start_value(self, ch: str):
+        if ch not in _VALUE_STARTS:
+            self._fail(f"Unexpected {ch!r} at the start of the value for {self._key!r}")
+        self._token = [ch]
+        self._depth = 1 if ch in "{[" else 0
+        self._in_string = ch == '"'
+        self._escape = False
+        self._state = "value"
+
+    def _value_char(self, ch: str, out: List[Tuple[str, Any]]):
+        if self._in_string:
+            self._token.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._depth == 0:
+                    self._finish_value(out)
+            return
+
+        if self._depth == 0:
+            # A number or literal ends at the first character that cannot continue it
+            if ch in _WHITESPACE or ch in ",}":
+                self._finish_value(out)
+                self._step(ch, out)
+                return
+            self._token.append(ch)
+            return
+
+        self._token.append(ch)
+        if ch == '"':
+            self._in_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._finish_value(out)
+
+    def _step(self, ch: str, out: List[Tuple[str, Any]]):
+        state = self._state
+        if state == "value":
+            self._value_char(ch, out)
+        elif state == "key":
+            self._token.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._key = json.loads("".join(self._token))
+                self._token = []
+                self._state = "colon"
+        elif ch in _WHITESPACE:
+            return
+        elif state == "preamble":
+            if ch == "{":
+                self._state = "key_or_end"
+            else:
+                self._skipped += 1
+                if self._skipped > self.max_preamble:
+                    self._fail("Response does not start with a JSON object")
+        elif state == "key_or_end":
+            if ch == '"':
+                self._token = [ch]
+                self._escape = False
+                self._state = "key"
+            elif ch == "}":
+                # Also tolerates a trailing comma before the closing brace
+                self._state = "done"
+            else:
+                self._fail(f"Expected a field name, got {ch!r}")
+        elif state == "colon":
+            if ch != ":":
+                self._fail(f"Expected ':' after {self._key!r}, got {ch!r}")
+            self._state = "value_start"
+        elif state == "value_start":
+            self._start_value(ch)
+        elif state == "comma_or_end":
+            if ch == ",":
+                self._state = "key_or_end"
+            elif ch == "}":
+                self._state = "done"
+            else:
+                self._fail(f"Expected ',' or '}}' after {self._key!r}, got {ch!r}")
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume ``chunk`` and return the top-level members it completed."""
+        out: List[Tuple[str, Any]] = []
+        for ch in chunk:
+            if self._state == "done":
+                break
+            self._step(ch, out)
+        return out
+
+    def close(self) -> Dict[str, Any]:
+        """The parsed object; raises if the input ended before it was complete."""
+        if self._state != "done":
+            self._fail("Response ended before the JSON object was complete")
+        return self.result
+
+
+class FieldFanout:
+    """Relays fields parsed from one upstream response to every interested caller.
+
+    Subscribers added late are replayed the fields already seen, so a caller
+    that joins a shared in-flight request misses nothing.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.closed = False
+        self._subscribers: List[FieldCallback] = []
+
+    def subscribe(self, callback: FieldCallback):
+        self._subscribers.append(callback)
+        for name, value in list(self.fields.items()):
+            callback(name, value)
+
+    def unsubscribe(self, callback: FieldCallback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, name: str, value: Any):
+        self.fields[name] = value
+        for callback in list(self._subscribers):
+            callback(name, value)
+
+    def close(self):
+        self.closed = True
+        self._subscribers.clear()
+
+
+def first_field(name: str) -> Tuple["asyncio.Future[Any]", FieldCallback]:
+    """A future resolved by the first ``name`` field, and the callback that feeds it."""
+    future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+
+    def on_field(field_name: str, value: Any):
+        if field_name == name and not future.done():
+            future.set_result(value)
+
+    return future, on_field
@@ -0,0 +1,220 @@
+import base64
+import binascii
+import hashlib
+import json
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from skill_matcher import SkillMatcher
+
+
+class ListingError(ValueError):
+    pass
+
+
+class ListingQuery(NamedTuple):
+    category: Optional[str] = None
+    location: Optional[str] = None
+    skills: Tuple[str, ...] = ()
+    score: Optional[float] = None
+    fields: Tuple[str, ...] = ()
+    offset: int = 0
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ListingPage:
+    body: bytes
+    etag: str
+    total: int
+    next_cursor: Optional[str]
+
+
+class ListingIndex(NamedTuple):
+    """Filter indexes over one catalog; position lists are in ascending order."""
+
+    fields: FrozenSet[str]
+    positions_by_id: Mapping[int, int]
+    by_category: Dict[str, List[int]]
+    by_location: Dict[str, List[int]]
+    by_skill: Dict[int, List[int]]
+    ranges: List[Tuple[Tuple[int, int], List[int]]]
+
+
+def build_listing_index(internships: Sequence[dict], matcher: SkillMatcher) -> ListingIndex:
+    by_category: Dict[str, List[int]] = {}
+    by_location: Dict[str, List[int]] = {}
+    by_skill: Dict[int, List[int]] = {}
+    ranges: Dict[Tuple[int, int], List[int]] = {}
+    for position, internship in enumerate(internships):
+        by_category.setdefault(internship["category"].lower(), []).append(position)
+        by_location.setdefault(internship["location"].lower(), []).append(position)
+        for skill_id in {matcher.skill_id(skill) for skill in internship["skills_required"]}:
+            if skill_id is not None:
+                by_skill.setdefault(skill_id, []).append(position)
+        low, high = internship["score_range"]
+        ranges.setdefault((low, high), []).append(position)
+    return ListingIndex(
+        fields=frozenset(key for internship in internships for key in internship),
+        positions_by_id={internship["id"]: position for position, internship in enumerate(internships)},
+        by_category=by_category,
+        by_location=by_location,
+        by_skill=by_skill,
+        ranges=sorted(ranges.items()),
+    )
+
+
+def _serialize(items: List[dict]) -> bytes:
+    return json.dumps(items, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def serialize_page(items: List[dict], total: Optional[int] = None, next_cursor: Optional[str] = None) -> ListingPage:
+    body = _serialize(items)
+    return ListingPage(body=body, etag=_etag(body), total=len(items) if total is None else total, next_cursor=next_cursor)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class InternshipListing:
+    """Filter indexes and pre-serialized response bodies for one catalog version.
+
+    Category, location and skill filters are answered from inverted indexes
+    and the score filter from the distinct score ranges, so a filtered page
+    never scans the catalog. Rendered pages are kept in a small LRU keyed on
+    the normalized query; because an instance belongs to exactly one catalog
+    snapshot, the cache and the ETags derived from it change only when the
+    catalog version does.
+
+    A prebuilt ``index`` and ``full_page`` loader (e.g. from a catalog
+    snapshot file, which stores the serialized catalog) skip the pass over the
+    records; the full page is then only read when it is first requested.
+    """
+
+    def __init__(
+        self,
+        internships: Sequence[dict],
+        matcher: SkillMatcher,
+        version: int,
+        cache_size: int = 256,
+        index: Optional[ListingIndex] = None,
+        full_page: Optional[Callable[[], ListingPage]] = None,
+    ):
+        self.internships = internships
+        self.matcher = matcher
+        self.version = version
+        self.cache_size = cache_size
+        index = index if index is not None else build_listing_index(internships, matcher)
+        self.fields = index.fields
+        self._positions_by_id = index.positions_by_id
+        self._by_category = index.by_category
+        self._by_location = index.by_location
+        self._by_skill = index.by_skill
+        self._ranges = index.ranges
+
+        self._full_page_loader = full_page
+        self._full_page: Optional[ListingPage] = None if full_page is not None else serialize_page(list(internships))
+        self._pages: "OrderedDict[ListingQuery, ListingPage]" = OrderedDict()
+
+    @property
+    def full_page(self) -> ListingPage:
+        if self._full_page is None:
+            self._full_page = self._full_page_loader()
+        return self._full_page
+
+    def _encode_cursor(self, last_id: int) -> str:
+        raw = json.dumps({"v": self.version, "id": last_id}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _cursor_position(self, cursor: str) -> int:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ListingError("Invalid cursor")
+        position = self._positions_by_id.get(last_id)
+        if position is None:
+            raise ListingError("Cursor no longer matches the catalog; restart pagination")
+        return position
+
+    def _filter(self, query: ListingQuery) -> List[int]:
+        selections = []
+        if query.category is not None:
+            selections.append(self._by_category.get(query.category.lower(), []))
+        if query.location is not None:
+            selections.append(self._by_location.get(query.location.lower(), []))
+        for skill in query.skills:
+            skill_id = self.matcher.skill_id(skill)
+            selections.append(self._by_skill.get(skill_id, []) if skill_id is not None else [])
+        if query.score is not None:
+            selections.append(sorted(
+                position
+                for (low, high), positions in self._ranges
+                if low <= query.score <= high
+                for position in positions
+            ))
+
+        if not selections:
+            return list(range(len(self.internships)))
+        selections.sort(key=len)
+        result = selections[0]
+        for other in selections[1:]:
+            if not result:
+                break
+            members = set(other)
+            result = [position for position in result if position in members]
+        return result
+
+    def _render(self, query: ListingQuery) -> ListingPage:
+        unknown = set(query.fields) - self.fields
+        if unknown:
+            raise ListingError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        positions = self._filter(query)
+        total = len(positions)
+        if query.cursor is not None:
+            after = self._cursor_position(query.cursor)
+            positions = positions[bisect_right(positions, after):]
+        else:
+            positions = positions[query.offset:]
+
+        next_cursor = None
+        if query.limit is not None and len(positions) > query.limit:
+            positions = positions[:query.limit]
+            next_cursor = self._encode_cursor(self.internships[positions[-1]]["id"])
+
+        items = [self.internships[position] for position in positions]
+        if query.fields:
+            items = [{key: item[key] for key in query.fields if key in item} for item in items]
+        return serialize_page(items, total, next_cursor)
+
+    def page(self, query: ListingQuery) -> ListingPage:
+        if query == ListingQuery():
+            return self.full_page
+
+        page = self._pages.get(query)
+        if page is not None:
+            self._pages.move_to_end(query)
+            return page
+
+        page = self._render(query)
+        self._pages[query] = page
+        if len(self._pages) > self.cache_size:
+            self._pages.popitem(last=False)
+        return page
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(float(2 ** power) for power in range(10, 25))  # 1 KiB .. 16 MiB
+COUNT_BUCKETS = (1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+TOKEN_BUCKETS = (100.0, 250.0, 500.0, 1000.0, 2000.0, 4000.0, 8000.0, 16000.0)
+
+CallbackResult = Union[float, int, List[Tuple[Dict[str, str], float]]]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Trace:
+    __slots__ = ("request_id", "spans")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.spans: List[Tuple[str, float]] = []
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, *labelvalues: str):
+        self._values[labelvalues] = value
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "started")
+
+    def __init__(self, histogram: "Histogram", labelvalues: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.record(time.perf_counter() - self.started, *self.labelvalues)
+        return False
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is one bisect and a few additions."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def record(self, seconds: float, *labelvalues: str):
+        """Observe a duration, and add it as a span if the current request is traced."""
+        self.observe(seconds, *labelvalues)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append((":".join(labelvalues) or self.name, round(seconds * 1000, 3)))
+
+    def time(self, *labelvalues: str) -> _Timer:
+        """Context manager that ``record``s the time spent inside it."""
+        return _Timer(self, labelvalues)
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class _Callback:
+    def __init__(self, name: str, help: str, type: str, fn: Callable[[], CallbackResult]):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        result = self.fn()
+        if isinstance(result, (int, float)):
+            return [f"{self.name} {_format_value(result)}"]
+        return [
+            f"{self.name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}"
+            for labels, value in result
+        ]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format.
+
+    Values that other components already track (cache sizes, queue depths,
+    breaker state) are registered as callbacks and read only at scrape time,
+    so they add nothing to the request path.
+    """
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS, labelnames: Sequence[str] = ()) -> Histogram:
+        return self._register(Histogram(name, help, buckets, labelnames))
+
+    def callback(self, name: str, help: str, fn: Callable[[], CallbackResult], type: str = "gauge"):
+        self._register(_Callback(name, help, type, fn))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = metric.render()
+            except Exception as e:
+                logger.error(f"Error collecting metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task, i.e. how long callbacks are blocked."""
+
+    def __init__(self, histogram: Histogram, interval: float = 0.5):
+        self.histogram = histogram
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.histogram.observe(self.last_lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+class MetricsMiddleware:
+    """Times every request by route template and tags it with a request ID.
+
+    The ID comes from the incoming ``X-Request-ID`` header or is generated,
+    and is echoed on the response. A ``sample_rate`` fraction of requests,
+    plus any sent with ``X-Trace: 1``, are traced: every ``Histogram.time``
+    block or ``Histogram.record`` call made on their behalf becomes a span,
+    and the spans are logged as one JSON line when the request finishes.
+    """
+
+    def __init__(self, app, requests: Histogram, sample_rate: float = 0.0):
+        self.app = app
+        self.requests = requests
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        forced = False
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+            elif name == b"x-trace":
+                forced = value == b"1"
+        request_id = request_id or uuid.uuid4().hex
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+        sampled = forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+        token = _current_trace.set(Trace(request_id) if sampled else None)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [request_id_header])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            # FastAPI records the matched route in the scope; its path template keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.requests.observe(elapsed, scope["method"], route, str(status))
+            trace = _current_trace.get()
+            if trace is not None:
+                logger.info("trace " + json.dumps({
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "spans": trace.spans,
+                }))
+            _current_trace.reset(token)
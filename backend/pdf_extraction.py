@@ -0,0 +1,178 @@
+import asyncio
+import io
+import logging
+import mmap
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, NamedTuple, Optional, Union
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class PDFExtractionError(Exception):
+    pass
+
+
+class PDFLimitExceeded(PDFExtractionError):
+    pass
+
+
+class ExtractedPDF(NamedTuple):
+    text: str
+    pages: int
+
+
+def extract_text_from_pdf(pdf_file: Union[bytes, BinaryIO], max_pages: int = 0, max_cpu_seconds: float = 0) -> str:
+    return extract_pdf(pdf_file, max_pages, max_cpu_seconds).text
+
+
+def extract_pdf(pdf_file: Union[bytes, BinaryIO], max_pages: int = 0, max_cpu_seconds: float = 0) -> ExtractedPDF:
+    # Imported here so only the worker processes, not the server itself, pay for loading PyPDF2
+    import PyPDF2
+
+    started = time.process_time()
+    if isinstance(pdf_file, (bytes, bytearray)):
+        pdf_file = io.BytesIO(pdf_file)
+    try:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        page_count = len(pdf_reader.pages)
+        if max_pages and page_count > max_pages:
+            raise PDFLimitExceeded(f"PDF has {page_count} pages; at most {max_pages} are allowed")
+
+        parts = []
+        for page in pdf_reader.pages:
+            parts.append(page.extract_text() or "")
+            if max_cpu_seconds and time.process_time() - started > max_cpu_seconds:
+                raise PDFLimitExceeded("PDF is too complex to process")
+        return ExtractedPDF("\n".join(parts).strip(), page_count)
+    except PDFExtractionError:
+        raise
+    except Exception as e:
+        raise PDFExtractionError(str(e)) from e
+
+
+def sample_pdf(text: str) -> bytes:
+    """A minimal one-page PDF showing the lines of ``text`` (Latin-1 only), e.g. to warm up the pool."""
+    lines = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in text.splitlines()]
+    content = "BT /F1 11 Tf 14 TL 72 760 Td " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    document = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(document))
+        document += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(document)
+    document += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    document += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("ascii")
+    document += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(document)
+
+
+def _raise_cpu_limit(signum, frame):
+    raise PDFLimitExceeded("PDF is too complex to process")
+
+
+def _init_worker():
+    import PyPDF2  # noqa: F401
+
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+
+
+def _extract_mapped(path: str, max_pages: int, max_cpu_seconds: float) -> ExtractedPDF:
+    # Parse straight from the page cache; the upload is never copied into a bytes object
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # zero-length file
+            raise PDFExtractionError(str(e)) from e
+        with mapped:
+            return extract_pdf(mapped, max_pages, max_cpu_seconds)
+
+
+def _extract_in_worker(path: str, max_pages: int, max_cpu_seconds: float) -> ExtractedPDF:
+    if resource is None or not max_cpu_seconds:
+        return _extract_mapped(path, max_pages, max_cpu_seconds)
+
+    # The per-page check above cannot interrupt a single pathological page, so
+    # back it with a kernel CPU limit that raises SIGXCPU inside this worker.
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    limit = int(usage.ru_utime + usage.ru_stime + max_cpu_seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    try:
+        return _extract_mapped(path, max_pages, max_cpu_seconds)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+class PDFExtractor:
+    """Runs PyPDF2 text extraction in a bounded process pool.
+
+    Parsing is CPU-bound, so it is moved off the event loop and spread across
+    ``max_workers`` processes. Each document is capped at ``max_pages`` pages
+    and ``max_cpu_seconds`` of CPU time; exceeding either raises
+    ``PDFLimitExceeded``.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pages: int = 10, max_cpu_seconds: float = 5.0):
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.max_cpu_seconds = max_cpu_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        if self._executor is None:
+            # spawn rather than fork: the parent already runs Motor and event loop threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+
+    async def warm_up(self, path: str) -> ExtractedPDF:
+        """Start every worker and parse ``path`` in each, so no request pays for process start-up."""
+        # The pool adds a process per submission while none is idle, so concurrent jobs start them all
+        results = await asyncio.gather(*(self.extract(path) for _ in range(self.max_workers)))
+        return results[0]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def extract(self, path: str) -> ExtractedPDF:
+        if self._executor is None:
+            raise PDFExtractionError("PDF extractor is not started")
+
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, _extract_in_worker, path, self.max_pages, self.max_cpu_seconds
+            )
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed at the hard CPU limit); replace the pool once
+            if self._executor is executor:
+                logger.error("PDF worker pool broke, restarting it")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.start()
+            raise PDFExtractionError("PDF worker crashed") from e
@@ -0,0 +1,178 @@
+import math
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from resume_sections import split_sections
+
+# Rough but stable for English prose under Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+# Lower rank is kept first when the resume does not fit the budget
+SECTION_PRIORITY: Dict[str, int] = {
+    "skills": 0,
+    "experience": 1,
+    "projects": 2,
+    "summary": 3,
+    "education": 4,
+    "certifications": 5,
+    "achievements": 6,
+    "publications": 7,
+    "activities": 8,
+    "header": 9,
+    "interests": 10,
+}
+_DEFAULT_PRIORITY = 8
+
+_CHAR_REPLACEMENTS = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": "-", "\u2212": "-",
+    "\u2022": "-", "\u25aa": "-", "\u25cf": "-", "\u25e6": "-", "\u2023": "-", "\u25a0": "-",
+    "\uf0b7": "-", "\uf0a7": "-",  # Symbol-font bullets from Word exports
+    "\u00a0": " ", "\u200b": "", "\u200c": "", "\u200d": "", "\ufeff": "", "\u00ad": "",
+})
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+_SPACES_RE = re.compile(r"[ \t\f\v]+")
+_BOILERPLATE_RE = re.compile(
+    r"^(?:"
+    r"page \d+(?: of \d+)?|\d{1,2}\s*/\s*\d{1,2}|\d{1,2}|"
+    r"curriculum vitae|resume|r[eé]sum[eé]|cv|"
+    r"references?(?: are)? available(?: up)?on request\.?|"
+    r"i hereby declare.*|declaration|"
+    r"signature|(?:signature|date|place)\s*:.*|"
+    r"[\W_]+"
+    r")$",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize_text(text: str) -> str:
+    """NFKC (which also splits ligatures like "ﬁ"), ASCII punctuation and bullets, tidy whitespace."""
+    text = unicodedata.normalize("NFKC", text).translate(_CHAR_REPLACEMENTS)
+    text = _CONTROL_RE.sub(" ", text.replace("\r\n", "\n").replace("\r", "\n"))
+    # Words hyphenated across a line break by the PDF layout
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+    return "\n".join(_SPACES_RE.sub(" ", line).strip() for line in text.split("\n"))
+
+
+def compact_lines(text: str) -> Tuple[str, int]:
+    """Drop blank, boilerplate and repeated lines; return the text and how many lines went."""
+    seen = set()
+    kept: List[str] = []
+    dropped = 0
+    for line in text.split("\n"):
+        if not line:
+            continue
+        key = line.lower()
+        if key in seen or _BOILERPLATE_RE.match(line):
+            dropped += 1
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept), dropped
+
+
+@dataclass
+class BuiltPrompt:
+    prompt: str
+    prompt_tokens: int
+    resume_tokens: int
+    original_resume_tokens: int
+    lines_dropped: int = 0
+    trimmed_sections: List[str] = field(default_factory=list)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "resume_tokens": self.resume_tokens,
+            "original_resume_tokens": self.original_resume_tokens,
+            "lines_dropped": self.lines_dropped,
+            "trimmed_sections": self.trimmed_sections,
+        }
+
+
+class PromptBuilder:
+    """Turns extracted resume text into a compact, token-budgeted prompt.
+
+    The text is normalized and stripped of duplicate and boilerplate lines
+    (page numbers, repeated page headers, declarations), then split into
+    sections. If the result is still over ``token_budget``, sections are
+    admitted in ``SECTION_PRIORITY`` order, the first one that does not fit is
+    cut at a line boundary and the rest are dropped. Kept sections stay in
+    document order. ``token_budget`` covers only the resume; the fixed
+    ``prefix`` is counted in ``prompt_tokens`` but never trimmed.
+    """
+
+    def __init__(self, prefix: str, token_budget: int = 2000):
+        self.prefix = prefix
+        self.token_budget = token_budget
+        self.prefix_tokens = estimate_tokens(prefix)
+        self.requests = 0
+        self.original_tokens_total = 0
+        self.resume_tokens_total = 0
+        self.trimmed_requests = 0
+
+    def _fit(self, sections: List[Tuple[str, str]]) -> Tuple[str, List[str]]:
+        budget_chars = self.token_budget * CHARS_PER_TOKEN
+        order = sorted(range(len(sections)), key=lambda i: (SECTION_PRIORITY.get(sections[i][0], _DEFAULT_PRIORITY), i))
+        kept: Dict[int, str] = {}
+        trimmed: List[str] = []
+        used = 0
+        for index in order:
+            name, body = sections[index]
+            block = body if name == "header" else f"{name.upper()}\n{body}"
+            # Joined blocks are separated by a blank line
+            cost = len(block) + (2 if kept else 0)
+            if used + cost <= budget_chars:
+                kept[index] = block
+                used += cost
+                continue
+            trimmed.append(name)
+            remaining = budget_chars - used - (2 if kept else 0)
+            if remaining > 0:
+                cut = block[:remaining]
+                cut = cut[:cut.rfind("\n")] if "\n" in cut else ""
+                if cut.strip():
+                    kept[index] = cut
+                    used += len(cut) + (2 if len(kept) > 1 else 0)
+        return "\n\n".join(kept[index] for index in sorted(kept)), trimmed
+
+    def build(self, resume_text: str) -> BuiltPrompt:
+        original_tokens = estimate_tokens(resume_text)
+        compacted, dropped = compact_lines(normalize_text(resume_text))
+        trimmed: List[str] = []
+        if estimate_tokens(compacted) > self.token_budget:
+            compacted, trimmed = self._fit(split_sections(compacted))
+
+        resume_tokens = estimate_tokens(compacted)
+        self.requests += 1
+        self.original_tokens_total += original_tokens
+        self.resume_tokens_total += resume_tokens
+        self.trimmed_requests += bool(trimmed)
+        return BuiltPrompt(
+            prompt=self.prefix + compacted,
+            prompt_tokens=self.prefix_tokens + resume_tokens,
+            resume_tokens=resume_tokens,
+            original_resume_tokens=original_tokens,
+            lines_dropped=dropped,
+            trimmed_sections=trimmed,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self.original_tokens_total - self.resume_tokens_total
+        return {
+            "token_budget": self.token_budget,
+            "prefix_tokens": self.prefix_tokens,
+            "requests": self.requests,
+            "original_resume_tokens": self.original_tokens_total,
+            "sent_resume_tokens": self.resume_tokens_total,
+            "saved_tokens": saved,
+            "saved_ratio": round(saved / self.original_tokens_total, 4) if self.original_tokens_total else 0.0,
+            "trimmed_requests": self.trimmed_requests,
+        }
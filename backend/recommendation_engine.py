@@ -0,0 +1,159 @@
+import heapq
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from skill_matcher import SkillMatcher
+
+DEFAULT_SCORE_RANGE = (5, 10)
+
+
+class CatalogColumns(NamedTuple):
+    """Score ranges and required skills of every catalog position as arrays, e.g. read from a snapshot file.
+
+    ``skill_ids[skills_indptr[p]:skills_indptr[p + 1]]`` are the matcher IDs
+    of position ``p``'s required skills, -1 for names the matcher does not know.
+    """
+
+    lows: np.ndarray
+    highs: np.ndarray
+    skills_indptr: np.ndarray
+    skill_ids: np.ndarray
+
+    def skill_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Known skill IDs and the position each occurrence belongs to, in catalog order."""
+        owners = np.repeat(np.arange(len(self.lows)), np.diff(self.skills_indptr))
+        known = self.skill_ids >= 0
+        return self.skill_ids[known].astype(np.int64), owners[known]
+
+
+def group_positions(keys: np.ndarray, positions: np.ndarray) -> Dict[int, List[int]]:
+    """``{key: positions}``, each list keeping the order ``positions`` had."""
+    order = np.argsort(keys, kind="stable")
+    unique, starts = np.unique(keys[order], return_index=True)
+    bounds = starts.tolist() + [len(keys)]
+    ordered = positions[order].tolist()
+    return {key: ordered[bounds[i]:bounds[i + 1]] for i, key in enumerate(unique.tolist())}
+
+
+class RecommendationEngine:
+    """Top-k internship ranking over precomputed indexes.
+
+    Two indexes are built once per catalog:
+
+    * an inverted index from skill ID to the catalog positions requiring it,
+      so only internships sharing at least one skill with the resume are
+      scored for skill overlap;
+    * a score-range interval index grouping positions by their distinct
+      ``score_range`` (sorted by lower bound), so internships whose range
+      contains the rating can be found without scanning the catalog.
+
+    Ranking matches the original linear scan exactly: candidates must fall in
+    ``score_range`` widened by ``tolerance`` and either share a skill or
+    contain the rating outright, and are ordered by
+    ``(max(match %, 10), -|rating - range midpoint|)`` with catalog order
+    breaking ties. Prebuilt ``columns`` (e.g. from a catalog snapshot file)
+    build the same indexes without reading the records.
+    """
+
+    def __init__(self, internships: Sequence[dict], matcher: SkillMatcher, columns: Optional[CatalogColumns] = None):
+        self.internships = internships
+        self.matcher = matcher
+        self._ranges: List[Tuple[float, float]] = []
+        self._skill_totals: List[int] = []
+        self._postings: Dict[int, List[int]] = {}
+        groups: Dict[Tuple[float, float], List[int]] = {}
+
+        if columns is not None:
+            self._ranges = list(zip(columns.lows.tolist(), columns.highs.tolist()))
+            self._skill_totals = np.diff(columns.skills_indptr).tolist()
+            self._postings = group_positions(*columns.skill_positions())
+            for position, bounds in enumerate(self._ranges):
+                groups.setdefault(bounds, []).append(position)
+        else:
+            for position, internship in enumerate(self.internships):
+                score_range = internship.get('score_range') or DEFAULT_SCORE_RANGE
+                bounds = (score_range[0], score_range[1])
+                self._ranges.append(bounds)
+                groups.setdefault(bounds, []).append(position)
+
+                skills_required = internship.get('skills_required', [])
+                self._skill_totals.append(len(skills_required))
+                for skill in skills_required:
+                    skill_id = matcher.skill_id(skill) if isinstance(skill, str) else None
+                    if skill_id is not None:
+                        # One posting per occurrence so duplicated skills count twice, as before
+                        self._postings.setdefault(skill_id, []).append(position)
+
+        self._range_groups = sorted(groups.items())
+        self._range_lows = [bounds[0] for bounds, _ in self._range_groups]
+
+    def _overlap(self, resume_skills: FrozenSet[int]) -> Dict[int, int]:
+        """Matched-skill count per catalog position, for positions sharing any skill."""
+        overlap: Dict[int, int] = {}
+        for skill_id in resume_skills:
+            for position in self._postings.get(skill_id, ()):
+                overlap[position] = overlap.get(position, 0) + 1
+        return overlap
+
+    def top_k(
+        self,
+        rating: float,
+        resume_skills: FrozenSet[int],
+        k: int = 6,
+        tolerance: float = 1.0,
+    ) -> List[Tuple[dict, int]]:
+        """Return up to ``k`` ``(internship, match_percentage)`` pairs, best first."""
+        if k <= 0:
+            return []
+
+        overlap = self._overlap(resume_skills)
+
+        candidates: Dict[int, int] = {}
+        for position, matched in overlap.items():
+            low, high = self._ranges[position]
+            if low - tolerance <= rating <= high + tolerance:
+                match_percentage = int(matched / self._skill_totals[position] * 100)
+                if match_percentage > 0:
+                    candidates[position] = match_percentage
+
+        # Internships whose range contains the rating qualify without any skill
+        # overlap. Within one range group they all tie on score, so only the
+        # first k not already scored above can make the cut.
+        for (low, high), positions in self._range_groups[:bisect_right(self._range_lows, rating)]:
+            if high < rating:
+                continue
+            taken = 0
+            for position in positions:
+                if taken == k:
+                    break
+                if position not in candidates:
+                    candidates[position] = 0
+                    taken += 1
+
+        def rank(position: int) -> tuple:
+            low, high = self._ranges[position]
+            return (max(candidates[position], 10), -abs(rating - (low + high) / 2), -position)
+
+        best = heapq.nlargest(k, candidates, key=rank)
+        return [(self.internships[position], candidates[position]) for position in best]
+
+    def top_k_by_skills(self, resume_skills: FrozenSet[int], k: int = 6) -> List[Tuple[dict, int]]:
+        """Rank on skill overlap alone, for when no rating is known yet.
+
+        Internships are ordered by match percentage, then by the number of
+        matched skills, with catalog order breaking ties; internships sharing
+        no skill with the resume are left out.
+        """
+        if k <= 0:
+            return []
+
+        overlap = self._overlap(resume_skills)
+
+        def rank(position: int) -> tuple:
+            matched = overlap[position]
+            return (int(matched / self._skill_totals[position] * 100), matched, -position)
+
+        best = heapq.nlargest(k, overlap, key=rank)
+        return [(self.internships[position], rank(position)[0]) for position in best]
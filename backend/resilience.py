@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised instead of queueing work that cannot be served in time."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(AdmissionRejected):
+    pass
+
+
+class CircuitOpenError(AdmissionRejected):
+    pass
+
+
+class ConcurrencyGovernor:
+    """Caps concurrent calls, with a bounded wait queue and a queue-time limit."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_queue_wait: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("Too many requests waiting for AI analysis")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected("Timed out waiting for AI analysis capacity")
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+class TokenBucket:
+    """Token-bucket rate limiter that reserves tokens ahead for waiting callers."""
+
+    def __init__(self, rate_per_second: float, burst: int, max_wait: float):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        self._refill()
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        if wait > self.max_wait:
+            self.rejected += 1
+            raise RateLimited("AI analysis rate limit reached", retry_after=wait)
+        # Taking the token now (possibly going negative) keeps waiters in FIFO order
+        self._tokens -= 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 3),
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError("AI analysis is temporarily unavailable", retry_after=remaining)
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError("AI analysis is temporarily unavailable", retry_after=1.0)
+            self._probe_in_flight = True
+
+    def release_probe(self):
+        """Give back a half-open probe that never reached upstream."""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed: upstream recovered")
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server-sent Retry-After."""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, max_delay))
+    return delay
+
+
+class ResilientCaller:
+    """Runs an upstream call through breaker, governor, rate limiter and retries.
+
+    ``is_retryable`` decides which exceptions are worth another attempt;
+    every attempt, retried or not, counts toward the breaker and takes a
+    rate-limit token, and the concurrency slot is released while backing off.
+    Exceptions that ``is_upstream_failure`` rejects (say, the caller's own
+    parsing of a response that did arrive) are raised without a retry and
+    count as a success, so a bad payload cannot open the circuit.
+    """
+
+    def __init__(
+        self,
+        governor: ConcurrencyGovernor,
+        rate_limiter: TokenBucket,
+        breaker: CircuitBreaker,
+        is_retryable: Callable[[Exception], bool],
+        is_upstream_failure: Callable[[Exception], bool] = lambda e: True,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ):
+        self.governor = governor
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.is_retryable = is_retryable
+        self.is_upstream_failure = is_upstream_failure
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                async with self.governor.slot():
+                    await self.rate_limiter.acquire()
+                    result = await fn()
+            except (AdmissionRejected, asyncio.CancelledError):
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if not self.is_upstream_failure(e):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, self.base_delay, self.max_delay, getattr(e, "retry_after", None)))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "governor": self.governor.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "circuit_breaker": self.breaker.stats(),
+            "retries": self.retries,
+        }
@@ -0,0 +1,48 @@
+from typing import Any, Dict, FrozenSet
+
+from catalog import CatalogSnapshot
+from semantic_ranker import resume_terms
+
+
+def build_profile(
+    snapshot: CatalogSnapshot,
+    resume_skills: FrozenSet[int],
+    rating: float,
+    content_hash: str,
+    resume_text: str,
+) -> Dict[str, Any]:
+    """What ``recommend_internships`` needs to rank a resume again, without its PDF or an LLM call.
+
+    Skill IDs are only meaningful for the catalog that assigned them, so the
+    canonical names are kept too and mapped onto whatever catalog is current
+    when the profile is used. The resume's most frequent terms stand in for
+    its text in semantic ranking.
+    """
+    skill_ids = sorted(resume_skills)
+    return {
+        "content_hash": content_hash,
+        "rating": rating,
+        "catalog_hash": snapshot.content_hash,
+        "skill_ids": skill_ids,
+        "skills": [snapshot.matcher.skill_names[skill_id] for skill_id in skill_ids],
+        "terms": resume_terms(resume_text),
+    }
+
+
+def profile_skills(snapshot: CatalogSnapshot, profile: Dict[str, Any]) -> FrozenSet[int]:
+    """The profile's skills as IDs in ``snapshot``'s catalog.
+
+    For a newer catalog, the stored names are mapped onto its matcher and
+    the stored terms are matched again, one at a time, which finds skills
+    the catalog gained since the analysis. Terms keep no word order, so a
+    new multi-word skill (other than through a one-word alias) is only
+    found once the resume is analysed again.
+    """
+    if profile.get("catalog_hash") == snapshot.content_hash:
+        return frozenset(profile["skill_ids"])
+    matcher = snapshot.matcher
+    skill_ids = {matcher.skill_id(name) for name in profile.get("skills", [])}
+    skill_ids.discard(None)
+    for term in profile.get("terms", {}):
+        skill_ids |= matcher.match(term)
+    return frozenset(skill_ids)
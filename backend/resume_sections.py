@@ -0,0 +1,63 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Canonical section name -> headings that introduce it, lowercase without punctuation
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("summary", "professional summary", "objective", "career objective", "profile", "about me", "about"),
+    "education": ("education", "academic background", "academics", "qualifications", "educational qualifications"),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "internships", "internship", "internship experience",
+    ),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "project work"),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "technologies", "tech stack",
+        "tools and technologies", "core competencies", "competencies",
+    ),
+    "certifications": ("certifications", "certificates", "courses", "certifications and courses", "licenses"),
+    "achievements": ("achievements", "awards", "honors", "honours", "accomplishments", "awards and achievements"),
+    "activities": (
+        "extracurricular activities", "extracurriculars", "activities", "leadership", "volunteering",
+        "volunteer experience", "positions of responsibility",
+    ),
+    "publications": ("publications", "research", "papers"),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+}
+
+_HEADING_LOOKUP = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_CLEAN_RE = re.compile(r"[^a-z ]+")
+_MAX_HEADING_LENGTH = 40
+
+
+def heading_name(line: str) -> Optional[str]:
+    """Canonical section name if ``line`` looks like a section heading."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > _MAX_HEADING_LENGTH:
+        return None
+    cleaned = " ".join(_HEADING_CLEAN_RE.sub(" ", stripped.lower().replace("&", " and ")).split())
+    return _HEADING_LOOKUP.get(cleaned)
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split resume text into ``(section_name, body)`` pairs in document order.
+
+    Text before the first recognised heading (usually name and contact
+    details) is returned as the ``header`` section. A section that appears
+    twice yields two pairs.
+    """
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.splitlines():
+        name = heading_name(line)
+        if name is not None:
+            sections.append((name, []))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if name != "header" or any(lines)]
+
+
+def detect_sections(text: str) -> Dict[str, str]:
+    """Section name -> body, with repeated sections concatenated."""
+    merged: Dict[str, str] = {}
+    for name, body in split_sections(text):
+        merged[name] = f"{merged[name]}\n{body}" if name in merged else body
+    return merged
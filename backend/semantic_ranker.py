@@ -0,0 +1,234 @@
+from collections import Counter
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from recommendation_engine import CatalogColumns
+from skill_matcher import SkillMatcher, tokenize
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to was were will "
+    "with you your we i my me us they them he she his her who which what when where how all any can do does "
+    "into over under about more most other some such than too very also using used use etc".split()
+)
+
+# Skills are the most reliable signal in a posting, so their tokens count this many times
+SKILL_BOOST = 3
+
+
+def _terms(text: str) -> List[str]:
+    return [token for token in tokenize(text) if token not in STOPWORDS and (len(token) > 1 or not token.isalpha())]
+
+
+def resume_terms(text: str, limit: int = 128) -> Dict[str, int]:
+    """The ``limit`` most frequent terms of ``text`` with their counts; enough to rank it again later."""
+    return dict(Counter(_terms(text)).most_common(limit))
+
+
+class TextIndex(NamedTuple):
+    """Term-major TF-IDF postings: positions ``docs[indptr[t]:indptr[t + 1]]`` contain term ``t``."""
+
+    terms: List[str]
+    idf: np.ndarray
+    indptr: np.ndarray
+    docs: np.ndarray
+    weights: np.ndarray
+
+
+def _term_major(rows: np.ndarray, docs: np.ndarray, row_count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(row_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=row_count), out=indptr[1:])
+    return indptr, docs[order].astype(np.int32), order
+
+
+def build_text_index(internships: Sequence[dict], max_df: float = 0.5) -> TextIndex:
+    """Sublinear TF-IDF vectors of each internship's text, L2-normalized, stored term-major."""
+    size = len(internships)
+    vocabulary: Dict[str, int] = {}
+    doc_ids: List[int] = []
+    term_ids: List[int] = []
+    counts: List[int] = []
+    for position, internship in enumerate(internships):
+        text = " ".join(str(internship.get(name, "")) for name in ("title", "category", "description"))
+        terms = Counter(_terms(text))
+        for skill in internship.get('skills_required', []):
+            if isinstance(skill, str):
+                for term in _terms(skill):
+                    terms[term] += SKILL_BOOST
+        for term, count in terms.items():
+            doc_ids.append(position)
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+
+    docs = np.asarray(doc_ids, dtype=np.int64)
+    terms_array = np.asarray(term_ids, dtype=np.int64)
+    tf = 1.0 + np.log(np.asarray(counts, dtype=np.float32))
+    df = np.bincount(terms_array, minlength=len(vocabulary))
+    idf = (np.log((1.0 + size) / (1.0 + df)) + 1.0).astype(np.float32)
+    # Terms found in most postings get no weight at all, which also keeps their long posting lists out of queries
+    idf[df > max(1.0, max_df * size)] = 0.0
+    weights = tf * idf[terms_array]
+    norms = np.sqrt(np.bincount(docs, weights=weights * weights, minlength=size))
+    norms[norms == 0] = 1.0
+    weights = (weights / norms[docs]).astype(np.float32)
+
+    keep = weights > 0
+    indptr, kept_docs, order = _term_major(terms_array[keep], docs[keep], len(vocabulary))
+    return TextIndex(list(vocabulary), idf, indptr, kept_docs, weights[keep][order])
+
+
+def _gather(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Flat indices of every entry in ``rows`` of a CSR-style index, and the row each came from."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return starts[owner] + offsets, owner
+
+
+class SemanticRanker:
+    """TF-IDF similarity between a resume and every internship, blended with skill and rating fit.
+
+    Built once per catalog: each internship's title, category, description
+    and skills (weighted by ``SKILL_BOOST``) become a sublinear TF-IDF vector,
+    L2-normalized and stored term-major, i.e. for every term the positions
+    containing it and their weights. Terms in more than ``max_df`` of the
+    catalog carry almost no signal and are left out of the vocabulary. A
+    prebuilt ``text_index`` and ``columns`` (e.g. from a catalog snapshot
+    file) skip that step and the pass over the records.
+
+    A resume is scored against the whole catalog in one sparse
+    matrix-vector product: the postings of its terms are gathered, scaled by
+    the resume's own weights and summed per internship with ``np.bincount``.
+    Skill overlap is computed the same way from per-skill postings, and rating
+    fit is 1 inside ``score_range``, falling linearly to 0 at ``tolerance``
+    outside it; internships further away are excluded, as in the skill
+    ranking. The result is ``semantic_weight * cosine + skill_weight * overlap
+    + rating_weight * fit``, reported as a percentage.
+    """
+
+    def __init__(
+        self,
+        internships: Sequence[dict],
+        matcher: SkillMatcher,
+        semantic_weight: float = 0.5,
+        skill_weight: float = 0.35,
+        rating_weight: float = 0.15,
+        max_df: float = 0.5,
+        max_query_terms: int = 64,
+        text_index: Optional[TextIndex] = None,
+        columns: Optional[CatalogColumns] = None,
+    ):
+        self.internships = internships
+        self.semantic_weight = semantic_weight
+        self.skill_weight = skill_weight
+        self.rating_weight = rating_weight
+        self.max_query_terms = max_query_terms
+        size = len(internships)
+
+        text_index = text_index if text_index is not None else build_text_index(internships, max_df)
+        self.idf = text_index.idf
+        self.vocabulary = {term: term_id for term_id, term in enumerate(text_index.terms) if self.idf[term_id] > 0}
+        self._term_indptr = text_index.indptr
+        self._term_docs = text_index.docs
+        self._term_weights = text_index.weights
+
+        if columns is not None:
+            skill_ids, skill_docs = columns.skill_positions()
+            skill_totals = np.diff(columns.skills_indptr).astype(np.float32)
+            lows = columns.lows.astype(np.float32)
+            highs = columns.highs.astype(np.float32)
+        else:
+            skill_docs_list: List[int] = []
+            skill_ids_list: List[int] = []
+            skill_totals = np.zeros(size, dtype=np.float32)
+            lows = np.empty(size, dtype=np.float32)
+            highs = np.empty(size, dtype=np.float32)
+            for position, internship in enumerate(internships):
+                skills_required = internship.get('skills_required', [])
+                skill_totals[position] = len(skills_required)
+                for skill in skills_required:
+                    skill_id = matcher.skill_id(skill) if isinstance(skill, str) else None
+                    if skill_id is not None:
+                        skill_docs_list.append(position)
+                        skill_ids_list.append(skill_id)
+                score_range = internship.get('score_range') or (5, 10)
+                lows[position], highs[position] = score_range[0], score_range[1]
+            skill_ids = np.asarray(skill_ids_list, dtype=np.int64)
+            skill_docs = np.asarray(skill_docs_list, dtype=np.int64)
+
+        self._skill_indptr, self._skill_docs, _ = _term_major(skill_ids, skill_docs, len(matcher.skill_names))
+        self._skill_totals = np.maximum(skill_totals, 1.0)
+        self._lows = lows
+        self._highs = highs
+
+    def _query(self, resume: Union[str, Mapping[str, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        if isinstance(resume, str):
+            counts = Counter(term for term in _terms(resume) if term in self.vocabulary)
+        else:
+            counts = {term: count for term, count in resume.items() if term in self.vocabulary}
+        if not counts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        term_ids = np.fromiter((self.vocabulary[term] for term in counts), dtype=np.int64, count=len(counts))
+        weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[term_ids]
+        if len(term_ids) > self.max_query_terms:
+            strongest = np.argpartition(-weights, self.max_query_terms)[:self.max_query_terms]
+            term_ids, weights = term_ids[strongest], weights[strongest]
+        return term_ids, weights / np.linalg.norm(weights)
+
+    def scores(
+        self,
+        resume: Union[str, Mapping[str, int]],
+        resume_skills: FrozenSet[int],
+        rating: float,
+        tolerance: float = 1.0,
+    ) -> np.ndarray:
+        """Blended score in [0, 1] for every catalog position; -inf where the rating is out of range.
+
+        ``resume`` is the resume text, or its ``resume_terms`` when the text was not kept.
+        """
+        size = len(self.internships)
+        term_ids, query = self._query(resume)
+        entries, owner = _gather(self._term_indptr, term_ids)
+        similarity = np.bincount(
+            self._term_docs[entries], weights=self._term_weights[entries] * query[owner], minlength=size
+        )
+
+        skill_rows = np.fromiter(
+            (skill_id for skill_id in resume_skills if skill_id < len(self._skill_indptr) - 1), dtype=np.int64
+        )
+        entries, _ = _gather(self._skill_indptr, skill_rows)
+        overlap = np.bincount(self._skill_docs[entries], minlength=size) / self._skill_totals
+
+        distance = np.maximum(np.maximum(self._lows - rating, rating - self._highs), 0.0)
+        # 1 inside the range, 0 at ``tolerance`` outside it
+        fit = 1.0 - distance / tolerance if tolerance > 0 else np.ones(size)
+        combined = self.semantic_weight * similarity + self.skill_weight * overlap + self.rating_weight * fit
+        combined[distance > tolerance] = -np.inf
+        return combined
+
+    def top_k(
+        self,
+        resume: Union[str, Mapping[str, int]],
+        resume_skills: FrozenSet[int],
+        rating: float,
+        k: int = 6,
+        tolerance: float = 1.0,
+    ) -> List[Tuple[dict, int]]:
+        """Return up to ``k`` ``(internship, score percentage)`` pairs, best first, catalog order breaking ties."""
+        if k <= 0 or not self.internships:
+            return []
+        combined = self.scores(resume, resume_skills, rating, tolerance)
+        if k < len(combined):
+            # Everything at least as good as the k-th best, ties included, so the earliest positions win them
+            kth = np.partition(-combined, k - 1)[k - 1]
+            candidates = np.flatnonzero(-combined <= kth)
+        else:
+            candidates = np.arange(len(combined))
+        candidates = candidates[np.isfinite(combined[candidates])]
+        best = candidates[np.lexsort((candidates, -combined[candidates]))][:k]
+        return [(self.internships[position], int(round(combined[position] * 100))) for position in best]
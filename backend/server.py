@@ -1,50 +1,365 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+# Imported first, so the startup profile's clock covers every import below
+from startup import IMPORT_STARTED, StartupProfile
+
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
 import os
+import asyncio
 import logging
 import json
-import requests
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Dict, Any, FrozenSet, Mapping, Optional, Union
 import uuid
 from datetime import datetime
-import PyPDF2
-import io
 import re
+import hashlib
+import tempfile
+import time
+
+from analysis_cache import AnalysisCache
+from analytics import AnalyticsRollups
+from batch_jobs import BatchJobManager
+from candidate_index import CandidateIndex
+from catalog import CatalogManager, CatalogSnapshot
+from fast_analyzer import SUGGESTED_SKILLS, FastAnalyzer
+from gemini_client import GEMINI_BASE_URL, GEMINI_MODEL, GeminiClient, GeminiError
+from gemini_stub import stub_router
+from incremental_json import FieldCallback, FieldFanout, IncrementalJSONError, IncrementalJSONParser, first_field
+from internship_listing import ListingError, ListingQuery, etag_matches
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, COUNT_BUCKETS, SIZE_BUCKETS, TOKEN_BUCKETS,
+    EventLoopLagMonitor, MetricsMiddleware, MetricsRegistry,
+)
+from pdf_extraction import PDFExtractionError, PDFExtractor, PDFLimitExceeded, sample_pdf
+from prompt_builder import PromptBuilder
+from resume_profile import build_profile, profile_skills
+from resilience import AdmissionRejected, CircuitBreaker, ConcurrencyGovernor, ResilientCaller, TokenBucket, backoff_delay
+from singleflight import SingleFlight
+from status_checks import CursorError, StatusCheckStore, decode_cursor, json_default
+from skill_matcher import SkillMatcher
+from uploads import BodySizeLimitMiddleware, SpooledUpload, spool_upload
+from write_behind import WriteBehindBuffer
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# MongoDB connection. Motor connects on first use, so a slow or unreachable
+# server holds up readiness, not startup
+client = AsyncIOMotorClient(os.environ['MONGO_URL'])
 db = client[os.environ['DB_NAME']]
 
 # Gemini API configuration
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
-GEMINI_ENDPOINT = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+gemini_client = GeminiClient(
+    api_key=GEMINI_API_KEY,
+    base_url=os.environ.get('GEMINI_BASE_URL', GEMINI_BASE_URL),
+    model=os.environ.get('GEMINI_MODEL', GEMINI_MODEL),
+    max_connections=int(os.environ.get('GEMINI_MAX_CONNECTIONS', '20')),
+    max_keepalive_connections=int(os.environ.get('GEMINI_MAX_KEEPALIVE', '10')),
+    keepalive_expiry=float(os.environ.get('GEMINI_KEEPALIVE_EXPIRY', '30')),
+    connect_timeout=float(os.environ.get('GEMINI_CONNECT_TIMEOUT', '5')),
+    read_timeout=float(os.environ.get('GEMINI_READ_TIMEOUT', '30')),
+    write_timeout=float(os.environ.get('GEMINI_WRITE_TIMEOUT', '10')),
+    pool_timeout=float(os.environ.get('GEMINI_POOL_TIMEOUT', '5')),
+    http2=os.environ.get('GEMINI_HTTP2', 'true').lower() == 'true',
+)
+GEMINI_STUB_ENABLED = os.environ.get('GEMINI_STUB_ENABLED', 'false').lower() == 'true'
+gemini_single_flight = SingleFlight()
+# Use streamGenerateContent and parse the JSON as it arrives
+GEMINI_STREAMING = os.environ.get('GEMINI_STREAMING', 'true').lower() == 'true'
+gemini_fanouts: Dict[str, FieldFanout] = {}
 
-# Create the main app without a prefix
-app = FastAPI()
+# Admission control in front of Gemini: concurrency cap with a bounded queue,
+# a token bucket matched to the API quota, jittered retries and a circuit breaker
+gemini_caller = ResilientCaller(
+    governor=ConcurrencyGovernor(
+        max_concurrent=int(os.environ.get('GEMINI_MAX_CONCURRENCY', '8')),
+        max_queue=int(os.environ.get('GEMINI_MAX_QUEUE', '32')),
+        max_queue_wait=float(os.environ.get('GEMINI_MAX_QUEUE_WAIT', '10')),
+    ),
+    rate_limiter=TokenBucket(
+        rate_per_second=float(os.environ.get('GEMINI_RATE_LIMIT_RPM', '600')) / 60,
+        burst=int(os.environ.get('GEMINI_RATE_LIMIT_BURST', '10')),
+        max_wait=float(os.environ.get('GEMINI_RATE_LIMIT_MAX_WAIT', '5')),
+    ),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get('GEMINI_BREAKER_FAILURES', '5')),
+        reset_timeout=float(os.environ.get('GEMINI_BREAKER_RESET_SECONDS', '30')),
+    ),
+    is_retryable=lambda e: isinstance(e, GeminiError) and e.retryable,
+    # Streamed responses are parsed inside the call; malformed model output is not an outage
+    is_upstream_failure=lambda e: not isinstance(e, IncrementalJSONError),
+    max_retries=int(os.environ.get('GEMINI_MAX_RETRIES', '2')),
+    base_delay=float(os.environ.get('GEMINI_RETRY_BASE_DELAY', '0.5')),
+    max_delay=float(os.environ.get('GEMINI_RETRY_MAX_DELAY', '8')),
+)
 
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+# Local heuristic analyzer for mode=fast and for when Gemini is unavailable
+fast_analyzer = FastAnalyzer()
+ANALYSIS_DEGRADE_TO_FAST = os.environ.get('ANALYSIS_DEGRADE_TO_FAST', 'true').lower() == 'true'
+ANALYSIS_MODE_PATTERN = "^(fast|full)$"
+# ranking=skills is exact skill overlap; ranking=semantic adds TF-IDF similarity to the whole posting
+RANKING_PATTERN = "^(skills|semantic)$"
+
+# Resume text is compacted and trimmed to this many estimated tokens before it goes to Gemini
+PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', '2000'))
+
+# Resume analysis cache
+analysis_cache = AnalysisCache(
+    db.analysis_cache,
+    max_entries=int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', '1024')),
+    ttl_seconds=int(os.environ.get('ANALYSIS_CACHE_TTL_SECONDS', '86400')),
+)
 
-# Load internships data
-def load_internships():
+# PDF text extraction pool
+pdf_extractor = PDFExtractor(
+    max_workers=int(os.environ.get('PDF_WORKERS', str(os.cpu_count() or 1))),
+    max_pages=int(os.environ.get('PDF_MAX_PAGES', '10')),
+    max_cpu_seconds=float(os.environ.get('PDF_MAX_CPU_SECONDS', '5')),
+)
+
+# Internship catalog, hot-reloaded from thing.json or a Mongo collection
+CATALOG_SOURCE = os.environ.get('CATALOG_SOURCE', 'file')
+if CATALOG_SOURCE == 'snapshot':
+    # Built with `python catalog_snapshot.py --output ...`; every worker maps the same file
+    CATALOG_PATH = Path(os.environ.get('CATALOG_SNAPSHOT_PATH', ROOT_DIR / 'catalog.snapshot'))
+else:
+    CATALOG_PATH = Path(os.environ.get('CATALOG_PATH', ROOT_DIR.parent / 'frontend' / 'public' / 'thing.json'))
+catalog = CatalogManager(
+    CATALOG_PATH,
+    collection=db[os.environ.get('CATALOG_COLLECTION', 'internships')],
+    source=CATALOG_SOURCE,
+    poll_interval=float(os.environ.get('CATALOG_POLL_SECONDS', '30' if CATALOG_SOURCE == 'mongo' else '5')),
+)
+
+INTERNSHIPS_CACHE_CONTROL = os.environ.get('INTERNSHIPS_CACHE_CONTROL', 'public, max-age=0, must-revalidate')
+
+# Upload limits
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR') or None
+BATCH_MAX_UPLOAD_BYTES = int(os.environ.get('BATCH_MAX_UPLOAD_BYTES', str(200 * 1024 * 1024)))
+
+# Legacy status checks, read with keyset pagination
+status_checks = StatusCheckStore(db.status_checks)
+# Matches the old unpaginated to_list(1000), so clients that ignore the cursor see no change
+STATUS_PAGE_SIZE = int(os.environ.get('STATUS_PAGE_SIZE', '1000'))
+
+# Analysis records are written in batches off the request path
+analysis_writer = WriteBehindBuffer(
+    db.resume_analyses,
+    spill_path=Path(os.environ.get('ANALYSIS_SPILL_PATH', Path(tempfile.gettempdir()) / 'skillsync-analyses.spill.jsonl')),
+    indexes=[[("timestamp", -1)], "content_hash"],
+    max_batch=int(os.environ.get('ANALYSIS_WRITE_BATCH', '100')),
+    flush_interval=float(os.environ.get('ANALYSIS_WRITE_INTERVAL', '1')),
+    max_pending=int(os.environ.get('ANALYSIS_WRITE_MAX_PENDING', '10000')),
+)
+
+# Dashboard rollups (rating histograms, top weaknesses, suggestions, skills and
+# recommended internships), counted as analyses are stored. Build them from
+# older analyses with `python analytics.py backfill`.
+analytics = AnalyticsRollups(
+    db.analytics_rollups,
+    bucket_seconds=int(os.environ.get('ANALYTICS_BUCKET_SECONDS', '3600')),
+    window_buckets=int(os.environ.get('ANALYTICS_WINDOW_BUCKETS', '168')),
+    sketch_size=int(os.environ.get('ANALYTICS_SKETCH_SIZE', '200')),
+    flush_interval=float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', '5')),
+)
+
+# Reverse matching: stored resumes ranked for one internship, from memory.
+# Rebuilt from resume_analyses before the worker reports ready, kept up to
+# date as analyses are stored and caught up with other workers' periodically.
+candidate_index = CandidateIndex(
+    refresh_interval=float(os.environ.get('CANDIDATE_REFRESH_SECONDS', '30')),
+    refresh_overlap=float(os.environ.get('CANDIDATE_REFRESH_OVERLAP_SECONDS', '120')),
+)
+
+# Startup is timed step by step. /api/health/ready answers 200 only after a
+# sample resume has been through extraction, analysis and ranking.
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'true').lower() == 'true'
+# A failed warm-up is retried with backoff until it succeeds, so readiness recovers
+WARMUP_RETRY_BASE_DELAY = float(os.environ.get('WARMUP_RETRY_BASE_DELAY', '1'))
+WARMUP_RETRY_MAX_DELAY = float(os.environ.get('WARMUP_RETRY_MAX_DELAY', '60'))
+WARMUP_RESUME = """Warm-up Candidate
+SKILLS
+Python, JavaScript, React, Node.js, SQL, Machine Learning, Docker, Git
+EXPERIENCE
+Software Engineering Intern, 2 years: built REST APIs and data pipelines
+EDUCATION
+B.Tech in Computer Science"""
+startup_profile = StartupProfile()
+
+# Prometheus metrics at /api/metrics. Component counters and queue depths are
+# read from their stats() when scraped; only histograms are updated per request.
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+metrics = MetricsRegistry()
+http_request_seconds = metrics.histogram(
+    "skillsync_http_request_duration_seconds", "HTTP request latency by route template",
+    labelnames=("method", "route", "status"),
+)
+stage_seconds = metrics.histogram(
+    "skillsync_stage_duration_seconds", "Latency of each resume analysis stage", labelnames=("stage",)
+)
+upload_bytes = metrics.histogram("skillsync_upload_bytes", "Size of uploaded resumes", SIZE_BUCKETS)
+pdf_pages = metrics.histogram("skillsync_pdf_pages", "Pages per extracted resume", COUNT_BUCKETS)
+prompt_tokens = metrics.histogram("skillsync_prompt_tokens", "Estimated tokens per Gemini prompt", TOKEN_BUCKETS)
+gemini_seconds = metrics.histogram(
+    "skillsync_gemini_call_duration_seconds", "Upstream Gemini calls, including retries", labelnames=("outcome",)
+)
+gemini_first_field_seconds = metrics.histogram(
+    "skillsync_gemini_first_field_seconds", "Time until the first analysis field streams in from Gemini"
+)
+analyses_total = metrics.counter("skillsync_analyses_total", "Stored analyses by how they were produced", ("mode",))
+event_loop_lag = metrics.histogram(
+    "skillsync_event_loop_lag_seconds", "How late the event loop runs a timer",
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+loop_lag_monitor = EventLoopLagMonitor(event_loop_lag, interval=float(os.environ.get('EVENT_LOOP_LAG_INTERVAL', '0.5')))
+
+def _labelled(label: str, values: Dict[str, Any]) -> list:
+    return [({label: name}, value) for name, value in values.items()]
+
+metrics.callback("skillsync_gemini_tokens_total", "Tokens reported by Gemini", lambda: _labelled(
+    "kind", {"prompt": gemini_client.prompt_tokens, "output": gemini_client.output_tokens}
+), type="counter")
+metrics.callback("skillsync_prompt_tokens_saved_total", "Resume tokens removed by prompt compaction",
+                 lambda: prompt_builder.stats()["saved_tokens"], type="counter")
+metrics.callback("skillsync_gemini_active_calls", "Gemini calls holding a concurrency slot",
+                 lambda: gemini_caller.governor.active)
+metrics.callback("skillsync_gemini_queue_depth", "Gemini calls waiting for a concurrency slot",
+                 lambda: gemini_caller.governor.waiting)
+metrics.callback("skillsync_gemini_in_flight", "Distinct Gemini prompts in flight", lambda: gemini_single_flight.stats()["in_flight"])
+metrics.callback("skillsync_gemini_coalesced_total", "Callers that shared an in-flight Gemini call",
+                 lambda: gemini_single_flight.coalesced_calls, type="counter")
+metrics.callback("skillsync_gemini_retries_total", "Gemini calls retried", lambda: gemini_caller.retries, type="counter")
+metrics.callback("skillsync_gemini_rejected_total", "Gemini calls refused by admission control", lambda: _labelled("reason", {
+    "queue_full": gemini_caller.governor.rejected_queue_full,
+    "queue_timeout": gemini_caller.governor.rejected_timeout,
+    "rate_limited": gemini_caller.rate_limiter.rejected,
+    "circuit_open": gemini_caller.breaker.rejected,
+}), type="counter")
+metrics.callback("skillsync_gemini_circuit_state", "1 for the circuit breaker's current state", lambda: [
+    ({"state": state}, int(gemini_caller.breaker.state == state)) for state in ("closed", "open", "half_open")
+])
+metrics.callback("skillsync_analysis_cache_entries", "Analyses held in the in-process cache",
+                 lambda: analysis_cache.stats()["entries"])
+metrics.callback("skillsync_analysis_cache_lookups_total", "Analysis cache lookups by result", lambda: _labelled("result", {
+    "hit": analysis_cache.hits, "mongo_hit": analysis_cache.mongo_hits, "miss": analysis_cache.misses,
+}), type="counter")
+metrics.callback("skillsync_batch_queue_depth", "Batch items waiting for a worker", lambda: batch_jobs.queue_depth)
+metrics.callback("skillsync_analysis_write_pending", "Analysis records waiting to be written",
+                 lambda: analysis_writer.pending)
+metrics.callback("skillsync_analysis_write_spilled_total", "Analysis records spilled to disk",
+                 lambda: analysis_writer.spilled, type="counter")
+metrics.callback("skillsync_catalog_internships", "Internships in the current catalog",
+                 lambda: len(catalog.current.internships))
+metrics.callback("skillsync_analytics_flush_conflicts_total", "Analytics rollup merges retried after a concurrent update",
+                 lambda: analytics.conflicts, type="counter")
+metrics.callback("skillsync_candidate_index_resumes", "Resumes in the candidate index", lambda: len(candidate_index))
+metrics.callback("skillsync_ready", "1 once startup and warm-up have finished", lambda: int(startup_profile.ready))
+metrics.callback("skillsync_startup_step_seconds", "Duration of each startup step",
+                 lambda: _labelled("step", startup_profile.steps))
+metrics.callback("skillsync_event_loop_lag_last_seconds", "Most recent event loop lag sample",
+                 lambda: loop_lag_monitor.last_lag)
+
+async def warm_up():
+    """Open the Mongo and Gemini pools and run a sample resume through every CPU-heavy stage."""
+    with startup_profile.step("warm_mongo"):
+        try:
+            await client.admin.command('ping')
+        except Exception as e:
+            logger.warning(f"MongoDB is not reachable yet: {e}")
+    with startup_profile.step("warm_pdf"):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", dir=UPLOAD_SPOOL_DIR) as sample:
+            sample.write(sample_pdf(WARMUP_RESUME))
+            sample.flush()
+            extracted = await pdf_extractor.warm_up(sample.name)
+    with startup_profile.step("warm_analysis"):
+        snapshot = catalog.current
+        resume_skills = snapshot.matcher.match(extracted.text)
+        analysis = fast_analyzer.analyze(extracted.text)
+        for ranking in ("skills", "semantic"):
+            recommend_internships(snapshot, analysis, resume_skills, ranking=ranking, resume=extracted.text)
+    with startup_profile.step("warm_gemini"):
+        await gemini_client.warm_up()
+
+async def become_ready():
+    """Everything that waits on Mongo or Gemini, run once the server is accepting connections."""
+    with startup_profile.step("indexes"):
+        # Separate collections, so the index builds can overlap; each logs its own failure
+        await asyncio.gather(
+            analysis_cache.ensure_indexes(),
+            batch_jobs.ensure_indexes(),
+            analysis_writer.ensure_indexes(),
+            analytics.ensure_indexes(),
+            status_checks.ensure_indexes(),
+        )
+    with startup_profile.step("candidates"):
+        try:
+            await candidate_index.rebuild(db.resume_analyses)
+        except Exception as e:
+            logger.warning(f"Candidate index rebuilt from {len(candidate_index)} resumes only: {e}")
+    # Analyses stored by other workers from now on, and the rest of the rebuild if it failed
+    candidate_index.start(db.resume_analyses)
+    attempt = 0
+    while True:
+        try:
+            if not catalog.loaded:
+                with startup_profile.step("catalog"):
+                    await catalog.reload()
+            if WARMUP_ENABLED:
+                await warm_up()
+            break
+        except Exception as e:
+            startup_profile.mark_failed(f"Warm-up failed: {e!r}")
+        await asyncio.sleep(backoff_delay(attempt, WARMUP_RETRY_BASE_DELAY, WARMUP_RETRY_MAX_DELAY))
+        attempt += 1
+    startup_profile.mark_ready()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(f"Imported in {startup_profile.import_seconds:.2f}s")
+    # Only local setup before the server accepts connections, so liveness answers
+    # however slow Mongo is. A catalog file is local; a Mongo one loads in become_ready().
+    if CATALOG_SOURCE != 'mongo':
+        with startup_profile.step("catalog"):
+            await catalog.reload()
+    with startup_profile.step("pools"):
+        pdf_extractor.start()
+        await gemini_client.start()
+    catalog.start_watching()
+    await analysis_writer.start()
+    await analytics.start()
+    await batch_jobs.start()
+    loop_lag_monitor.start()
+    readiness_task = asyncio.create_task(become_ready())
     try:
-        internships_path = ROOT_DIR.parent / 'frontend' / 'public' / 'thing.json'
-        with open(internships_path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logging.error(f"Error loading internships: {e}")
-        return []
+        yield
+    finally:
+        readiness_task.cancel()
+        await asyncio.gather(readiness_task, return_exceptions=True)
+        await candidate_index.stop()
+        await loop_lag_monitor.stop()
+        await batch_jobs.stop()
+        await analytics.stop()
+        await analysis_writer.stop()
+        await catalog.stop_watching()
+        await gemini_client.aclose()
+        pdf_extractor.shutdown()
+        client.close()
+
+# Create the main app without a prefix
+app = FastAPI(lifespan=lifespan)
 
-INTERNSHIPS_DATA = load_internships()
+# Create a router with the /api prefix
+api_router = APIRouter(prefix="/api")
 
 # Define Models
 class ResumeAnalysis(BaseModel):
@@ -53,6 +368,7 @@ class ResumeAnalysis(BaseModel):
     weaknesses: List[str]
     suggestions: List[str]
     raw_analysis: str
+    analysis_mode: str = "full"
 
 class InternshipRecommendation(BaseModel):
     id: int
@@ -69,6 +385,25 @@ class InternshipRecommendation(BaseModel):
 class AnalyzeResponse(BaseModel):
     analysis: ResumeAnalysis
     recommendations: List[InternshipRecommendation]
+    # Pass to /api/analyses/{analysis_id}/recommendations to re-rank later without re-uploading
+    analysis_id: Optional[str] = None
+
+class StoredRecommendations(BaseModel):
+    analysis_id: str
+    catalog_version: int
+    recommendations: List[InternshipRecommendation]
+
+class CandidateMatch(BaseModel):
+    analysis_id: str
+    rating: float
+    match_percentage: int
+    matched_skills: List[str]
+
+class CandidatesResponse(BaseModel):
+    internship_id: int
+    catalog_version: int
+    indexed: int
+    candidates: List[CandidateMatch]
 
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -78,20 +413,7 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
-# Helper Functions
-def extract_text_from_pdf(pdf_file: bytes) -> str:
-    try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        logging.error(f"Error extracting PDF text: {e}")
-        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
-
-async def analyze_with_gemini(resume_text: str) -> dict:
-    prompt = """You are a professional resume expert.  
+ANALYSIS_PROMPT = """You are a professional resume expert.  
 Analyze the following resume carefully and respond with a JSON object ONLY (no additional commentary or text).  
 
 The JSON must strictly follow this structure:  
@@ -121,159 +443,522 @@ Rules:
 - Each bullet point in strengths, weaknesses, and suggestions MUST start with two leading spaces (e.g., " Strong in JavaScript").  
 - Ensure clean spacing between strengths, weaknesses, and suggestions blocks (two blank lines).  
 - "raw_analysis" should be a plain, unformatted text (no bullet points, no special characters).  
-- Based on the resume, recommend any of the 4 skills from these as suggestions: Node.js, Express, PostgreSQL, Docker, React, TypeScript, TailwindCSS, REST APIs, MERN Stack, GitHub Actions, Git, AWS, Kubernetes, CI/CD, Jenkins, Linux, Flutter, Firebase, Dart, Python, NLP, Transformers, FastAPI, OpenCV, TensorFlow, Deep Learning, SQL, ETL, Apache Spark, SIEM Tools, Threat Analysis, Networking, Burp Suite, OWASP, Solidity, Ethereum, Web3.js, Smart Contracts
+- Based on the resume, recommend any of the 4 skills from these as suggestions: """ + ", ".join(SUGGESTED_SKILLS) + """
 
 Resume:
-""" + resume_text
+"""
+prompt_builder = PromptBuilder(ANALYSIS_PROMPT, token_budget=PROMPT_TOKEN_BUDGET)
 
+# Helper Functions
+async def extract_resume_text(pdf_path: str) -> str:
     try:
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}]
-        }
-        
-        response = requests.post(
-            GEMINI_ENDPOINT,
-            headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            logging.error(f"Gemini API error: {response.status_code} - {response.text}")
-            raise HTTPException(status_code=500, detail="AI analysis service unavailable")
+        with stage_seconds.time("extract"):
+            extracted = await pdf_extractor.extract(pdf_path)
+        pdf_pages.observe(extracted.pages)
+        return extracted.text
+    except PDFLimitExceeded as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except PDFExtractionError as e:
+        logging.error(f"Error extracting PDF text: {e}")
+        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+
+async def analyze_with_gemini(prompt: str, on_field: Optional[FieldCallback] = None) -> dict:
+    """Gemini analysis for ``prompt``; ``on_field`` sees each top-level field as it streams in."""
+    # Identical prompts in flight at the same time share one upstream call
+    key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    fanout = gemini_fanouts.get(key)
+    if fanout is None or fanout.closed:
+        fanout = gemini_fanouts[key] = FieldFanout()
+    if on_field is not None:
+        fanout.subscribe(on_field)
+    try:
+        analysis_data = await gemini_single_flight.do(key, lambda: _run_gemini_analysis(key, prompt, fanout))
+    finally:
+        if on_field is not None:
+            fanout.unsubscribe(on_field)
+    # Coalesced callers share one result object, so hand each its own copy
+    return dict(analysis_data)
+
+async def _run_gemini_analysis(key: str, prompt: str, fanout: FieldFanout) -> dict:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        if GEMINI_STREAMING:
+            analysis_data = await gemini_caller.call(lambda: _stream_gemini_analysis(prompt, fanout))
+        else:
+            analysis_data = await _parse_gemini_analysis(prompt)
+        outcome = "ok"
+        return analysis_data
+    except AdmissionRejected:
+        outcome = "rejected"
+        raise
+    finally:
+        gemini_seconds.observe(time.perf_counter() - started, outcome)
+        fanout.close()
+        if gemini_fanouts.get(key) is fanout:
+            del gemini_fanouts[key]
+
+async def _stream_gemini_analysis(prompt: str, fanout: FieldFanout) -> dict:
+    parser = IncrementalJSONParser()
+    started = time.perf_counter()
+    # Closing the stream as soon as the parser gives up frees the connection early
+    async with aclosing(gemini_client.stream_generate_content(prompt)) as chunks:
+        async for chunk in chunks:
+            for name, value in parser.feed(chunk):
+                if not fanout.fields:
+                    gemini_first_field_seconds.observe(time.perf_counter() - started)
+                fanout.publish(name, value)
+            if parser.complete:
+                break
+    return parser.close()
+
+async def _parse_gemini_analysis(prompt: str) -> dict:
+    ai_text = await gemini_caller.call(lambda: gemini_client.generate_content(prompt))
+    
+    if not ai_text:
+        raise GeminiError("No response from AI analysis")
+    
+    # Try to parse JSON from response
+    try:
+        # Clean the response - remove markdown formatting if present
+        clean_text = ai_text.strip()
+        if clean_text.startswith('```json'):
+            clean_text = clean_text[7:]
+        if clean_text.endswith('```'):
+            clean_text = clean_text[:-3]
         
-        data = response.json()
-        ai_text = data.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
+        analysis_data = json.loads(clean_text)
+        return analysis_data
         
-        if not ai_text:
-            raise HTTPException(status_code=500, detail="No response from AI analysis")
+    except json.JSONDecodeError:
+        # Try to extract JSON from text using regex
+        json_match = re.search(r'\{.*\}', ai_text, re.DOTALL)
+        if json_match:
+            try:
+                analysis_data = json.loads(json_match.group())
+                return analysis_data
+            except json.JSONDecodeError:
+                pass
         
-        # Try to parse JSON from response
-        try:
-            # Clean the response - remove markdown formatting if present
-            clean_text = ai_text.strip()
-            if clean_text.startswith('```json'):
-                clean_text = clean_text[7:]
-            if clean_text.endswith('```'):
-                clean_text = clean_text[:-3]
-            
-            analysis_data = json.loads(clean_text)
-            return analysis_data
-            
-        except json.JSONDecodeError:
-            # Try to extract JSON from text using regex
-            json_match = re.search(r'\{.*\}', ai_text, re.DOTALL)
-            if json_match:
-                try:
-                    analysis_data = json.loads(json_match.group())
-                    return analysis_data
-                except json.JSONDecodeError:
-                    pass
-            
-            # Fallback response if JSON parsing fails
-            logging.warning("Failed to parse Gemini response as JSON, using fallback")
-            return {
-                "overall_rating": 6.0,
-                "strengths": [" Good technical foundation", " Shows learning ability"],
-                "weaknesses": [" Limited professional experience", " Could improve technical depth"],
-                "suggestions": [" Gain more hands-on experience", " Learn modern frameworks"],
-                "raw_analysis": ai_text[:500] + "..." if len(ai_text) > 500 else ai_text
-            }
-            
-    except requests.RequestException as e:
-        logging.error(f"Error calling Gemini API: {e}")
-        raise HTTPException(status_code=500, detail="AI analysis service unavailable")
-
-def calculate_skill_matches(resume_text: str, internship: dict) -> tuple:
-    resume_lower = resume_text.lower()
+        raise GeminiError("Failed to parse Gemini response as JSON")
+
+def gemini_http_error(e: Exception) -> HTTPException:
+    if isinstance(e, AdmissionRejected):
+        return HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    return HTTPException(status_code=500, detail="AI analysis service unavailable")
+
+def calculate_skill_matches(resume_skills: FrozenSet[int], internship: dict, matcher: SkillMatcher) -> tuple:
     skills_required = internship.get('skills_required', [])
     matched_skills = []
     
     for skill in skills_required:
-        if isinstance(skill, str) and skill.lower() in resume_lower:
+        if isinstance(skill, str) and matcher.skill_id(skill) in resume_skills:
             matched_skills.append(skill)
     
     match_percentage = int((len(matched_skills) / len(skills_required)) * 100) if skills_required else 0
     return matched_skills, match_percentage
 
-def recommend_internships(analysis: dict, resume_text: str) -> List[InternshipRecommendation]:
-    overall_rating = analysis.get('overall_rating', 6.0)
+def recommend_internships(
+    snapshot: CatalogSnapshot,
+    analysis: dict,
+    resume_skills: FrozenSet[int],
+    k: int = 6,
+    rating_tolerance: float = 1.0,
+    ranking: str = "skills",
+    resume: Union[str, Mapping[str, int]] = "",
+) -> List[InternshipRecommendation]:
+    """Top ``k`` internships; ``resume`` (its text or stored terms) is only needed for semantic ranking."""
+    overall_rating = float(analysis.get('overall_rating', 6.0))
+    if ranking == "semantic" and snapshot.semantic is not None:
+        ranked = snapshot.semantic.top_k(resume, resume_skills, overall_rating, k, rating_tolerance)
+        return _build_recommendations(snapshot, resume_skills, ranked)
+    # Only the final top-k candidates are turned into response models
+    ranked = snapshot.engine.top_k(overall_rating, resume_skills, k, rating_tolerance)
+    # Minimum 10% for score-based matches
+    return _build_recommendations(snapshot, resume_skills, ranked, min_percentage=10)
+
+def recommend_by_skills(snapshot: CatalogSnapshot, resume_skills: FrozenSet[int], k: int = 6) -> List[InternshipRecommendation]:
+    """Skill-overlap-only recommendations, available before any rating is known."""
+    ranked = snapshot.engine.top_k_by_skills(resume_skills, k)
+    return _build_recommendations(snapshot, resume_skills, ranked)
+
+def _build_recommendations(
+    snapshot: CatalogSnapshot,
+    resume_skills: FrozenSet[int],
+    ranked: List[tuple],
+    min_percentage: int = 0,
+) -> List[InternshipRecommendation]:
     recommendations = []
     
-    for internship in INTERNSHIPS_DATA:
-        score_range = internship.get('score_range', [5, 10])
+    for internship, match_percentage in ranked:
+        matched_skills, _ = calculate_skill_matches(resume_skills, internship, snapshot.matcher)
+        recommendation = InternshipRecommendation(
+            id=internship['id'],
+            title=internship['title'],
+            company=internship['company'],
+            location=internship['location'],
+            skills_required=internship['skills_required'],
+            score_range=internship['score_range'],
+            category=internship['category'],
+            description=internship['description'],
+            match_percentage=max(match_percentage, min_percentage),
+            matched_skills=matched_skills
+        )
+        recommendations.append(recommendation)
+    
+    return recommendations
+
+
+@dataclass
+class PreparedResume:
+    content_hash: str
+    raw_key: str
+    text_key: Optional[str]
+    resume_text: str
+    cached: Optional[Dict[str, Any]]
+    prompt_stats: Optional[Dict[str, Any]] = None
+
+async def prepare_resume(pdf_path: str, content_hash: str) -> PreparedResume:
+    """Cache lookup and text extraction: the CPU-bound half of an analysis."""
+    raw_key = analysis_cache.raw_key(content_hash)
+    text_key = None
+    with stage_seconds.time("cache_lookup"):
+        cached = await analysis_cache.get(raw_key)
+    
+    if cached is None:
+        resume_text = await extract_resume_text(pdf_path)
+        
+        if not resume_text.strip():
+            raise HTTPException(status_code=400, detail="No text found in PDF")
         
-        # Check if the overall rating falls within the internship's score range (with some flexibility)
-        if (overall_rating >= score_range[0] - 1) and (overall_rating <= score_range[1] + 1):
-            matched_skills, match_percentage = calculate_skill_matches(resume_text, internship)
-            
-            # Only include internships with at least some skill match or within perfect score range
-            if match_percentage > 0 or (overall_rating >= score_range[0] and overall_rating <= score_range[1]):
-                recommendation = InternshipRecommendation(
-                    id=internship['id'],
-                    title=internship['title'],
-                    company=internship['company'],
-                    location=internship['location'],
-                    skills_required=internship['skills_required'],
-                    score_range=internship['score_range'],
-                    category=internship['category'],
-                    description=internship['description'],
-                    match_percentage=max(match_percentage, 10),  # Minimum 10% for score-based matches
-                    matched_skills=matched_skills
-                )
-                recommendations.append(recommendation)
+        text_key = analysis_cache.text_key(resume_text)
+        with stage_seconds.time("cache_lookup"):
+            cached = await analysis_cache.get(text_key)
+        if cached is not None:
+            await analysis_cache.link(raw_key, text_key, cached)
     
-    # Sort by match percentage (descending) and then by score compatibility
-    recommendations.sort(key=lambda x: (x.match_percentage, -abs(overall_rating - sum(x.score_range)/2)), reverse=True)
+    if cached is not None:
+        resume_text = cached["resume_text"]
+    return PreparedResume(
+        content_hash=content_hash, raw_key=raw_key, text_key=text_key, resume_text=resume_text, cached=cached
+    )
+
+async def run_analysis(prepared: PreparedResume, mode: str = "full", on_field: Optional[FieldCallback] = None) -> dict:
+    """Analysis for ``mode``: cached or fresh Gemini output for ``full``, heuristics for ``fast``.
     
-    # Return top 6 recommendations
-    return recommendations[:6]
+    ``on_field`` is called with each field of a fresh Gemini analysis as it
+    streams in, before the analysis is validated. A ``full`` analysis that Gemini cannot provide (rejected, circuit open,
+    upstream error or unparseable output) degrades to the fast analyzer when
+    ANALYSIS_DEGRADE_TO_FAST is on. Only real Gemini results are cached.
+    """
+    if mode == "fast":
+        with stage_seconds.time("fast_analysis"):
+            return fast_analyzer.analyze(prepared.resume_text)
+    if prepared.cached is not None:
+        return prepared.cached["analysis"]
+    
+    # Analyze with Gemini AI, sending a compacted, token-budgeted copy of the resume
+    with stage_seconds.time("prompt"):
+        built = prompt_builder.build(prepared.resume_text)
+    prepared.prompt_stats = built.stats()
+    prompt_tokens.observe(built.prompt_tokens)
+    try:
+        with stage_seconds.time("gemini"):
+            analysis_data = await analyze_with_gemini(built.prompt, on_field)
+        analysis_data = ResumeAnalysis(**analysis_data).model_dump()
+    except (AdmissionRejected, GeminiError, IncrementalJSONError, TypeError, ValidationError) as e:
+        if not ANALYSIS_DEGRADE_TO_FAST:
+            logging.error(f"Gemini analysis failed: {e}")
+            raise gemini_http_error(e)
+        logging.warning(f"Gemini analysis failed, using fast analysis instead: {e}")
+        return fast_analyzer.analyze(prepared.resume_text, mode="degraded")
+    
+    await analysis_cache.put(
+        prepared.raw_key, prepared.text_key,
+        {"analysis": analysis_data, "resume_text": prepared.resume_text}
+    )
+    return analysis_data
+
+async def store_analysis(
+    prepared: PreparedResume,
+    filename: Optional[str],
+    analysis_data: dict,
+    recommendations: List[InternshipRecommendation],
+    profile: Dict[str, Any],
+) -> str:
+    analysis_record = {
+        "filename": filename,
+        "content_hash": prepared.content_hash,
+        "analysis": analysis_data,
+        "recommendations_count": len(recommendations),
+        "recommended_ids": [recommendation.id for recommendation in recommendations],
+        "profile": profile,
+        "cache_hit": prepared.cached is not None,
+        "prompt": prepared.prompt_stats,
+        "timestamp": datetime.utcnow()
+    }
+    with stage_seconds.time("persist"):
+        analysis_id = await analysis_writer.put(analysis_record)
+    candidate_index.add(analysis_id, profile)
+    analytics.record(analysis_record)
+    analyses_total.inc("cached" if prepared.cached is not None else analysis_data.get("analysis_mode", "full"))
+    return str(analysis_id)
+
+def analysis_profile(snapshot: CatalogSnapshot, prepared: PreparedResume, analysis_data: dict, resume_skills: FrozenSet[int]) -> Dict[str, Any]:
+    rating = float(analysis_data.get('overall_rating', 6.0))
+    return build_profile(snapshot, resume_skills, rating, prepared.content_hash, prepared.resume_text)
+
+async def complete_analysis(
+    prepared: PreparedResume,
+    filename: Optional[str],
+    top_k: int = 6,
+    rating_tolerance: float = 1.0,
+    mode: str = "full",
+    ranking: str = "skills",
+) -> AnalyzeResponse:
+    """Gemini analysis, ranking and persistence: the I/O-bound half of an analysis."""
+    analysis_data = await run_analysis(prepared, mode)
+    
+    # Create analysis object
+    analysis = ResumeAnalysis(**analysis_data)
+    
+    # Get internship recommendations, pinning one catalog version for matching and ranking
+    snapshot = catalog.current
+    with stage_seconds.time("recommend"):
+        resume_skills = snapshot.matcher.match(prepared.resume_text)
+        recommendations = recommend_internships(
+            snapshot, analysis_data, resume_skills, top_k, rating_tolerance, ranking, prepared.resume_text
+        )
+    
+    # Store analysis in database (optional), with the profile needed to re-rank it later
+    profile = analysis_profile(snapshot, prepared, analysis_data, resume_skills)
+    analysis_id = await store_analysis(prepared, filename, analysis_data, recommendations, profile)
+    
+    return AnalyzeResponse(
+        analysis=analysis,
+        recommendations=recommendations,
+        analysis_id=analysis_id
+    )
+
+def _stream_event(stream_format: str, event: str, data: Any) -> str:
+    data = jsonable_encoder(data)
+    if stream_format == "ndjson":
+        return json.dumps({"event": event, "data": data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_analysis(
+    prepared: PreparedResume,
+    filename: Optional[str],
+    top_k: int,
+    rating_tolerance: float,
+    mode: str,
+    stream_format: str,
+    ranking: str = "skills",
+):
+    """Yield one event per analysis stage, cheapest first.
+    
+    Text stats and skill-only recommendations need no LLM and go out as soon
+    as the text is extracted. Rating-ranked recommendations follow as soon as
+    ``overall_rating`` has streamed in from Gemini, which is usually well
+    before the full analysis is complete; the analysis follows when it is.
+    """
+    snapshot = catalog.current
+    resume_skills = snapshot.matcher.match(prepared.resume_text)
+    text = prepared.resume_text
+    
+    yield _stream_event(stream_format, "text_stats", {
+        "filename": filename,
+        "characters": len(text),
+        "words": len(text.split()),
+        "lines": text.count("\n") + 1,
+        "skills_detected": sorted(snapshot.matcher.skill_names[skill_id] for skill_id in resume_skills),
+        "cache_hit": prepared.cached is not None,
+    })
+    yield _stream_event(stream_format, "skill_recommendations", recommend_by_skills(snapshot, resume_skills, top_k))
+    
+    early_rating, on_field = first_field("overall_rating")
+    analysis_task = asyncio.ensure_future(run_analysis(prepared, mode, on_field))
+    early_recommendations = None
+    try:
+        await asyncio.wait({analysis_task, early_rating}, return_when=asyncio.FIRST_COMPLETED)
+        if early_rating.done() and isinstance(early_rating.result(), (int, float)):
+            rating = early_rating.result()
+            early_recommendations = recommend_internships(
+                snapshot, {"overall_rating": rating}, resume_skills, top_k, rating_tolerance, ranking, text
+            )
+            yield _stream_event(stream_format, "recommendations", early_recommendations)
+        
+        analysis_data = await analysis_task
+        analysis = ResumeAnalysis(**analysis_data)
+    except HTTPException as e:
+        yield _stream_event(stream_format, "error", {"status_code": e.status_code, "detail": e.detail})
+        return
+    except Exception as e:
+        logging.error(f"Error analyzing resume: {e}")
+        yield _stream_event(stream_format, "error", {"status_code": 500, "detail": "Failed to analyze resume"})
+        return
+    finally:
+        # The client may disconnect mid-stream
+        analysis_task.cancel()
+    yield _stream_event(stream_format, "analysis", analysis)
+    
+    with stage_seconds.time("recommend"):
+        recommendations = recommend_internships(
+            snapshot, analysis_data, resume_skills, top_k, rating_tolerance, ranking, text
+        )
+    # A degraded analysis brings its own rating, so re-rank if it changed the list
+    if early_recommendations is None or recommendations != early_recommendations:
+        yield _stream_event(stream_format, "recommendations", recommendations)
+    
+    analysis_id = None
+    try:
+        profile = analysis_profile(snapshot, prepared, analysis_data, resume_skills)
+        analysis_id = await store_analysis(prepared, filename, analysis_data, recommendations, profile)
+    except Exception as e:
+        logging.error(f"Error storing analysis: {e}")
+    yield _stream_event(stream_format, "done", {"prompt": prepared.prompt_stats, "analysis_id": analysis_id})
+
+def record_upload(upload: SpooledUpload, started: float):
+    stage_seconds.record(time.perf_counter() - started, "upload")
+    upload_bytes.observe(upload.size)
+
+async def complete_batch_item(prepared: PreparedResume, filename: Optional[str], options: Dict[str, Any]) -> dict:
+    response = await complete_analysis(
+        prepared, filename, options.get("top_k", 6), options.get("rating_tolerance", 1.0),
+        options.get("mode", "full"), options.get("ranking", "skills"),
+    )
+    return response.model_dump()
+
+# Bulk analysis jobs
+batch_jobs = BatchJobManager(
+    db.batch_jobs,
+    db.batch_job_items,
+    spool_dir=Path(os.environ.get('BATCH_SPOOL_DIR', Path(tempfile.gettempdir()) / 'skillsync-batch')),
+    prepare=prepare_resume,
+    complete=complete_batch_item,
+    extract_concurrency=int(os.environ.get('BATCH_EXTRACT_CONCURRENCY', '2')),
+    gemini_concurrency=int(os.environ.get('BATCH_GEMINI_CONCURRENCY', '4')),
+    max_files=int(os.environ.get('BATCH_MAX_FILES', '500')),
+    max_file_bytes=MAX_UPLOAD_BYTES,
+    claim_timeout=float(os.environ.get('BATCH_CLAIM_TIMEOUT', '900')),
+)
 
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "SkillSync API - AI-Based Internship Recommendation Engine"}
 
+@api_router.get("/health/live")
+async def health_live():
+    return {"status": "live"}
+
+@api_router.get("/health/ready")
+async def health_ready():
+    report = startup_profile.report()
+    if not startup_profile.ready:
+        return JSONResponse(status_code=503, content=report)
+    return report
+
 @api_router.get("/internships")
-async def get_internships():
-    return INTERNSHIPS_DATA
+async def get_internships(
+    request: Request,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    skills_required: List[str] = Query([]),
+    score: Optional[float] = Query(None, ge=0, le=10),
+    fields: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    snapshot = catalog.current
+    query = ListingQuery(
+        category=category,
+        location=location,
+        skills=tuple(sorted(set(skills_required))),
+        score=score,
+        fields=tuple(name.strip() for name in fields.split(',') if name.strip()) if fields else (),
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+    )
+    try:
+        page = snapshot.listing.page(query)
+    except ListingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {
+        "ETag": page.etag,
+        "Cache-Control": INTERNSHIPS_CACHE_CONTROL,
+        "X-Total-Count": str(page.total),
+        "X-Catalog-Version": str(snapshot.version),
+    }
+    if page.next_cursor:
+        next_url = request.url.remove_query_params("offset").include_query_params(cursor=page.next_cursor)
+        headers["X-Next-Cursor"] = page.next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    
+    if etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
 
-@api_router.post("/analyze-resume", response_model=AnalyzeResponse)
-async def analyze_resume(resume: UploadFile = File(...)):
-    # Validate file type
-    if not resume.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+@api_router.get("/internships/{internship_id}/candidates", response_model=CandidatesResponse)
+async def get_internship_candidates(
+    internship_id: int,
+    top_k: int = Query(10, ge=1, le=100),
+    rating_tolerance: float = Query(1.0, ge=0, le=10),
+):
+    """The stored resumes that best fit one internship, by skill overlap and then rating fit."""
+    snapshot = catalog.current
+    internship = snapshot.by_id.get(internship_id)
+    if internship is None:
+        raise HTTPException(status_code=404, detail="Internship not found")
+    # Canonical names, as resume profiles store them
+    matcher = snapshot.matcher
+    skills = []
+    for skill in internship['skills_required']:
+        skill_id = matcher.skill_id(skill)
+        skills.append(matcher.skill_names[skill_id] if skill_id is not None else skill)
     
+    with stage_seconds.time("candidates"):
+        candidates = candidate_index.top_k(
+            skills, internship['score_range'], top_k, rating_tolerance
+        )
+    return CandidatesResponse(
+        internship_id=internship_id,
+        catalog_version=snapshot.version,
+        indexed=len(candidate_index),
+        candidates=[CandidateMatch(**candidate._asdict()) for candidate in candidates],
+    )
+
+@api_router.get("/catalog")
+async def get_catalog_info():
+    return catalog.current.info()
+
+@api_router.post("/analyze-resume", response_model=AnalyzeResponse)
+async def analyze_resume(
+    response: Response,
+    resume: UploadFile = File(...),
+    top_k: int = Query(6, ge=1, le=50),
+    rating_tolerance: float = Query(1.0, ge=0, le=10),
+    mode: str = Query("full", pattern=ANALYSIS_MODE_PATTERN),
+    ranking: str = Query("skills", pattern=RANKING_PATTERN),
+):
     try:
-        # Read and extract text from PDF
-        pdf_content = await resume.read()
-        resume_text = extract_text_from_pdf(pdf_content)
-        
-        if not resume_text.strip():
-            raise HTTPException(status_code=400, detail="No text found in PDF")
-        
-        # Analyze with Gemini AI
-        analysis_data = await analyze_with_gemini(resume_text)
-        
-        # Create analysis object
-        analysis = ResumeAnalysis(**analysis_data)
-        
-        # Get internship recommendations
-        recommendations = recommend_internships(analysis_data, resume_text)
+        # Stream the upload to disk (size-capped, magic-checked) before doing any work
+        started = time.perf_counter()
+        async with spool_upload(resume, MAX_UPLOAD_BYTES, UPLOAD_SPOOL_DIR) as upload:
+            record_upload(upload, started)
+            prepared = await prepare_resume(upload.path, upload.sha256)
         
-        # Store analysis in database (optional)
-        analysis_record = {
-            "filename": resume.filename,
-            "analysis": analysis_data,
-            "recommendations_count": len(recommendations),
-            "timestamp": datetime.utcnow()
-        }
-        await db.resume_analyses.insert_one(analysis_record)
-        
-        return AnalyzeResponse(
-            analysis=analysis,
-            recommendations=recommendations
-        )
+        result = await complete_analysis(prepared, resume.filename, top_k, rating_tolerance, mode, ranking)
+        if prepared.prompt_stats is not None:
+            response.headers["X-Prompt-Tokens"] = str(prepared.prompt_stats["prompt_tokens"])
+        return result
         
     except HTTPException:
         raise
@@ -281,6 +966,133 @@ async def analyze_resume(resume: UploadFile = File(...)):
         logging.error(f"Error analyzing resume: {e}")
         raise HTTPException(status_code=500, detail="Failed to analyze resume")
 
+@api_router.post("/analyze-resume/stream")
+async def analyze_resume_stream(
+    resume: UploadFile = File(...),
+    top_k: int = Query(6, ge=1, le=50),
+    rating_tolerance: float = Query(1.0, ge=0, le=10),
+    mode: str = Query("full", pattern=ANALYSIS_MODE_PATTERN),
+    ranking: str = Query("skills", pattern=RANKING_PATTERN),
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+):
+    # Extraction runs before the response starts, so bad uploads still get a plain 4xx
+    started = time.perf_counter()
+    async with spool_upload(resume, MAX_UPLOAD_BYTES, UPLOAD_SPOOL_DIR) as upload:
+        record_upload(upload, started)
+        prepared = await prepare_resume(upload.path, upload.sha256)
+    
+    return StreamingResponse(
+        stream_analysis(prepared, resume.filename, top_k, rating_tolerance, mode, format, ranking),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        # Keep proxies from buffering the stream until it ends
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.post("/batch-jobs", status_code=202)
+async def create_batch_job(
+    files: List[UploadFile] = File(...),
+    top_k: int = Query(6, ge=1, le=50),
+    rating_tolerance: float = Query(1.0, ge=0, le=10),
+    mode: str = Query("full", pattern=ANALYSIS_MODE_PATTERN),
+    ranking: str = Query("skills", pattern=RANKING_PATTERN),
+):
+    return await batch_jobs.submit(
+        files, {"top_k": top_k, "rating_tolerance": rating_tolerance, "mode": mode, "ranking": ranking}
+    )
+
+@api_router.get("/batch-jobs/{job_id}")
+async def get_batch_job(job_id: str):
+    status = await batch_jobs.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return status
+
+@api_router.get("/batch-jobs/{job_id}/results")
+async def get_batch_job_results(job_id: str):
+    if await batch_jobs.status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    
+    async def stream_results():
+        async for item in batch_jobs.results(job_id):
+            yield json.dumps(item, default=str) + "\n"
+    
+    return StreamingResponse(
+        stream_results(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="batch-{job_id}.ndjson"'},
+    )
+
+@api_router.get("/analyses/{analysis_id}/recommendations", response_model=StoredRecommendations)
+async def get_analysis_recommendations(
+    analysis_id: str,
+    top_k: int = Query(6, ge=1, le=50),
+    rating_tolerance: float = Query(1.0, ge=0, le=10),
+    ranking: str = Query("skills", pattern=RANKING_PATTERN),
+):
+    """Rank a stored analysis against the current catalog from its profile: no upload, PDF parse or Gemini call.
+
+    Skills the catalog gained since the analysis are found among the
+    profile's stored terms, except new multi-word skills (see ``profile_skills``).
+    """
+    if not ObjectId.is_valid(analysis_id):
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    object_id = ObjectId(analysis_id)
+    # Analyses are written in batches, so a just-finished one may still be in the buffer
+    record = analysis_writer.get(object_id)
+    if record is None:
+        record = await db.resume_analyses.find_one({"_id": object_id}, {"profile": 1})
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    profile = record.get("profile")
+    if not profile:
+        raise HTTPException(status_code=409, detail="Analysis was stored without a profile; upload the resume again")
+    
+    snapshot = catalog.current
+    with stage_seconds.time("recommend"):
+        recommendations = recommend_internships(
+            snapshot, {"overall_rating": profile["rating"]}, profile_skills(snapshot, profile),
+            top_k, rating_tolerance, ranking, profile.get("terms", {}),
+        )
+    return StoredRecommendations(
+        analysis_id=analysis_id, catalog_version=snapshot.version, recommendations=recommendations
+    )
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    return analysis_cache.stats()
+
+@api_router.get("/analyses/stats")
+async def get_analysis_write_stats():
+    return analysis_writer.stats()
+
+@api_router.get("/analytics")
+async def get_analytics(top_n: int = Query(10, ge=1, le=100)):
+    """Rating distributions and the most common weaknesses, suggestions, skills and recommended internships."""
+    report = analytics.report(top_n)
+    by_id = catalog.current.by_id
+    for item in report["top"]["internships"]:
+        internship = by_id.get(int(item["key"]))
+        if internship is not None:
+            item["item"] = f"{internship['title']} ({internship['company']})"
+    report["stats"] = analytics.stats()
+    return report
+
+@api_router.get("/candidates/stats")
+async def get_candidate_index_stats():
+    return candidate_index.stats()
+
+@api_router.get("/gemini/stats")
+async def get_gemini_stats():
+    return {
+        "single_flight": gemini_single_flight.stats(),
+        "prompt": prompt_builder.stats(),
+        **gemini_caller.stats(),
+    }
+
+@api_router.get("/metrics")
+async def get_metrics():
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Legacy routes for compatibility
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
@@ -289,22 +1101,64 @@ async def create_status_check(input: StatusCheckCreate):
     _ = await db.status_checks.insert_one(status_obj.dict())
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@api_router.get("/status")
+async def get_status_checks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    try:
+        if cursor:
+            decode_cursor(cursor)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if format == "ndjson":
+        # Streams every document after the cursor unless limited, so memory stays flat however many there are
+        async def stream_status_checks():
+            async for status_check in status_checks.stream(cursor, limit):
+                yield json.dumps(status_check, default=json_default) + "\n"
+        
+        return StreamingResponse(stream_status_checks(), media_type="application/x-ndjson")
+    
+    documents, next_cursor = await status_checks.page(limit or STATUS_PAGE_SIZE, cursor)
+    headers = {}
+    if next_cursor:
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return Response(
+        content=json.dumps(documents, default=json_default),
+        media_type="application/json",
+        headers=headers,
+    )
+
+if GEMINI_STUB_ENABLED:
+    api_router.include_router(stub_router)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Multipart framing adds a little on top of the file itself
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=MAX_UPLOAD_BYTES + 64 * 1024,
+    path_limits={"/api/batch-jobs": BATCH_MAX_UPLOAD_BYTES},
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Link", "X-Total-Count", "X-Next-Cursor", "X-Catalog-Version", "X-Prompt-Tokens", "X-Request-ID"],
 )
 
+# Outermost, so it times and tags every response, including CORS preflights and 413s
+app.add_middleware(MetricsMiddleware, requests=http_request_seconds, sample_rate=TRACE_SAMPLE_RATE)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -312,9 +1166,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+startup_profile.import_seconds = time.perf_counter() - IMPORT_STARTED
 
 if __name__ == "__main__":
     import uvicorn
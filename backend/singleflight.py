@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task and receive the same
+    result or exception. The task is shielded from any single caller being
+    cancelled, and is itself cancelled only once every caller has gone away.
+    A failed or finished call is forgotten straight away, so the next call
+    for the key starts fresh instead of replaying an old error.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None or call.task.done():
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.upstream_calls += 1
+        else:
+            self.coalesced_calls += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "upstream_calls": self.upstream_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "in_flight": len(self._calls),
+        }
@@ -0,0 +1,136 @@
+import re
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Tokens keep the characters that are part of skill names ("c++", "c#",
+# "node.js", "web3.js") but split on whitespace and other punctuation, so
+# "CI/CD" becomes ("ci", "cd") and a sentence-final "Python." stays "python".
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+# Alternative spellings, keyed by canonical skill name. Only aliases whose
+# canonical skill appears in the catalog are compiled into the matcher.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "Node.js": ["node", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "React": ["react.js", "reactjs"],
+    "PostgreSQL": ["postgres", "postgre sql"],
+    "Kubernetes": ["k8s"],
+    "TailwindCSS": ["tailwind", "tailwind css"],
+    "REST APIs": ["rest api", "restful api", "restful apis"],
+    "MERN Stack": ["mern"],
+    "CI/CD": ["cicd", "ci cd", "continuous integration"],
+    "AWS": ["amazon web services"],
+    "NLP": ["natural language processing"],
+    "FastAPI": ["fast api"],
+    "OpenCV": ["open cv"],
+    "Apache Spark": ["spark", "pyspark"],
+    "SIEM Tools": ["siem"],
+    "Burp Suite": ["burpsuite"],
+    "Web3.js": ["web3js", "web3"],
+    "Smart Contracts": ["smart contract"],
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SkillMatcher:
+    """Matches resumes against the catalog skill vocabulary in one pass.
+
+    Every skill name and alias is tokenized and compiled into a single
+    Aho-Corasick automaton over tokens. Because patterns are whole-token
+    sequences, "Git" never matches inside "GitHub" and "SQL" never matches
+    inside "PostgreSQL". ``match`` returns the set of integer skill IDs found;
+    ``skill_names[i]`` maps an ID back to its canonical name.
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Dict[str, List[str]]] = None):
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        self.skill_names: List[str] = []
+        self._ids_by_tokens: Dict[Tuple[str, ...], int] = {}
+        self._lookup: Dict[str, int] = {}
+
+        for skill in skills:
+            if isinstance(skill, str):
+                self._intern(skill)
+
+        patterns = list(self._ids_by_tokens.items())
+        for canonical, spellings in aliases.items():
+            skill_id = self._ids_by_tokens.get(tuple(tokenize(canonical)))
+            if skill_id is None:
+                continue
+            for spelling in spellings:
+                tokens = tuple(tokenize(spelling))
+                if tokens and tokens not in self._ids_by_tokens:
+                    patterns.append((tokens, skill_id))
+        self._build(patterns)
+
+    @classmethod
+    def from_internships(cls, internships: Iterable[dict], aliases: Optional[Dict[str, List[str]]] = None) -> "SkillMatcher":
+        return cls(
+            (skill for internship in internships for skill in internship.get('skills_required', [])),
+            aliases,
+        )
+
+    def _intern(self, name: str) -> Optional[int]:
+        tokens = tuple(tokenize(name))
+        if not tokens:
+            return None
+        skill_id = self._ids_by_tokens.get(tokens)
+        if skill_id is None:
+            skill_id = len(self.skill_names)
+            self._ids_by_tokens[tokens] = skill_id
+            self.skill_names.append(name)
+        self._lookup[name] = skill_id
+        return skill_id
+
+    def _build(self, patterns: List[Tuple[Tuple[str, ...], int]]):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[FrozenSet[int]] = [frozenset()]
+        for tokens, skill_id in patterns:
+            state = 0
+            for token in tokens:
+                nxt = goto[state].get(token)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][token] = nxt
+                    goto.append({})
+                    output.append(frozenset())
+                state = nxt
+            output[state] = output[state] | {skill_id}
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and token not in goto[f]:
+                    f = fail[f]
+                fallback = goto[f].get(token, 0)
+                fail[nxt] = fallback if fallback != nxt else 0
+                output[nxt] = output[nxt] | output[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def skill_id(self, name: str) -> Optional[int]:
+        skill_id = self._lookup.get(name)
+        if skill_id is None:
+            skill_id = self._ids_by_tokens.get(tuple(tokenize(name)))
+        return skill_id
+
+    def match(self, text: str) -> FrozenSet[int]:
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found.update(output[state])
+        return frozenset(found)
@@ -0,0 +1,65 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# The app module imports this module before anything else, so this is roughly when its imports began
+IMPORT_STARTED = time.perf_counter()
+
+
+class StartupProfile:
+    """Times each startup step and tracks whether the worker should take traffic.
+
+    A worker is *live* as soon as it can answer HTTP at all, and *ready* only
+    after ``mark_ready()``, which the app calls once warm-up has finished, so
+    a readiness probe keeps a new worker out of rotation until requests run at
+    full speed. A failed warm-up is recorded with ``mark_failed()`` and
+    retried, so readiness recovers once the next attempt succeeds.
+    ``import_seconds`` is how long importing the app module took;
+    run with ``python -X importtime`` for a per-module breakdown.
+    """
+
+    def __init__(self, import_seconds: float = 0.0):
+        self.import_seconds = import_seconds
+        self.steps: Dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self.failures = 0
+        self._started = time.perf_counter()
+        self._ready_after: Optional[float] = None
+
+    @contextmanager
+    def step(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - started
+            logger.info(f"Startup step {name} took {self.steps[name] * 1000:.1f}ms")
+
+    def mark_ready(self):
+        self._ready_after = time.perf_counter() - self._started
+        self.ready = True
+        self.error = None
+        logger.info(
+            f"Ready after {self._ready_after:.2f}s "
+            f"(imports {self.import_seconds:.2f}s, steps: "
+            + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.steps.items()) + ")"
+        )
+
+    def mark_failed(self, error: str):
+        self.error = error
+        self.failures += 1
+        logger.error(f"Startup attempt {self.failures} failed: {error}")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "failures": self.failures,
+            "import_seconds": round(self.import_seconds, 4),
+            "ready_after_seconds": round(self._ready_after, 4) if self._ready_after is not None else None,
+            "steps": {name: round(seconds, 4) for name, seconds in self.steps.items()},
+        }
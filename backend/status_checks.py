@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATUS_PROJECTION = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+STATUS_SORT = [("timestamp", 1), ("id", 1)]
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(document: Dict[str, Any]) -> str:
+    raw = json.dumps({"t": document["timestamp"].isoformat(), "id": document["id"]}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(position["t"]), str(position["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise CursorError("Invalid cursor")
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class StatusCheckStore:
+    """Keyset-paginated reads of the status_checks collection.
+
+    Documents are ordered by ``(timestamp, id)``, which a compound index
+    covers, and a page continues strictly after the last key of the previous
+    one. Unlike skip/offset, every page costs the same however deep it is, and
+    inserts between requests never shift or repeat entries.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self):
+        try:
+            await self.collection.create_index(STATUS_SORT)
+        except Exception as e:
+            logger.error(f"Error creating status check indexes: {e}")
+
+    def _find(self, cursor: Optional[str], limit: Optional[int]):
+        query: Dict[str, Any] = {}
+        if cursor:
+            timestamp, last_id = decode_cursor(cursor)
+            query = {"$or": [
+                {"timestamp": {"$gt": timestamp}},
+                {"timestamp": timestamp, "id": {"$gt": last_id}},
+            ]}
+        found = self.collection.find(query, STATUS_PROJECTION).sort(STATUS_SORT)
+        if limit:
+            found = found.limit(limit)
+        return found
+
+    async def page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Up to ``limit`` documents after ``cursor``, and the cursor for the next page if there is one."""
+        # One extra document tells us whether another page exists
+        documents = await self._find(cursor, limit + 1).to_list(limit + 1)
+        if len(documents) > limit:
+            documents = documents[:limit]
+            return documents, encode_cursor(documents[-1])
+        return documents, None
+
+    async def stream(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Documents after ``cursor`` one at a time, as the database cursor yields its batches."""
+        async for document in self._find(cursor, limit):
+            yield document
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+CHUNK_SIZE = 64 * 1024
+PDF_MAGIC = b"%PDF-"
+# The PDF spec lets the header start anywhere in the first 1024 bytes
+PDF_MAGIC_WINDOW = 1024
+
+
+class UploadTooLarge(HTTPException):
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit")
+
+
+class BodySizeLimitMiddleware:
+    """Rejects request bodies over ``max_body_size`` while they are streaming in.
+
+    A declared ``Content-Length`` over the limit is refused before any body is
+    read; otherwise bytes are counted as the multipart parser pulls them, and
+    the request is aborted with 413 as soon as the limit is crossed.
+    ``path_limits`` maps path prefixes to their own, usually larger, limits.
+    """
+
+    def __init__(self, app, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.path_limits.items():
+            if path.startswith(prefix):
+                return limit
+        return self.max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = self._limit_for(scope["path"])
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > max_body_size:
+                    await self._reject(send, max_body_size)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    raise UploadTooLarge(max_body_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send, max_body_size: int):
+        body = json.dumps({"detail": f"Upload exceeds the {max_body_size} byte limit"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    size: int
+    sha256: str
+    filename: Optional[str]
+
+
+def _spool_to_disk(src, dst, max_bytes: int) -> tuple:
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    src.seek(0)
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(head) < PDF_MAGIC_WINDOW:
+            head += chunk[:PDF_MAGIC_WINDOW - len(head)]
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        digest.update(chunk)
+        dst.write(chunk)
+    dst.flush()
+    return size, digest.hexdigest(), head
+
+
+@asynccontextmanager
+async def spool_upload(upload: UploadFile, max_bytes: int, spool_dir: Optional[str] = None):
+    """Copy an upload chunk by chunk into a named temp file, hashing as it goes.
+
+    The named file lets the PDF worker process memory-map it instead of the
+    bytes being read into memory and pickled across. The file is removed on
+    exit.
+    """
+    dst = tempfile.NamedTemporaryFile(prefix="resume-", suffix=".pdf", dir=spool_dir, delete=False)
+    try:
+        with dst:
+            size, sha256, head = await asyncio.to_thread(_spool_to_disk, upload.file, dst, max_bytes)
+        if PDF_MAGIC not in head:
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+        yield SpooledUpload(path=dst.name, size=size, sha256=sha256, filename=upload.filename)
+    finally:
+        try:
+            os.unlink(dst.name)
+        except OSError:
+            pass
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WriteBehindBuffer:
+    """Batches inserts off the request path.
+
+    ``put`` assigns the document an ``_id`` (so callers can refer to it
+    straight away) and queues it; a background task writes queued documents
+    with ``insert_many(ordered=False)`` once ``max_batch`` have accumulated or
+    ``flush_interval`` has passed since the oldest one arrived. When
+    ``max_pending`` documents are waiting, ``put`` blocks for up to
+    ``put_timeout`` seconds, then writes the document to the spill file
+    instead. A batch that still fails after ``max_retries`` attempts is
+    appended to the spill file too, and spilled documents are replayed in the
+    background after the next ``start``. Workers sharing a spill file claim
+    each file to replay by renaming it to a name carrying their pid, so only
+    one of them inserts it. Client-side ``_id``s make retries and replays idempotent:
+    documents already stored are skipped as duplicates. ``get`` finds a
+    queued document by ``_id`` before it has reached the collection.
+    """
+
+    def __init__(
+        self,
+        collection,
+        spill_path: Path,
+        indexes: Sequence[Any] = (),
+        max_batch: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        put_timeout: float = 0.5,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+    ):
+        self.collection = collection
+        self.spill_path = Path(spill_path)
+        self.indexes = list(indexes)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._replayer: Optional[asyncio.Task] = None
+        self._batch: List[Dict[str, Any]] = []
+        # Queued or mid-flush documents by _id, for reads that must not miss a recent write
+        self._unwritten: Dict[Any, Dict[str, Any]] = {}
+        self._stopping = False
+        self._spill_lock = asyncio.Lock()
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.last_flush_ms = 0.0
+
+    async def ensure_indexes(self):
+        try:
+            for keys in self.indexes:
+                await self.collection.create_index(keys)
+        except Exception as e:
+            logger.error(f"Error creating indexes on {self.collection.name}: {e}")
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._stopping = False
+        self._flusher = asyncio.create_task(self._run())
+        # Off the startup path: with Mongo down, replay retries would hold up the lifespan
+        self._replayer = asyncio.create_task(self._replay_in_background())
+
+    async def _replay_in_background(self):
+        try:
+            await self.replay_spill()
+        except Exception as e:
+            logger.error(f"Replaying spilled documents into {self.collection.name} failed: {e}")
+
+    async def stop(self):
+        """Write out everything still queued, then stop the flusher."""
+        if self._flusher is None:
+            return
+        self._stopping = True
+        if self._replayer is not None:
+            # A file claimed but not yet stored is picked up again on the next start
+            self._replayer.cancel()
+            await asyncio.gather(self._replayer, return_exceptions=True)
+            self._replayer = None
+        self._flusher.cancel()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        # A batch interrupted mid-flush is written again; stored documents are skipped as duplicates
+        await self._flush(self._batch)
+        self._batch = []
+        while not self._queue.empty():
+            await self._flush(self._drain(self.max_batch))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def put(self, document: Dict[str, Any]) -> ObjectId:
+        document.setdefault("_id", ObjectId())
+        if self._queue is None:
+            # Not started (e.g. scripts): write straight through
+            await self._flush([document])
+            return document["_id"]
+        # Registered first: the flusher may write the document before put() resumes
+        self._unwritten[document["_id"]] = document
+        try:
+            await asyncio.wait_for(self._queue.put(document), timeout=self.put_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Write-behind buffer full ({self.max_pending}), spilling to disk")
+            del self._unwritten[document["_id"]]
+            await self._spill([document])
+        return document["_id"]
+
+    def get(self, document_id) -> Optional[Dict[str, Any]]:
+        """The document with ``_id`` ``document_id`` if it is queued and not yet written."""
+        return self._unwritten.get(document_id)
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        # Checked as well as relying on cancel(): wait_for can swallow a
+        # cancellation that lands just as the queue hands over an item
+        while not self._stopping:
+            self._batch = batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            batch.extend(self._drain(self.max_batch - len(batch)))
+            await self._flush(batch)
+            self._batch = []
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert ``batch``; return the documents that failed for reasons other than already existing."""
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            return []
+        except BulkWriteError as e:
+            failed = [
+                batch[error["index"]]
+                for error in e.details.get("writeErrors", [])
+                if error.get("code") != DUPLICATE_KEY_ERROR
+            ]
+            if e.details.get("writeConcernErrors"):
+                return batch
+            return failed
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            try:
+                pending = await self._insert(pending)
+            except Exception as e:
+                logger.warning(f"Write-behind flush of {len(pending)} documents failed: {e}")
+            if not pending:
+                break
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(self.retry_delay * (2 ** attempt))
+
+        if pending:
+            await self._spill(pending)
+        for document in batch:
+            self._unwritten.pop(document["_id"], None)
+        self.written += len(batch) - len(pending)
+        self.batches += 1
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def _append_spill(self, documents: List[Dict[str, Any]]):
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill_path, "a", encoding="utf-8") as spill:
+            for document in documents:
+                spill.write(json_util.dumps(document) + "\n")
+
+    async def _spill(self, documents: List[Dict[str, Any]]):
+        async with self._spill_lock:
+            await asyncio.to_thread(self._append_spill, documents)
+        self.spilled += len(documents)
+        logger.error(f"Spilled {len(documents)} documents to {self.spill_path}")
+
+    def _claim(self, path: Path) -> Optional[Path]:
+        """Rename ``path`` to a name owned by this process; None if another worker got there first."""
+        claimed = path.with_name(f"{self.spill_path.name}.claimed-{os.getpid()}-{time.time_ns()}")
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def _replayable(self) -> List[Path]:
+        """Files waiting to be replayed, plus claims left behind by workers that have exited."""
+        paths = list(self.spill_path.parent.glob(f"{self.spill_path.name}.replay-*"))
+        for path in self.spill_path.parent.glob(f"{self.spill_path.name}.claimed-*"):
+            pid = int(path.name.rsplit(".claimed-", 1)[1].split("-", 1)[0])
+            if pid != os.getpid() and not _process_alive(pid):
+                paths.append(path)
+        return sorted(paths)
+
+    async def replay_spill(self):
+        """Re-insert documents spilled by earlier failures, removing each file once it is stored."""
+        async with self._spill_lock:
+            if self.spill_path.exists():
+                try:
+                    os.replace(self.spill_path, self.spill_path.with_name(f"{self.spill_path.name}.replay-{time.time_ns()}"))
+                except FileNotFoundError:
+                    # Another worker rotated it first
+                    pass
+        for path in self._replayable():
+            claimed = self._claim(path)
+            if claimed is None:
+                continue
+
+            def load() -> List[Dict[str, Any]]:
+                with open(claimed, encoding="utf-8") as spill:
+                    return [json_util.loads(line) for line in spill if line.strip()]
+
+            documents = await asyncio.to_thread(load)
+            for start in range(0, len(documents), self.max_batch):
+                await self._flush(documents[start:start + self.max_batch])
+            claimed.unlink(missing_ok=True)
+            self.replayed += len(documents)
+            logger.info(f"Replayed {len(documents)} spilled documents into {self.collection.name}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "last_flush_ms": self.last_flush_ms,
+        }
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+SkillSync Backend Benchmark Suite
+Measures latency and throughput of the backend locally, with no network access.
+
+    python backend_benchmark.py load     # p50/p95/p99 and req/s per endpoint
+    python backend_benchmark.py micro    # PDF extraction, fast analysis, skill matching, ranking, candidate search
+    python backend_benchmark.py all
+
+The load test starts the API with uvicorn on localhost, next to a separate
+process serving the Gemini stub (``GEMINI_STUB_LATENCY_MS``) so the stub's own
+work is not charged to the server. MongoDB is in-memory (needs the
+``mongomock-motor`` package) unless ``--mongo`` gives a URL. Synthetic resumes of
+1 to 8 pages are generated with reportlab; every analysis request uploads a
+different one unless the scenario is meant to hit the cache.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / 'backend'
+CATALOG_PATH = ROOT_DIR / 'frontend' / 'public' / 'thing.json'
+
+RESUME_SIZES = {"small": 1, "medium": 3, "large": 8}
+CATALOG_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+
+FILLER = (
+    "Designed and shipped features end to end, wrote tests, reviewed pull requests and worked with "
+    "product and design on requirements, performance and reliability"
+).split()
+
+
+def use_in_memory_mongo():
+    """Swap Motor's client for mongomock's before the server module imports it."""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("In-memory MongoDB needs `pip install mongomock-motor`; or pass --mongo mongodb://localhost:27017")
+    import motor.motor_asyncio
+    motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+
+def catalog_skills():
+    with open(CATALOG_PATH) as f:
+        return sorted({skill for internship in json.load(f) for skill in internship['skills_required']})
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def create_resume_pdf(rng, pages, skills):
+    """A resume of roughly ``pages`` pages listing a random sample of ``skills``."""
+    chosen = rng.sample(skills, min(len(skills), rng.randint(4, 10)))
+    lines = [
+        f"Candidate {rng.getrandbits(64):016x}",
+        "candidate@example.com | +91 98765 43210",
+        "",
+        "SUMMARY",
+        f"Computer science student interested in {chosen[0]} and {chosen[-1]}.",
+        "",
+        "SKILLS",
+        ", ".join(chosen),
+        "",
+        "EXPERIENCE",
+    ]
+    lines_per_page = 35
+    while len(lines) < pages * lines_per_page - 2:
+        words = rng.sample(FILLER, 10) + [rng.choice(chosen)]
+        lines.append("- " + " ".join(words))
+    lines += ["", "EDUCATION", "B.Tech in Computer Science, 2021 - 2025"]
+
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    y_position = 750
+    for line in lines:
+        if y_position < 50:
+            p.showPage()
+            y_position = 750
+        p.drawString(50, y_position, line)
+        y_position -= 20
+    p.save()
+    return buffer.getvalue()
+
+
+def synthetic_catalog(size, seed=0):
+    """``size`` internships over a vocabulary of the real catalog's skills plus generated ones."""
+    rng = random.Random(seed)
+    vocabulary = catalog_skills() + [f"Skill {n}" for n in range(max(0, min(5000, size // 20)))]
+    categories = ["Backend Development", "Frontend Development", "Data Science", "DevOps", "Design", "Mobile"]
+    locations = ["Remote", "Bengaluru, India", "Pune, India", "Delhi, India", "Hyderabad, India"]
+    internships = []
+    for n in range(size):
+        low = rng.randint(3, 8)
+        internships.append({
+            "id": n + 1,
+            "title": f"Intern {n + 1}",
+            "company": f"Company {n % 997}",
+            "location": rng.choice(locations),
+            # Real skills are drawn more often than generated ones, like a long-tailed vocabulary
+            "skills_required": rng.sample(vocabulary[:60] if rng.random() < 0.7 else vocabulary, rng.randint(3, 6)),
+            "score_range": [low, min(10, low + rng.randint(1, 3))],
+            "category": rng.choice(categories),
+            "description": f"Work on {rng.choice(categories).lower()} projects with a small team.",
+        })
+    return internships
+
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile: the smallest value with at least ``fraction`` of the values at or below it."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values) - 1e-9) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(values) * 1000, 2) if values else 0.0,
+    }
+
+
+def print_table(title, rows, columns):
+    print(f"\n{title}")
+    widths = [max(len(column), *(len(str(row.get(column, ""))) for row in rows)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(str(row.get(column, "")).ljust(width) for column, width in zip(columns, widths)))
+
+
+# ---------------------------------------------------------------------------
+# Processes under test
+# ---------------------------------------------------------------------------
+
+def serve(args):
+    """Entry point of the server subprocess."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    if args.mongo == "memory":
+        use_in_memory_mongo()
+    import uvicorn
+    uvicorn.run("server:app", host="127.0.0.1", port=args.port, log_level="warning", app_dir=str(BACKEND_DIR))
+
+
+def serve_stub(args):
+    """Entry point of the Gemini stub subprocess."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    import uvicorn
+    from fastapi import FastAPI
+    from gemini_stub import stub_router
+
+    app = FastAPI()
+    app.include_router(stub_router, prefix="/api")
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def spawn(command, port, env, extra_args=(), ready_path="/openapi.json"):
+    process = subprocess.Popen(
+        [sys.executable, __file__, command, "--port", str(port), *extra_args],
+        env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"{command} process exited with {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{ready_path}", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    sys.exit(f"{command} process did not start on port {port}")
+
+
+# ---------------------------------------------------------------------------
+# Load test
+# ---------------------------------------------------------------------------
+
+async def run_scenario(client, name, make_request, total, concurrency):
+    latencies = []
+    errors = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for n in counter:
+            method, url, kwargs = make_request(n)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                await response.aread()
+                ok = response.status_code < 400
+                key = str(response.status_code)
+            except httpx.HTTPError as e:
+                ok, key = False, type(e).__name__
+            elapsed = time.perf_counter() - started
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[key] = errors.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "requests": total,
+        "errors": sum(errors.values()),
+        "req_per_s": round(len(latencies) / wall, 1) if wall else 0.0,
+        **summarize(latencies),
+        "error_codes": errors,
+    }
+
+
+async def load_test(args, base_url):
+    rng = random.Random(args.seed)
+    skills = catalog_skills()
+    print(f"Generating {args.requests} resumes per size...")
+    resumes = {
+        size: [create_resume_pdf(rng, pages, skills) for _ in range(args.requests)]
+        for size, pages in RESUME_SIZES.items()
+    }
+    api = f"{base_url}/api"
+
+    def upload(path, pdf, **params):
+        return "POST", f"{api}{path}", {"params": params, "files": {"resume": ("resume.pdf", pdf, "application/pdf")}}
+
+    scenarios = [
+        ("GET /api/", lambda n: ("GET", f"{api}/", {})),
+        ("GET /api/internships", lambda n: ("GET", f"{api}/internships", {})),
+        ("GET /api/internships?skills_required", lambda n: (
+            "GET", f"{api}/internships", {"params": {"skills_required": rng.choice(skills), "limit": 20}}
+        )),
+        ("GET /api/status?limit=100", lambda n: ("GET", f"{api}/status", {"params": {"limit": 100}})),
+    ]
+    for size in RESUME_SIZES:
+        scenarios.append((
+            f"POST /api/analyze-resume mode=fast {size}",
+            lambda n, size=size: upload("/analyze-resume", resumes[size][n], mode="fast"),
+        ))
+    scenarios += [
+        ("POST /api/analyze-resume mode=full medium", lambda n: upload("/analyze-resume", resumes["medium"][n])),
+        # The same document every time: served from the analysis cache after the first request
+        ("POST /api/analyze-resume cached", lambda n: upload("/analyze-resume", resumes["small"][0])),
+        ("POST /api/analyze-resume/stream small", lambda n: upload("/analyze-resume/stream", resumes["small"][n])),
+    ]
+    if args.scenarios:
+        scenarios = [scenario for scenario in scenarios if any(part in scenario[0] for part in args.scenarios)]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        for n in range(200):
+            await client.post(f"{api}/status", json={"client_name": f"bench-{n}"})
+        # Warm up worker processes and connection pools before measuring
+        await client.post(f"{api}/analyze-resume", params={"mode": "fast"},
+                          files={"resume": ("warmup.pdf", create_resume_pdf(rng, 1, skills), "application/pdf")})
+
+        results = []
+        for name, make_request in scenarios:
+            result = await run_scenario(client, name, make_request, args.requests, args.concurrency)
+            results.append(result)
+            print(f"  {name}: {result['req_per_s']} req/s, p99 {result['p99_ms']} ms, {result['errors']} errors")
+        metrics = (await client.get(f"{api}/metrics")).text
+    return results, metrics
+
+
+def run_load(args):
+    stub_port, server_port = args.port + 1, args.port
+    stub = spawn("stub", stub_port, {"GEMINI_STUB_LATENCY_MS": str(args.gemini_latency_ms)})
+    server_env = {
+        "MONGO_URL": "mongodb://localhost:27017" if args.mongo == "memory" else args.mongo,
+        "DB_NAME": os.environ.get("DB_NAME", "skillsync_benchmark"),
+        "GEMINI_API_KEY": "benchmark",
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{stub_port}/api/stub/gemini",
+        # The stub has no quota; keep the client-side rate limiter from dominating the numbers
+        "GEMINI_RATE_LIMIT_RPM": "6000000",
+        "GEMINI_RATE_LIMIT_BURST": "100000",
+    }
+    for assignment in args.server_env:
+        key, _, value = assignment.partition("=")
+        server_env[key] = value
+    # Wait for readiness, not just a listening socket, so warm-up never lands in the measurements
+    server = spawn("serve", server_port, server_env, ["--mongo", args.mongo], ready_path="/api/health/ready")
+    try:
+        results, metrics = asyncio.run(load_test(args, f"http://127.0.0.1:{server_port}"))
+    finally:
+        for process in (server, stub):
+            process.terminate()
+            process.wait(timeout=30)
+
+    print_table(
+        f"Load test: {args.requests} requests per scenario, concurrency {args.concurrency}, "
+        f"Gemini stub latency {args.gemini_latency_ms} ms",
+        results,
+        ["scenario", "requests", "errors", "req_per_s", "p50_ms", "p95_ms", "p99_ms", "mean_ms"],
+    )
+    stages = [line for line in metrics.splitlines() if line.startswith("skillsync_stage_duration_seconds_") and "_bucket" not in line]
+    if stages:
+        print("\nServer-side stage totals (from /api/metrics)")
+        for line in stages:
+            print(f"  {line}")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Microbenchmarks
+# ---------------------------------------------------------------------------
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    values = sorted(samples)
+    return {
+        "p50_us": round(percentile(values, 0.50) * 1e6, 1),
+        "p95_us": round(percentile(values, 0.95) * 1e6, 1),
+        "mean_us": round(statistics.fmean(values) * 1e6, 1),
+    }
+
+
+def run_micro(args):
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "skillsync_benchmark")
+    if args.mongo == "memory":
+        use_in_memory_mongo()
+    from bson import ObjectId
+    from candidate_index import CandidateIndex
+    from catalog import CatalogSnapshot
+    from fast_analyzer import FastAnalyzer
+    from pdf_extraction import extract_text_from_pdf
+    from recommendation_engine import RecommendationEngine
+    from semantic_ranker import SemanticRanker
+    from server import calculate_skill_matches, recommend_internships
+    from skill_matcher import SkillMatcher
+
+    rng = random.Random(args.seed)
+    skills = catalog_skills()
+    fast_analyzer = FastAnalyzer()
+    results = []
+
+    for size, pages in RESUME_SIZES.items():
+        pdf = create_resume_pdf(rng, pages, skills)
+        results.append({
+            "benchmark": "extract_text_from_pdf",
+            "size": f"{size} ({pages} pages, {len(pdf) // 1024} KiB)",
+            **timed(lambda: extract_text_from_pdf(pdf), max(3, args.repeat // 10)),
+        })
+        text = extract_text_from_pdf(pdf)
+        results.append({
+            "benchmark": "FastAnalyzer.analyze",
+            "size": f"{size} ({len(text):,} characters)",
+            **timed(lambda: fast_analyzer.analyze(text), args.repeat),
+        })
+
+    resume_text = ", ".join(rng.sample(skills, 8))
+    analysis = {"overall_rating": 7.0}
+    for catalog_size in args.catalog_sizes:
+        started = time.perf_counter()
+        internships = synthetic_catalog(catalog_size, args.seed)
+        matcher = SkillMatcher.from_internships(internships)
+        # Only the matcher and ranking engine are needed here; validation and listing indexes are skipped
+        snapshot = CatalogSnapshot(
+            version=1, content_hash="benchmark", loaded_at=None, source="benchmark",
+            internships=internships, matcher=matcher,
+            engine=RecommendationEngine(internships, matcher), listing=None,
+            semantic=SemanticRanker(internships, matcher),
+        )
+        build_ms = round((time.perf_counter() - started) * 1000)
+        resume_skills = matcher.match(resume_text)
+        repeat = args.repeat if catalog_size <= 10_000 else max(3, args.repeat // 20)
+
+        results.append({
+            "benchmark": "calculate_skill_matches (full scan)",
+            "size": f"{catalog_size:,} internships",
+            **timed(lambda: [calculate_skill_matches(resume_skills, internship, matcher) for internship in internships], repeat),
+        })
+        results.append({
+            "benchmark": "recommend_internships",
+            "size": f"{catalog_size:,} internships (built in {build_ms} ms)",
+            **timed(lambda: recommend_internships(snapshot, analysis, resume_skills), args.repeat),
+        })
+        results.append({
+            "benchmark": "recommend_internships ranking=semantic",
+            "size": f"{catalog_size:,} internships",
+            **timed(lambda: recommend_internships(
+                snapshot, analysis, resume_skills, ranking="semantic", resume=resume_text
+            ), args.repeat),
+        })
+        print(f"  catalog of {catalog_size:,} done")
+        del internships, matcher, snapshot
+
+    # Reverse matching over as many stored resumes as there were internships above
+    internships = synthetic_catalog(100, args.seed)
+    for resume_count in args.catalog_sizes:
+        index = CandidateIndex()
+        profiles = (
+            (ObjectId(), {
+                "content_hash": f"{rng.getrandbits(256):064x}",
+                "rating": round(rng.uniform(0, 10), 1),
+                "skills": rng.sample(skills, rng.randint(3, 15)),
+            })
+            for _ in range(resume_count)
+        )
+        started = time.perf_counter()
+        index.add_many(profiles)
+        build_ms = round((time.perf_counter() - started) * 1000)
+        repeat = args.repeat if resume_count <= 100_000 else max(3, args.repeat // 4)
+        queries = iter(internships * (repeat // len(internships) + 1))
+
+        def find_candidates():
+            internship = next(queries)
+            index.top_k(internship["skills_required"], internship["score_range"])
+
+        results.append({
+            "benchmark": "CandidateIndex.top_k",
+            "size": f"{resume_count:,} resumes (built in {build_ms} ms)",
+            **timed(find_candidates, repeat),
+        })
+        print(f"  {resume_count:,} resumes done")
+        del index
+
+    print_table("Microbenchmarks", results, ["benchmark", "size", "p50_us", "p95_us", "mean_us"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["all", "load", "micro", "serve", "stub"], nargs="?", default="all")
+    parser.add_argument("--port", type=int, default=8765, help="Server port; the Gemini stub uses the next one")
+    parser.add_argument("--mongo", default="memory", help='"memory" or a MongoDB URL')
+    parser.add_argument("--requests", type=int, default=200, help="Requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--gemini-latency-ms", type=float, default=800)
+    parser.add_argument("--scenarios", nargs="*", default=[], help="Only run scenarios whose name contains one of these")
+    parser.add_argument("--server-env", nargs="*", default=[], metavar="KEY=VALUE", help="Extra server settings")
+    parser.add_argument("--catalog-sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=CATALOG_SIZES, help="Comma-separated catalog sizes for microbenchmarks")
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations per microbenchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        return serve(args)
+    if args.command == "stub":
+        return serve_stub(args)
+
+    results = {}
+    if args.command in ("all", "micro"):
+        results["micro"] = run_micro(args)
+    if args.command in ("all", "load"):
+        results["load"] = run_load(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# The backend modules import each other as top-level modules, as they do under uvicorn
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+
+@pytest.fixture
+def mongo_db():
+    """A fresh in-memory database with Motor's async API (see backend/requirements-test.txt)."""
+    return AsyncMongoMockClient()["skillsync_test"]
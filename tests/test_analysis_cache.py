@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from analysis_cache import AnalysisCache
+
+ENTRY = {"analysis": {"overall_rating": 7.5}, "resume_text": "Python developer"}
+
+
+def test_text_key_ignores_whitespace_and_case():
+    assert AnalysisCache.text_key("Python  Developer\n") == AnalysisCache.text_key("python developer")
+    assert AnalysisCache.raw_key("abc") == "raw:abc"
+
+
+def test_put_then_get_from_memory(mongo_db):
+    cache = AnalysisCache(mongo_db.analysis_cache)
+    raw_key, text_key = AnalysisCache.raw_key("abc"), AnalysisCache.text_key(ENTRY["resume_text"])
+
+    async def run():
+        await cache.put(raw_key, text_key, ENTRY)
+        return await cache.get(raw_key), await cache.get(text_key), await cache.get("raw:missing")
+
+    assert asyncio.run(run()) == (ENTRY, ENTRY, None)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_falls_back_to_mongo_by_raw_key(mongo_db):
+    writer, reader = AnalysisCache(mongo_db.analysis_cache), AnalysisCache(mongo_db.analysis_cache)
+    text_key = AnalysisCache.text_key(ENTRY["resume_text"])
+
+    async def run():
+        await writer.put("raw:first", text_key, ENTRY)
+        await writer.link("raw:second", text_key, ENTRY)
+        return await reader.get("raw:second")
+
+    assert asyncio.run(run()) == ENTRY
+    assert reader.mongo_hits == 1
+
+
+def test_expired_mongo_documents_are_misses(mongo_db):
+    cache = AnalysisCache(mongo_db.analysis_cache, ttl_seconds=60)
+
+    async def run():
+        await mongo_db.analysis_cache.insert_one({
+            "_id": "text:old", "raw_keys": ["raw:old"], **ENTRY,
+            "created_at": datetime.utcnow() - timedelta(seconds=120),
+        })
+        return await cache.get("raw:old")
+
+    assert asyncio.run(run()) is None
+    assert cache.misses == 1
+
+
+def test_lru_evicts_least_recently_used(mongo_db):
+    cache = AnalysisCache(mongo_db.analysis_cache, max_entries=2)
+    cache._put_local("a", ENTRY)
+    cache._put_local("b", ENTRY)
+    cache._get_local("a")
+    cache._put_local("c", ENTRY)
+    assert cache._get_local("b") is None
+    assert cache._get_local("a") == ENTRY and cache._get_local("c") == ENTRY
+    assert cache.evictions == 1
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server as server_module
+from catalog import CatalogManager
+from incremental_json import IncrementalJSONError
+from resilience import CircuitBreaker
+
+RESUME = "Python developer building REST APIs with SQL and Docker.\nProjects: a Django web app."
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps([
+        {"id": i, "title": f"Intern {i}", "company": "Acme", "location": "Remote",
+         "skills_required": skills, "score_range": [4, 9], "category": "Backend Development",
+         "description": "Build APIs."}
+        for i, skills in enumerate([["Python", "SQL"], ["Docker"], ["Figma"]], start=1)
+    ]))
+    catalog = CatalogManager(path)
+    asyncio.run(catalog.reload())
+    monkeypatch.setattr(server_module, "catalog", catalog)
+
+    async def store_analysis(*args):
+        return "analysis-1"
+
+    monkeypatch.setattr(server_module, "store_analysis", store_analysis)
+    return server_module
+
+
+def prepared(server, text=RESUME):
+    return server.PreparedResume(content_hash="abc", raw_key="raw:abc", text_key=None, resume_text=text, cached=None)
+
+
+def collect(server, prepared_resume, mode="fast"):
+    async def run():
+        return [line async for line in server.stream_analysis(prepared_resume, "cv.pdf", 3, 10.0, mode, "ndjson")]
+
+    return [json.loads(line) for line in asyncio.run(run())]
+
+
+def test_stream_event_formats():
+    assert server_module._stream_event("ndjson", "done", {"a": 1}) == '{"event": "done", "data": {"a": 1}}\n'
+    assert server_module._stream_event("sse", "done", {"a": 1}) == 'event: done\ndata: {"a": 1}\n\n'
+
+
+def test_stages_arrive_cheapest_first(server):
+    events = collect(server, prepared(server))
+    names = [event["event"] for event in events]
+    assert names[:2] == ["text_stats", "skill_recommendations"]
+    assert names.index("analysis") < names.index("done") and names[-1] == "done"
+    assert "recommendations" in names
+
+    stats = events[0]["data"]
+    assert stats["filename"] == "cv.pdf" and stats["lines"] == 2 and not stats["cache_hit"]
+    assert {"Python", "SQL", "Docker"} <= set(stats["skills_detected"])
+    # Skill-only recommendations need no rating: the postings that share skills come first
+    assert [r["id"] for r in events[1]["data"]][:2] == [1, 2]
+    assert events[-1]["data"]["analysis_id"] == "analysis-1"
+
+
+def test_analysis_failure_becomes_an_error_event(server, monkeypatch):
+    async def run_analysis(*args):
+        raise HTTPException(status_code=503, detail="AI analysis is temporarily unavailable")
+
+    monkeypatch.setattr(server, "run_analysis", run_analysis)
+    events = collect(server, prepared(server), mode="full")
+    assert [event["event"] for event in events] == ["text_stats", "skill_recommendations", "error"]
+    assert events[-1]["data"] == {"status_code": 503, "detail": "AI analysis is temporarily unavailable"}
+
+
+def test_malformed_model_output_does_not_open_the_circuit(server, monkeypatch):
+    async def stream_generate_content(prompt):
+        yield "Sorry, I can't produce JSON for this resume."
+
+    monkeypatch.setattr(server.gemini_client, "stream_generate_content", stream_generate_content)
+    monkeypatch.setattr(server.gemini_caller, "breaker", CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    monkeypatch.setattr(server, "GEMINI_STREAMING", True)
+
+    for _ in range(3):
+        with pytest.raises(IncrementalJSONError):
+            asyncio.run(server._run_gemini_analysis("key", "prompt", server.FieldFanout()))
+    assert server.gemini_caller.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,154 @@
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from analytics import AnalyticsRollups, SpaceSaving
+
+
+def test_space_saving_is_exact_below_capacity():
+    summary = SpaceSaving(10)
+    for key in "aabbbc":
+        summary.offer(key, key.upper())
+    assert [(item["item"], item["count"], item["error"]) for item in summary.top(2)] == [("B", 3, 0), ("A", 2, 0)]
+    assert summary.min_count() == 0
+
+
+def test_space_saving_bounds_hold_on_a_skewed_stream():
+    rng = random.Random(0)
+    stream = [f"item{min(int(rng.paretovariate(1.2)), 500)}" for _ in range(20000)]
+    truth = Counter(stream)
+    summary = SpaceSaving(50)
+    for key in stream:
+        summary.offer(key, key)
+
+    for key, (count, error, _) in summary.entries.items():
+        assert count - error <= truth[key] <= count
+    # Anything counted more often than the smallest entry must be in the summary
+    assert {key for key, count in truth.items() if count > summary.min_count()} <= set(summary.entries)
+
+
+def test_merged_summaries_keep_the_bounds():
+    rng = random.Random(1)
+    halves = [[f"k{rng.randint(0, 80)}" for _ in range(3000)] for _ in range(2)]
+    summaries = []
+    for half in halves:
+        summary = SpaceSaving(30)
+        for key in half:
+            summary.offer(key, key)
+        summaries.append(summary)
+    merged = summaries[0].merge(summaries[1])
+    truth = Counter(halves[0] + halves[1])
+
+    assert len(merged) == 30
+    for key, (count, error, _) in merged.entries.items():
+        assert count - error <= truth[key] <= count
+    assert SpaceSaving.from_items(10, merged.to_items()).top(10) == merged.top(10)
+
+
+def analysis(rating, weaknesses=(), skills=(), recommended=(), timestamp=None):
+    return {
+        "analysis": {"overall_rating": rating, "weaknesses": list(weaknesses), "suggestions": []},
+        "profile": {"skills": list(skills)},
+        "recommended_ids": list(recommended),
+        "timestamp": timestamp or datetime.utcnow(),
+    }
+
+
+def test_workers_sharing_a_collection_see_each_others_analyses(mongo_db):
+    collection = mongo_db.analytics_rollups
+    first, second = AnalyticsRollups(collection), AnalyticsRollups(collection)
+
+    async def run():
+        await asyncio.gather(first.start(), second.start())
+        first.record(analysis(7.5, ["No metrics", "no  metrics"], ["Python"], [1, 2]))
+        second.record(analysis(4.0, ["No Metrics"], ["Python", "SQL"], [2]))
+        second.record(analysis(9.0, skills=["SQL"]))
+        await first.flush()
+        await second.flush()
+        await first.refresh()
+        await first.stop()
+        await second.stop()
+        return first.report()
+
+    report = asyncio.run(run())
+    assert report["ratings"]["analyses"] == 3 and report["ratings"]["mean_rating"] == 6.83
+    assert report["ratings"]["histogram"][4] == report["ratings"]["histogram"][7] == report["ratings"]["histogram"][9] == 1
+    assert sum(bucket["analyses"] for bucket in report["rating_buckets"]) == 3
+    # Counted once per analysis, under normalized text
+    assert report["top"]["weaknesses"][0]["count"] == 2
+    assert {item["item"]: item["count"] for item in report["top"]["skills"]} == {"Python": 2, "SQL": 2}
+    assert report["top"]["internships"][0] == {"key": "2", "item": "2", "count": 2, "error": 0}
+
+
+def test_start_does_not_wait_for_mongo(mongo_db, monkeypatch):
+    rollups = AnalyticsRollups(mongo_db.analytics_rollups, flush_interval=0.01)
+    upsert = rollups.collection.update_one
+
+    async def run():
+        answered = asyncio.Event()
+
+        async def slow_upsert(*args, **kwargs):
+            await answered.wait()
+            return await upsert(*args, **kwargs)
+
+        monkeypatch.setattr(rollups.collection, "update_one", slow_upsert)
+        await asyncio.wait_for(rollups.start(), timeout=1)
+        document = analysis(6.0)
+        rollups.record(document)
+        assert rollups.report()["ratings"]["analyses"] == 1
+        answered.set()
+        await asyncio.sleep(0.1)
+        await rollups.stop()
+        return document
+
+    document = asyncio.run(run())
+    meta = asyncio.run(mongo_db.analytics_rollups.find_one({"_id": "meta"}))
+    # Live counting began when the worker started, not when Mongo answered
+    assert meta["live_since"] <= document["timestamp"]
+    assert asyncio.run(mongo_db.analytics_rollups.find_one({"_id": "totals"}))["analyses"] == 1
+
+
+def test_failed_writes_are_kept_for_the_next_flush(mongo_db, monkeypatch):
+    rollups = AnalyticsRollups(mongo_db.analytics_rollups)
+    rollups.record(analysis(6.0))
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("primary stepped down")
+
+    async def run():
+        with monkeypatch.context() as patched:
+            patched.setattr(rollups.collection, "bulk_write", unavailable)
+            await rollups.flush()
+        assert rollups.pending
+        await rollups.flush()
+
+    asyncio.run(run())
+    assert not rollups.pending
+    assert asyncio.run(mongo_db.analytics_rollups.find_one({"_id": "totals"}))["analyses"] == 1
+
+
+def test_backfill_counts_older_analyses_once(mongo_db):
+    rollups = AnalyticsRollups(mongo_db.analytics_rollups)
+    earlier = datetime.utcnow() - timedelta(hours=1)
+
+    async def run():
+        await mongo_db.resume_analyses.insert_many([analysis(5.0, timestamp=earlier) for _ in range(3)])
+        await rollups.start()
+        # The flusher records live_since in the background
+        while not await mongo_db.analytics_rollups.find_one({"_id": "meta"}):
+            await asyncio.sleep(0.01)
+        # Stored after live counting began: already counted, so not backfilled
+        await mongo_db.resume_analyses.insert_one(analysis(8.0))
+        counted = await rollups.backfill(mongo_db.resume_analyses, batch_size=2)
+        with pytest.raises(RuntimeError):
+            await rollups.backfill(mongo_db.resume_analyses)
+        recounted = await AnalyticsRollups(mongo_db.analytics_rollups).backfill(mongo_db.resume_analyses, force=True)
+        await rollups.stop()
+        return counted, recounted
+
+    assert asyncio.run(run()) == (3, 4)
+    totals = asyncio.run(mongo_db.analytics_rollups.find_one({"_id": "totals"}))
+    assert totals["analyses"] == 4
@@ -0,0 +1,185 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import UploadFile
+
+from batch_jobs import BatchJobManager
+
+PDF = b"%PDF-1.4\n" + b"resume " * 100
+
+
+class Pipeline:
+    """Stands in for prepare_resume/complete_batch_item and counts the analyses."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.analysed = []
+
+    async def prepare(self, path, content_hash):
+        await asyncio.sleep(self.delay)
+        return content_hash
+
+    async def complete(self, prepared, filename, options):
+        self.analysed.append(filename)
+        return {"filename": filename, "options": options}
+
+
+def manager(mongo_db, spool_dir, pipeline, **kwargs):
+    return BatchJobManager(
+        mongo_db.batch_jobs, mongo_db.batch_job_items, spool_dir, pipeline.prepare, pipeline.complete, **kwargs
+    )
+
+
+def upload(data, filename):
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+async def wait_for_job(jobs, job_id, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        status = await jobs.status(job_id)
+        if status["status"] == "completed":
+            return status
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not complete: {status}")
+
+
+def test_job_runs_every_item(mongo_db, tmp_path):
+    pipeline = Pipeline()
+    jobs = manager(mongo_db, tmp_path, pipeline)
+
+    async def run():
+        await jobs.start()
+        try:
+            status = await jobs.submit([upload(PDF, "a.pdf"), upload(b"not a pdf", "b.txt")], {"top_k": 3})
+            assert (status["total"], status["failed"]) == (2, 1)
+            status = await wait_for_job(jobs, status["job_id"])
+            return status, [item async for item in jobs.results(status["job_id"])]
+        finally:
+            await jobs.stop()
+
+    status, results = asyncio.run(run())
+    assert (status["completed"], status["failed"], status["progress"]) == (1, 1, 1.0)
+    assert [item["status"] for item in results] == ["done", "error"]
+    assert results[0]["result"] == {"filename": "a.pdf", "options": {"top_k": 3}}
+    assert results[1]["error"] == "Only PDF files are supported"
+    assert pipeline.analysed == ["a.pdf"]
+
+
+def test_two_managers_analyse_a_shared_item_once(mongo_db, tmp_path):
+    pipeline = Pipeline(delay=0.05)
+    first, second = manager(mongo_db, tmp_path, pipeline), manager(mongo_db, tmp_path, pipeline)
+
+    async def run():
+        # Queued in the first manager before its workers start, then found again by the second's resume_pending
+        status = await first.submit([upload(PDF, "shared.pdf")], {})
+        await asyncio.gather(first.start(), second.start())
+        try:
+            await asyncio.sleep(0.2)
+            return await wait_for_job(first, status["job_id"])
+        finally:
+            await asyncio.gather(first.stop(), second.stop())
+
+    status = asyncio.run(run())
+    assert pipeline.analysed == ["shared.pdf"]
+    assert (status["completed"], status["failed"], status["total"]) == (1, 0, 1)
+
+
+def test_resume_pending_takes_over_only_stale_claims(mongo_db, tmp_path):
+    pipeline = Pipeline()
+    jobs = manager(mongo_db, tmp_path, pipeline, claim_timeout=60)
+
+    async def run():
+        status = await jobs.submit([upload(PDF, "stale.pdf"), upload(PDF, "fresh.pdf")], {})
+        job_id = status["job_id"]
+        now = datetime.utcnow()
+        await mongo_db.batch_job_items.update_one(
+            {"_id": f"{job_id}:0"}, {"$set": {"status": "running", "claimed_at": now - timedelta(minutes=5)}}
+        )
+        await mongo_db.batch_job_items.update_one(
+            {"_id": f"{job_id}:1"}, {"$set": {"status": "running", "claimed_at": now}}
+        )
+        # Drop what submit queued, as a restarted process would
+        restarted = manager(mongo_db, tmp_path, pipeline, claim_timeout=60)
+        await restarted.start()
+        try:
+            await asyncio.sleep(0.2)
+            return await restarted.status(job_id)
+        finally:
+            await restarted.stop()
+
+    status = asyncio.run(run())
+    assert pipeline.analysed == ["stale.pdf"]
+    assert (status["completed"], status["status"]) == (1, "running")
+
+
+class Unreachable:
+    """A collection whose queries never answer, like Mongo during a network partition."""
+
+    def find(self, *args, **kwargs):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.Event().wait()
+
+
+def test_start_does_not_wait_for_mongo(tmp_path):
+    pipeline = Pipeline()
+    jobs = BatchJobManager(Unreachable(), Unreachable(), tmp_path, pipeline.prepare, pipeline.complete)
+
+    async def run():
+        await asyncio.wait_for(jobs.start(), timeout=1)
+        await jobs.stop()
+
+    asyncio.run(run())
+
+
+def zip_with_bad_members():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name in ("good.pdf", "corrupt.pdf", "encrypted.pdf"):
+            archive.writestr(name, PDF)
+    data = bytearray(buffer.getvalue())
+    with zipfile.ZipFile(io.BytesIO(bytes(data))) as archive:
+        corrupt, encrypted = archive.getinfo("corrupt.pdf"), archive.getinfo("encrypted.pdf")
+    # Garble corrupt.pdf's compressed data so it fails to inflate
+    start = corrupt.header_offset + 30 + len(corrupt.filename) + len(corrupt.extra)
+    for offset in range(start + 2, start + corrupt.compress_size - 2):
+        data[offset] ^= 0x5A
+    # Mark encrypted.pdf as encrypted in its local and central directory headers
+    data[encrypted.header_offset + 6] |= 0x1
+    central = data.rindex(b"encrypted.pdf") - 46
+    assert data[central:central + 4] == b"PK\x01\x02"
+    data[central + 8] |= 0x1
+    return bytes(data)
+
+
+def test_unreadable_zip_members_fail_individually(mongo_db, tmp_path):
+    jobs = manager(mongo_db, tmp_path, Pipeline())
+
+    async def run():
+        status = await jobs.submit([upload(zip_with_bad_members(), "batch.zip")], {})
+        return status, [item async for item in jobs.results(status["job_id"])]
+
+    status, items = asyncio.run(run())
+    assert (status["total"], status["failed"]) == (3, 2)
+    by_name = {item["filename"]: item for item in items}
+    assert by_name["good.pdf"]["status"] == "pending"
+    for name in ("corrupt.pdf", "encrypted.pdf"):
+        assert by_name[name]["status"] == "error"
+        assert by_name[name]["error"].startswith("Could not read the file from the archive")
+    assert sorted(path.name for path in (tmp_path / status["job_id"]).iterdir()) == ["0.pdf"]
+
+
+def test_empty_submission_is_rejected(mongo_db, tmp_path):
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(manager(mongo_db, tmp_path, Pipeline()).submit([], {}))
+    assert excinfo.value.status_code == 400
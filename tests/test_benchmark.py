@@ -0,0 +1,61 @@
+import json
+import random
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import backend_benchmark as benchmark
+import gemini_stub
+from catalog import validate_records
+from pdf_extraction import extract_text_from_pdf
+
+
+def test_percentile_and_summary():
+    values = [n / 1000 for n in range(1, 101)]
+    assert benchmark.percentile([], 0.5) == 0.0
+    assert benchmark.percentile(values, 0.5) == 0.05
+    assert benchmark.percentile(values, 0.99) == 0.099
+    assert benchmark.summarize(values) == {"p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0, "mean_ms": 50.5}
+
+
+def test_synthetic_catalog_is_valid_and_reproducible():
+    internships = benchmark.synthetic_catalog(200, seed=3)
+    records, rejected = validate_records(internships)
+    assert len(records) == 200 and rejected == 0
+    assert internships == benchmark.synthetic_catalog(200, seed=3)
+    assert internships != benchmark.synthetic_catalog(200, seed=4)
+
+
+def test_synthetic_resume_has_the_requested_pages_and_skills():
+    skills = ["Python", "SQL", "Docker", "React", "Git", "Linux", "AWS", "Kubernetes", "Flutter", "Dart"]
+    pdf = benchmark.create_resume_pdf(random.Random(1), 3, skills)
+    text = extract_text_from_pdf(pdf)
+    assert text.count("EXPERIENCE") == 1 and "EDUCATION" in text
+    assert sum(skill in text for skill in skills) >= 4
+
+
+def stub_client():
+    app = FastAPI()
+    app.include_router(gemini_stub.stub_router)
+    return TestClient(app)
+
+
+def test_stub_generate_content_returns_an_analysis_with_usage():
+    response = stub_client().post(
+        "/stub/gemini/models/test:generateContent?latency_ms=0",
+        json={"contents": [{"parts": [{"text": "x" * 40}]}]},
+    )
+    body = response.json()
+    assert json.loads(body["candidates"][0]["content"]["parts"][0]["text"]) == gemini_stub.STUB_ANALYSIS
+    assert body["usageMetadata"]["promptTokenCount"] == 10
+
+
+def test_stub_stream_spreads_the_analysis_over_chunks():
+    response = stub_client().post(
+        "/stub/gemini/models/test:streamGenerateContent?alt=sse&latency_ms=0&chunks=5",
+        json={"contents": [{"parts": [{"text": "prompt"}]}]},
+    )
+    events = [json.loads(line[5:]) for line in response.text.splitlines() if line.startswith("data:")]
+    assert len(events) == 5 and "usageMetadata" in events[-1]
+    text = "".join(event["candidates"][0]["content"]["parts"][0]["text"] for event in events)
+    assert json.loads(text) == gemini_stub.STUB_ANALYSIS
@@ -0,0 +1,128 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from candidate_index import CandidateIndex
+
+SKILLS = ["Python", "SQL", "React", "Docker", "Go", "Figma", "AWS", "Java", "C++", "Kotlin", "Rust", "Excel"]
+
+
+def profile(content_hash, rating, skills):
+    return {"content_hash": f"{content_hash:016x}", "rating": rating, "skills": skills}
+
+
+def analyses(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        (ObjectId(), profile(rng.randrange(count // 2), rng.randrange(0, 21) / 2, rng.sample(SKILLS, rng.randint(0, 5))))
+        for _ in range(count)
+    ]
+
+
+def brute_force(stored, skills, score_range, k, tolerance=1.0):
+    latest = {}
+    for order, (analysis_id, data) in enumerate(stored):
+        latest[data["content_hash"]] = (order, analysis_id, data)
+    low, high = score_range
+    wanted = {name.lower() for name in skills}
+    ranked = []
+    for order, analysis_id, data in latest.values():
+        rating = data["rating"]
+        overlap = len(wanted & {name.lower() for name in data["skills"]})
+        if not low - tolerance <= rating <= high + tolerance or not (overlap or low <= rating <= high):
+            continue
+        percentage = int(overlap / max(len(skills), 1) * 100)
+        key = max(percentage, 10) * 1000.0 - abs(rating - (low + high) / 2)
+        ranked.append((-key, -order, str(analysis_id), percentage))
+    return [(analysis_id, percentage) for _, _, analysis_id, percentage in sorted(ranked)[:k]]
+
+
+def test_top_k_matches_a_full_scan_across_both_segments():
+    stored = analyses(3000)
+    index = CandidateIndex(min_merge=256)
+    for analysis_id, data in stored:
+        index.add(analysis_id, data)
+    assert index.merges > 0 and index.stats()["delta_rows"] > 0
+
+    rng = random.Random(1)
+    for _ in range(60):
+        skills = rng.sample(SKILLS + ["Haskell"], rng.randint(1, 4))
+        low = rng.randint(0, 9)
+        score_range = (low, rng.randint(low, 10))
+        k = rng.choice([1, 5, 20])
+        found = [(c.analysis_id, c.match_percentage) for c in index.top_k(skills, score_range, k)]
+        assert found == brute_force(stored, skills, score_range, k), (skills, score_range, k)
+
+
+def test_a_newer_analysis_of_the_same_resume_replaces_it():
+    index = CandidateIndex()
+    older, newer = ObjectId(), ObjectId()
+    assert index.add(newer, profile(7, 8.0, ["Python"]))
+    assert not index.add(older, profile(7, 3.0, ["Python"]))
+    latest = ObjectId()
+    assert index.add(latest, profile(7, 6.0, ["Python", "SQL"]))
+
+    assert len(index) == 1
+    [candidate] = index.top_k(["Python", "SQL"], (5, 7))
+    assert (candidate.analysis_id, candidate.rating, candidate.matched_skills) == (str(latest), 6.0, ["Python", "SQL"])
+
+
+def test_malformed_profiles_are_skipped():
+    index = CandidateIndex()
+    assert index.add_many([(ObjectId(), {"rating": 5}), (ObjectId(), profile(1, "high", [])), (ObjectId(), profile(2, 5, []))]) == 1
+
+
+def stored_documents(stored):
+    return [{"_id": analysis_id, "profile": data, "analysis": {}} for analysis_id, data in stored]
+
+
+def test_rebuild_keeps_analyses_added_meanwhile(mongo_db):
+    stored = analyses(500)
+    asyncio.run(mongo_db.resume_analyses.insert_many(stored_documents(stored)))
+    asyncio.run(mongo_db.resume_analyses.insert_one({"_id": ObjectId(), "analysis": {}}))
+    index = CandidateIndex()
+    fresh = (ObjectId(), profile(10_000, 9.0, ["Rust"]))
+    index.add(*fresh)
+    asyncio.run(index.rebuild(mongo_db.resume_analyses, batch_size=64))
+
+    assert len(index) == len({data["content_hash"] for _, data in stored}) + 1
+    assert index.stats()["delta_rows"] == 0
+    found = [(c.analysis_id, c.match_percentage) for c in index.top_k(["Rust", "Go"], (8, 10), 10)]
+    # Ties go to the row indexed last, which is every rebuilt one
+    assert found == brute_force([fresh] + stored, ["Rust", "Go"], (8, 10), 10)
+
+
+def test_catch_up_indexes_analyses_stored_by_other_workers(mongo_db):
+    collection = mongo_db.resume_analyses
+    index = CandidateIndex(refresh_overlap=60)
+    asyncio.run(collection.insert_many(stored_documents(analyses(50, seed=2))))
+    asyncio.run(index.rebuild(collection))
+    before = len(index)
+
+    # Another worker's analysis, stamped a little earlier than the newest one seen
+    late = ObjectId.from_datetime(datetime.utcnow() - timedelta(seconds=30))
+    other = [(late, profile(20_000, 5.0, ["Kotlin"])), (ObjectId(), profile(20_001, 5.5, ["Kotlin"]))]
+    asyncio.run(collection.insert_many(stored_documents(other)))
+
+    assert asyncio.run(index.catch_up(collection)) == 2
+    assert len(index) == before + 2
+    assert {c.analysis_id for c in index.top_k(["Kotlin"], (5, 6))} >= {str(late), str(other[1][0])}
+    # Everything in the overlap window is already indexed
+    assert asyncio.run(index.catch_up(collection)) == 0
+    assert index.stats()["caught_up"] == 2
+
+
+def test_refresh_task_catches_up_in_the_background(mongo_db):
+    collection = mongo_db.resume_analyses
+    index = CandidateIndex(refresh_interval=0.01)
+
+    async def run():
+        index.start(collection)
+        await collection.insert_one({"_id": ObjectId(), "profile": profile(1, 7.0, ["Go"])})
+        await asyncio.sleep(0.1)
+        await index.stop()
+
+    asyncio.run(run())
+    assert len(index) == 1
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+
+from catalog import CatalogLoadError, CatalogManager, validate_records
+
+
+def internship(internship_id, **overrides):
+    return {
+        "id": internship_id,
+        "title": f"Intern {internship_id}",
+        "company": "Acme",
+        "location": "Remote",
+        "skills_required": ["Python", "SQL"],
+        "score_range": [5, 8],
+        "category": "Backend Development",
+        "description": "Build APIs.",
+        **overrides,
+    }
+
+
+def test_validate_records_skips_invalid_and_duplicate_ids():
+    records, rejected = validate_records([
+        internship(1),
+        internship(2, score_range=[9, 3]),
+        {"id": 3},
+        internship(1, title="Duplicate"),
+        internship(4),
+    ])
+    assert [record["id"] for record in records] == [1, 4]
+    assert rejected == 3
+
+
+def test_validate_records_requires_a_list():
+    with pytest.raises(CatalogLoadError):
+        validate_records({"id": 1})
+
+
+def test_file_reload_swaps_versions_only_on_change(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps([internship(1), internship(2)]))
+    manager = CatalogManager(path)
+
+    async def run():
+        assert await manager.reload()
+        first = manager.current
+        assert not await manager.reload()
+        path.write_text(json.dumps([internship(1), internship(2), internship(3)]))
+        assert await manager.reload()
+        return first, manager.current
+
+    first, second = asyncio.run(run())
+    assert (first.version, len(first.internships)) == (1, 2)
+    assert (second.version, len(second.internships)) == (2, 3)
+    # The older snapshot is untouched, so requests holding it stay consistent
+    assert len(first.internships) == 2 and sorted(second.by_id) == [1, 2, 3]
+    assert second.engine.top_k(6.0, second.matcher.match("python"), k=1)
+
+
+def test_failed_reload_keeps_serving_previous_version(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps([internship(1)]))
+    manager = CatalogManager(path)
+
+    async def run():
+        await manager.reload()
+        path.write_text("[not json")
+        with pytest.raises(CatalogLoadError):
+            await manager.reload()
+        path.write_text(json.dumps([{"id": "bad"}]))
+        with pytest.raises(CatalogLoadError):
+            await manager.reload()
+
+    asyncio.run(run())
+    assert manager.current.version == 1
+
+
+def test_not_loaded():
+    manager = CatalogManager("missing.json")
+    assert not manager.loaded
+    with pytest.raises(CatalogLoadError):
+        manager.current
+
+
+def test_mongo_source(mongo_db):
+    manager = CatalogManager("unused.json", collection=mongo_db.internships, source="mongo")
+
+    async def run():
+        await mongo_db.internships.insert_many([internship(2), internship(1)])
+        await manager.reload()
+
+    asyncio.run(run())
+    assert [record["id"] for record in manager.current.internships] == [1, 2]
+    assert manager.current.source == "mongo"
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from catalog import build_snapshot, build_snapshot_from_file, validate_records
+from catalog_snapshot import CatalogFile, SnapshotFormatError, write_catalog_snapshot
+from internship_listing import ListingQuery
+
+SKILLS = ["Python", "SQL", "React", "Docker", "Node.js", "CI/CD", "Figma", "!!!"]
+
+
+def catalog(size=300, seed=1):
+    rng = random.Random(seed)
+    records = []
+    for n in range(size):
+        low = rng.randint(2, 8)
+        record = {
+            "id": 1000 - n * 3,
+            "title": f"Intern {n}",
+            "company": f"Company {n % 7}",
+            # Mixed case, so listing filters must merge values that differ only in case
+            "location": rng.choice(["Remote", "remote", "Pune, India", "Delhi, India"]),
+            "skills_required": rng.sample(SKILLS, rng.randint(1, 4)) + (["Python"] if n % 11 == 0 else []),
+            "score_range": [low, min(10, low + rng.randint(0, 3))],
+            "category": rng.choice(["Backend Development", "backend development", "Design", "Data Science"]),
+            "description": f"Work with {rng.choice(SKILLS)} on {rng.choice(['APIs', 'dashboards', 'pipelines'])}.",
+        }
+        if n % 5 == 0:
+            record["stipend"] = {"amount": 1000 * n, "currency": "INR"}
+        records.append(record)
+    return records
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    records, rejected = validate_records(catalog())
+    path = tmp_path / "catalog.snapshot"
+    write_catalog_snapshot(records, path, "hash", "file", rejected)
+    return build_snapshot(records, "hash", 1, "file"), build_snapshot_from_file(CatalogFile(path), "hash", 1, "snapshot")
+
+
+def test_records_round_trip(snapshots):
+    from_json, from_file = snapshots
+    assert list(from_file.internships) == list(from_json.internships)
+    assert from_file.internships[-1] == from_json.internships[-1]
+    assert from_file.by_id[997] == from_json.by_id[997]
+    assert 998 not in from_file.by_id
+
+
+def test_indexes_built_from_columns_match_the_record_path(snapshots):
+    from_json, from_file = snapshots
+    assert from_file.engine._postings == from_json.engine._postings
+    assert from_file.engine._range_groups == from_json.engine._range_groups
+    assert from_file.engine._skill_totals == from_json.engine._skill_totals
+    for name in ("fields", "_positions_by_id", "_by_category", "_by_location", "_by_skill", "_ranges"):
+        assert getattr(from_file.listing, name) == getattr(from_json.listing, name), name
+
+
+def test_rankings_and_pages_match_the_record_path(snapshots):
+    from_json, from_file = snapshots
+    for resume in ("python sql docker", "react figma", "node.js ci/cd python"):
+        skills = from_json.matcher.match(resume)
+        assert skills == from_file.matcher.match(resume)
+        for rating in (3.0, 6.5, 9.0):
+            assert from_file.engine.top_k(rating, skills, 8) == from_json.engine.top_k(rating, skills, 8)
+            assert from_file.semantic.top_k(resume, skills, rating, 8) == from_json.semantic.top_k(resume, skills, rating, 8)
+        assert from_file.engine.top_k_by_skills(skills, 8) == from_json.engine.top_k_by_skills(skills, 8)
+
+    queries = [
+        ListingQuery(),
+        ListingQuery(category="BACKEND DEVELOPMENT", location="remote"),
+        ListingQuery(skills=("Python", "SQL"), score=6, fields=("id", "stipend"), limit=5),
+    ]
+    for query in queries:
+        assert from_file.listing.page(query) == from_json.listing.page(query)
+
+
+def test_building_from_a_file_decodes_no_records(tmp_path, monkeypatch):
+    records, _ = validate_records(catalog(50))
+    path = tmp_path / "catalog.snapshot"
+    write_catalog_snapshot(records, path, "hash", "file")
+
+    def record(self, position):
+        raise AssertionError("record decoded while building indexes")
+
+    monkeypatch.setattr(CatalogFile, "record", record)
+    snapshot = build_snapshot_from_file(CatalogFile(path), "hash", 1, "snapshot")
+    # The unfiltered listing comes straight from the file as well
+    assert snapshot.listing.page(ListingQuery()).total == 50
+
+
+def test_rejects_files_that_are_not_current_snapshots(tmp_path):
+    path = tmp_path / "catalog.snapshot"
+    path.write_bytes(b"[]")
+    with pytest.raises(SnapshotFormatError):
+        CatalogFile(path)
+
+    records, _ = validate_records(catalog(3))
+    write_catalog_snapshot(records, path, "hash", "file")
+    data = path.read_bytes().replace(b'"format": 2', b'"format": 1', 1)
+    path.write_bytes(data)
+    with pytest.raises(SnapshotFormatError):
+        CatalogFile(path)
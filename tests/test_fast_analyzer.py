@@ -0,0 +1,62 @@
+from fast_analyzer import FastAnalyzer
+from resume_sections import detect_sections, heading_name, split_sections
+
+STRONG_RESUME = """Asha Rao
+asha@example.com | github.com/asha
+
+SUMMARY
+Backend developer with 2 years of experience.
+
+EDUCATION
+B.Tech Computer Science, 2019 - 2023
+
+EXPERIENCE
+Software Intern, Acme 2022 - 2023
+- Built REST APIs in Python and FastAPI serving 10k users
+- Reduced query latency by 40% with PostgreSQL indexes
+- Deployed services with Docker and GitHub Actions
+
+PROJECTS
+- Developed a React dashboard; implemented CI/CD and automated tests
+
+Technical Skills
+Python, SQL, Docker, Git, Linux
+""" + "\n".join(f"- Designed and delivered feature {n} for the platform team" for n in range(20))
+
+
+def test_heading_name_normalises_common_headings():
+    assert heading_name("Technical Skills:") == "skills"
+    assert heading_name("  WORK EXPERIENCE ") == "experience"
+    assert heading_name("Awards & Achievements") == "achievements"
+    assert heading_name("Built REST APIs in Python") is None
+    assert heading_name("") is None
+
+
+def test_split_sections_keeps_header_and_merges_repeats():
+    text = "Jane Doe\nSkills\nPython\nProjects\nA\nSkills\nSQL"
+    assert split_sections(text) == [("header", "Jane Doe"), ("skills", "Python"), ("projects", "A"), ("skills", "SQL")]
+    assert detect_sections(text)["skills"] == "Python\nSQL"
+    assert "header" not in detect_sections("Skills\nPython")
+
+
+def test_strong_resume_rates_higher_than_a_thin_one():
+    analyzer = FastAnalyzer()
+    strong = analyzer.analyze(STRONG_RESUME)
+    thin = analyzer.analyze("Jane Doe\nI like computers.")
+
+    assert strong["overall_rating"] > thin["overall_rating"]
+    assert 0 <= thin["overall_rating"] <= strong["overall_rating"] <= 10
+    assert "  Strong in PostgreSQL" in strong["strengths"]  # vocabulary order
+    assert "  Needs improvement in professional or internship experience" in thin["weaknesses"]
+    assert "  Suggest improving bullet points with measurable results" in thin["suggestions"]
+
+
+def test_analysis_is_deterministic_and_shaped_like_gemini_output():
+    analyzer = FastAnalyzer()
+    first = analyzer.analyze(STRONG_RESUME, mode="degraded")
+    assert first == analyzer.analyze(STRONG_RESUME, mode="degraded")
+    assert first["analysis_mode"] == "degraded"
+    assert first["overall_rating"] * 2 == int(first["overall_rating"] * 2)
+    assert len(first["strengths"]) <= 4 and len(first["weaknesses"]) <= 4 and len(first["suggestions"]) <= 5
+    # Suggestions never repeat skills the resume already has
+    assert not any(skill in first["suggestions"] for skill in ("  Suggest adding Python", "  Suggest adding Docker"))
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from gemini_client import GeminiClient, GeminiError
+
+
+def make_client(handler, api_key="secret-key"):
+    client = GeminiClient(api_key, base_url="https://gemini.test/v1beta", http2=False)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def generate(client, prompt="prompt"):
+    async def run():
+        try:
+            return await client.generate_content(prompt)
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def test_generate_content_returns_text_and_records_usage():
+    seen = {}
+
+    def handler(request):
+        seen["url"] = str(request.url)
+        seen["key"] = request.headers.get("x-goog-api-key")
+        seen["payload"] = json.loads(request.content)
+        return httpx.Response(200, json={
+            "candidates": [{"content": {"parts": [{"text": "hello"}]}}],
+            "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": 3},
+        })
+
+    client = make_client(handler)
+    assert generate(client, "the prompt") == "hello"
+    assert seen["url"] == "https://gemini.test/v1beta/models/gemini-2.0-flash:generateContent"
+    # The key travels in a header, never in the URL
+    assert seen["key"] == "secret-key" and "secret-key" not in seen["url"]
+    assert seen["payload"] == {"contents": [{"parts": [{"text": "the prompt"}]}]}
+    assert client.stats() == {"metered_responses": 1, "prompt_tokens": 12, "output_tokens": 3}
+
+
+def test_error_status_becomes_gemini_error():
+    client = make_client(lambda request: httpx.Response(429, headers={"retry-after": "7"}, text="slow down"))
+    with pytest.raises(GeminiError) as excinfo:
+        generate(client)
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after == 7.0
+    assert excinfo.value.retryable
+
+
+def test_client_errors_are_not_retryable():
+    client = make_client(lambda request: httpx.Response(400, text="bad request"))
+    with pytest.raises(GeminiError) as excinfo:
+        generate(client)
+    assert not excinfo.value.retryable
+
+
+def test_transport_error_becomes_retryable_gemini_error():
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    with pytest.raises(GeminiError) as excinfo:
+        generate(make_client(handler))
+    assert excinfo.value.status_code is None
+    assert excinfo.value.retryable
+
+
+def test_requires_start():
+    with pytest.raises(GeminiError):
+        asyncio.run(GeminiClient("key").generate_content("prompt"))
+
+
+def test_non_json_body_becomes_gemini_error():
+    client = make_client(lambda request: httpx.Response(200, text="<html>proxy error</html>"))
+    with pytest.raises(GeminiError) as excinfo:
+        generate(client)
+    assert not excinfo.value.retryable
+
+
+def test_empty_candidates_become_gemini_error():
+    body = {"candidates": [], "promptFeedback": {"blockReason": "SAFETY"}}
+    with pytest.raises(GeminiError, match="SAFETY"):
+        generate(make_client(lambda request: httpx.Response(200, json=body)))
+
+
+def stream(client, prompt="prompt"):
+    async def run():
+        try:
+            return [text async for text in client.stream_generate_content(prompt)]
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def sse(*events):
+    return "".join(f"data: {json.dumps(event)}\r\n\r\n" for event in events)
+
+
+def test_stream_yields_text_and_skips_events_without_candidates():
+    body = sse(
+        {"candidates": [{"content": {"parts": [{"text": '{"overall'}]}}]},
+        {"candidates": []},
+        {"candidates": [{"content": {"parts": [{"text": '_rating": 7}'}]}}],
+         "usageMetadata": {"promptTokenCount": 5, "candidatesTokenCount": 4}},
+    )
+    client = make_client(lambda request: httpx.Response(200, text=body))
+    assert "".join(stream(client)) == '{"overall_rating": 7}'
+    assert client.stats()["output_tokens"] == 4
+
+
+def test_blocked_or_malformed_stream_becomes_gemini_error():
+    blocked = sse({"candidates": [], "promptFeedback": {"blockReason": "SAFETY"}})
+    with pytest.raises(GeminiError, match="SAFETY"):
+        stream(make_client(lambda request: httpx.Response(200, text=blocked)))
+    with pytest.raises(GeminiError):
+        stream(make_client(lambda request: httpx.Response(200, text="data: not json\r\n\r\n")))
+    with pytest.raises(GeminiError):
+        stream(make_client(lambda request: httpx.Response(200, text=sse(["not", "an", "object"]))))
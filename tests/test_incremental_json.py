@@ -0,0 +1,79 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from incremental_json import FieldFanout, IncrementalJSONError, IncrementalJSONParser, first_field
+
+ANALYSIS = {
+    "overall_rating": 7.5,
+    "strengths": ["  Strong in \"Python\"", "  Strong in {braces} and [brackets]"],
+    "nested": {"a": [1, 2.5e3, None, True, False], "b": "\\u00e9"},
+    "raw_analysis": "Solid resume.",
+}
+
+
+def test_fields_are_emitted_as_soon_as_they_complete():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"overall_rating": 7.5, "stren') == [("overall_rating", 7.5)]
+    # A container is complete at its closing bracket; a number only once a delimiter follows
+    assert parser.feed('gths": ["a", "b"], "x": 1') == [("strengths", ["a", "b"])]
+    assert parser.feed('}') == [("x", 1)]
+    assert parser.complete
+    assert parser.close() == {"overall_rating": 7.5, "strengths": ["a", "b"], "x": 1}
+
+
+def test_any_chunking_gives_the_same_result_as_json_loads():
+    text = "```json\n" + json.dumps(ANALYSIS, indent=2) + "\n```"
+    rng = random.Random(7)
+    for _ in range(20):
+        parser, fields, start = IncrementalJSONParser(), [], 0
+        while start < len(text):
+            end = start + rng.randint(1, 12)
+            fields.extend(parser.feed(text[start:end]))
+            start = end
+        assert parser.close() == ANALYSIS
+        assert [name for name, _ in fields] == list(ANALYSIS)
+
+
+@pytest.mark.parametrize("text", [
+    "I cannot help with that request.",
+    '{"overall_rating" 7}',
+    '{"overall_rating": 7 "strengths": []}',
+    '{"overall_rating": nope}',
+])
+def test_malformed_input_fails_early(text):
+    with pytest.raises(IncrementalJSONError):
+        IncrementalJSONParser(max_preamble=16).feed(text)
+
+
+def test_truncated_input_fails_on_close():
+    parser = IncrementalJSONParser()
+    parser.feed('{"overall_rating": 7.5, "strengths": ["a"')
+    with pytest.raises(IncrementalJSONError):
+        parser.close()
+
+
+def test_fanout_replays_fields_to_late_subscribers():
+    fanout, early, late = FieldFanout(), [], []
+    fanout.subscribe(lambda name, value: early.append(name))
+    fanout.publish("overall_rating", 7)
+    fanout.subscribe(lambda name, value: late.append(name))
+    fanout.publish("strengths", [])
+    assert early == late == ["overall_rating", "strengths"]
+    fanout.close()
+    fanout.publish("weaknesses", [])
+    assert early == ["overall_rating", "strengths"]
+
+
+def test_first_field_resolves_once():
+    async def run():
+        future, on_field = first_field("overall_rating")
+        on_field("strengths", [])
+        assert not future.done()
+        on_field("overall_rating", 8)
+        on_field("overall_rating", 3)
+        return await future
+
+    assert asyncio.run(run()) == 8
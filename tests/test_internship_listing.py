@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from internship_listing import InternshipListing, ListingError, ListingQuery, etag_matches
+from skill_matcher import SkillMatcher
+
+INTERNSHIPS = [
+    {"id": 10, "category": "Data Science", "location": "Remote", "skills_required": ["Python", "SQL"], "score_range": [6, 9]},
+    {"id": 11, "category": "Backend", "location": "Pune", "skills_required": ["Node.js"], "score_range": [4, 6]},
+    {"id": 12, "category": "Data Science", "location": "Pune", "skills_required": ["Python"], "score_range": [3, 5]},
+    {"id": 13, "category": "Backend", "location": "Remote", "skills_required": ["Python", "Node.js"], "score_range": [7, 10]},
+]
+
+
+def listing(version=1):
+    return InternshipListing(INTERNSHIPS, SkillMatcher.from_internships(INTERNSHIPS), version)
+
+
+def ids(page):
+    return [item["id"] for item in json.loads(page.body)]
+
+
+def test_unfiltered_page_is_the_whole_catalog():
+    page = listing().page(ListingQuery())
+    assert json.loads(page.body) == INTERNSHIPS
+    assert page.total == 4 and page.next_cursor is None
+
+
+def test_filters_intersect():
+    catalog = listing()
+    assert ids(catalog.page(ListingQuery(category="data science"))) == [10, 12]
+    assert ids(catalog.page(ListingQuery(category="Data Science", location="PUNE"))) == [12]
+    assert ids(catalog.page(ListingQuery(skills=("python", "node.js")))) == [13]
+    assert ids(catalog.page(ListingQuery(score=6))) == [10, 11]
+    assert ids(catalog.page(ListingQuery(skills=("Rust",)))) == []
+
+
+def test_field_projection():
+    page = listing().page(ListingQuery(fields=("id", "location"), limit=1))
+    assert json.loads(page.body) == [{"id": 10, "location": "Remote"}]
+    with pytest.raises(ListingError):
+        listing().page(ListingQuery(fields=("salary",)))
+
+
+def test_cursor_pagination_walks_every_match():
+    catalog = listing()
+    seen, cursor = [], None
+    while True:
+        page = catalog.page(ListingQuery(skills=("Python",), limit=2, cursor=cursor))
+        assert page.total == 3
+        seen += ids(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == [10, 12, 13]
+    assert ids(catalog.page(ListingQuery(offset=3))) == [13]
+
+
+def test_cursor_errors():
+    with pytest.raises(ListingError):
+        listing().page(ListingQuery(cursor="not-a-cursor!"))
+    # A cursor naming an id the catalog no longer has
+    other = InternshipListing(INTERNSHIPS[:1], SkillMatcher.from_internships(INTERNSHIPS), 2)
+    cursor = listing().page(ListingQuery(limit=2)).next_cursor
+    with pytest.raises(ListingError):
+        other.page(ListingQuery(cursor=cursor))
+
+
+def test_etags_follow_the_body():
+    catalog = listing()
+    first = catalog.page(ListingQuery(category="Backend"))
+    assert catalog.page(ListingQuery(category="Backend")) is first
+    assert first.etag != catalog.page(ListingQuery(category="Data Science")).etag
+    assert etag_matches(f'W/{first.etag}, "other"', first.etag)
+    assert etag_matches("*", first.etag)
+    assert not etag_matches(None, first.etag) and not etag_matches('"other"', first.etag)
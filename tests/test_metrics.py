@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import EventLoopLagMonitor, MetricsMiddleware, MetricsRegistry
+
+
+def test_counters_gauges_and_callbacks_render_in_exposition_format():
+    registry = MetricsRegistry()
+    analyses = registry.counter("analyses_total", "Analyses.", ["mode"])
+    analyses.inc("full")
+    analyses.inc("full")
+    analyses.inc('fa"st', amount=0.5)
+    registry.gauge("queue_depth", "Depth.").set(3)
+    registry.callback("cache_entries", "Entries.", lambda: [({"tier": "memory"}, 7)])
+    registry.callback("broken", "Raises.", lambda: 1 / 0)
+
+    text = registry.render()
+    assert "# TYPE analyses_total counter" in text
+    assert 'analyses_total{mode="full"} 2' in text
+    assert 'analyses_total{mode="fa\\"st"} 0.5' in text
+    assert "queue_depth 3" in text
+    assert 'cache_entries{tier="memory"} 7' in text
+    # A failing callback is skipped, not the whole scrape
+    assert "broken" not in text and text.endswith("\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stages.", buckets=(0.1, 1.0), labelnames=["stage"])
+    for value in (0.05, 0.1, 0.5, 5.0):
+        stages.observe(value, "extract")
+
+    lines = registry.render().splitlines()
+    assert 'stage_seconds_bucket{stage="extract",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="extract",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="extract",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="extract"} 5.65' in lines
+    assert 'stage_seconds_count{stage="extract"} 4' in lines
+
+
+def app_with_metrics(sample_rate=0.0):
+    registry = MetricsRegistry()
+    requests = registry.histogram("http_request_seconds", "Requests.", labelnames=["method", "route", "status"])
+    stages = registry.histogram("stage_seconds", "Stages.", labelnames=["stage"])
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        with stages.time("lookup"):
+            return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware, requests=requests, sample_rate=sample_rate)
+    return TestClient(app), registry
+
+
+def test_middleware_labels_by_route_template_and_echoes_request_id():
+    client, registry = app_with_metrics()
+    assert client.get("/items/1", headers={"X-Request-ID": "abc"}).headers["x-request-id"] == "abc"
+    generated = client.get("/items/2").headers["x-request-id"]
+    assert len(generated) == 32
+    client.get("/missing")
+
+    text = registry.render()
+    assert 'http_request_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'http_request_seconds_count{method="GET",route="unmatched",status="404"} 1' in text
+
+
+def test_forced_trace_logs_spans(caplog):
+    client, _ = app_with_metrics()
+    with caplog.at_level(logging.INFO, logger="metrics"):
+        client.get("/items/1", headers={"X-Trace": "1", "X-Request-ID": "traced"})
+        client.get("/items/2")
+    traces = [record.getMessage() for record in caplog.records if record.getMessage().startswith("trace ")]
+    assert len(traces) == 1
+    assert '"request_id": "traced"' in traces[0] and '"lookup"' in traces[0]
+
+
+def test_event_loop_lag_monitor_sees_blocking():
+    registry = MetricsRegistry()
+    monitor = EventLoopLagMonitor(registry.histogram("loop_lag_seconds", "Lag."), interval=0.01)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.05)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+    asyncio.run(run())
+    lag_sum = next(line for line in registry.render().splitlines() if line.startswith("loop_lag_seconds_sum"))
+    assert float(lag_sum.split()[1]) >= 0.03
+    assert monitor._task is None
@@ -0,0 +1,54 @@
+import asyncio
+import io
+
+import PyPDF2
+import pytest
+
+from pdf_extraction import PDFExtractionError, PDFExtractor, PDFLimitExceeded, extract_pdf, sample_pdf
+
+RESUME = "Jane Doe\nSKILLS\nPython, SQL (PostgreSQL)"
+
+
+def test_sample_pdf_round_trips():
+    extracted = extract_pdf(sample_pdf(RESUME))
+    assert extracted.pages == 1
+    for line in RESUME.splitlines():
+        assert line in extracted.text
+
+
+def test_page_limit():
+    writer = PyPDF2.PdfWriter()
+    for _ in range(2):
+        writer.add_page(PyPDF2.PdfReader(io.BytesIO(sample_pdf(RESUME))).pages[0])
+    two_pages = io.BytesIO()
+    writer.write(two_pages)
+
+    assert extract_pdf(two_pages.getvalue(), max_pages=2).pages == 2
+    with pytest.raises(PDFLimitExceeded):
+        extract_pdf(two_pages.getvalue(), max_pages=1)
+
+
+def test_malformed_pdf_raises_extraction_error():
+    with pytest.raises(PDFExtractionError):
+        extract_pdf(b"%PDF-1.4\nnot really a pdf")
+
+
+def test_extractor_requires_start(tmp_path):
+    with pytest.raises(PDFExtractionError):
+        asyncio.run(PDFExtractor().extract(str(tmp_path / "missing.pdf")))
+
+
+def test_extractor_parses_in_worker_processes(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(sample_pdf(RESUME))
+    empty = tmp_path / "empty.pdf"
+    empty.write_bytes(b"")
+    extractor = PDFExtractor(max_workers=1)
+    extractor.start()
+    try:
+        extracted = asyncio.run(extractor.warm_up(str(path)))
+        assert "Python, SQL" in extracted.text
+        with pytest.raises(PDFExtractionError):
+            asyncio.run(extractor.extract(str(empty)))
+    finally:
+        extractor.shutdown()
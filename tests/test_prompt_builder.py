@@ -0,0 +1,34 @@
+from prompt_builder import PromptBuilder, compact_lines, estimate_tokens, normalize_text
+
+
+def test_normalize_text_folds_typography_and_whitespace():
+    text = "Arti\ufb01cial \u201cintelligence\u201d \u2013 de-\nployed\r\n\u2022  Built   APIs\u200b"
+    assert normalize_text(text) == 'Artificial "intelligence" - deployed\n- Built APIs'
+
+
+def test_compact_lines_drops_boilerplate_and_repeats():
+    text = "Jane Doe\nPage 1 of 2\n\nResume\nPython\npython\n3\nI hereby declare that the above is true\nSQL"
+    assert compact_lines(text) == ("Jane Doe\nPython\nSQL", 5)
+
+
+def test_resume_within_budget_is_only_compacted():
+    builder = PromptBuilder("PREFIX\n", token_budget=100)
+    built = builder.build("Jane Doe\nSkills\nPython, SQL\nPage 1")
+    assert built.prompt == "PREFIX\nJane Doe\nSkills\nPython, SQL"
+    assert built.trimmed_sections == [] and built.lines_dropped == 1
+    assert built.prompt_tokens == estimate_tokens("PREFIX\n") + built.resume_tokens
+
+
+def test_over_budget_resume_keeps_priority_sections_in_document_order():
+    interests = "\n".join(f"Hobby number {n}" for n in range(40))
+    experience = "\n".join(f"Built service {n} in Python" for n in range(10))
+    resume = f"Jane Doe\nInterests\n{interests}\nExperience\n{experience}\nSkills\nPython, SQL"
+    builder = PromptBuilder("", token_budget=100)
+    built = builder.build(resume)
+
+    assert built.resume_tokens <= 100 < built.original_resume_tokens
+    assert built.prompt.index("EXPERIENCE") < built.prompt.index("SKILLS")
+    assert "Built service 9 in Python" in built.prompt and "Python, SQL" in built.prompt
+    assert "interests" in built.trimmed_sections
+    stats = builder.stats()
+    assert stats["trimmed_requests"] == 1 and stats["saved_tokens"] > 0
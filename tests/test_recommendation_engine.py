@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from recommendation_engine import RecommendationEngine
+from skill_matcher import SkillMatcher
+
+VOCABULARY = [f"Skill{n}" for n in range(25)]
+
+
+def catalog(rng, size):
+    internships = []
+    for n in range(size):
+        low = rng.randint(2, 9)
+        internships.append({
+            "id": n,
+            "skills_required": rng.sample(VOCABULARY, rng.randint(1, 6)),
+            "score_range": [low, min(10, low + rng.randint(0, 3))],
+        })
+    return internships
+
+
+def linear_scan(internships, matcher, rating, resume_skills, k, tolerance):
+    """The ranking the engine replaces: score every internship."""
+    scored = []
+    for position, internship in enumerate(internships):
+        skills = internship["skills_required"]
+        matched = sum(matcher.skill_id(skill) in resume_skills for skill in skills)
+        percentage = int(matched / len(skills) * 100)
+        low, high = internship["score_range"]
+        if not low - tolerance <= rating <= high + tolerance:
+            continue
+        if percentage > 0 or low <= rating <= high:
+            scored.append(((max(percentage, 10), -abs(rating - (low + high) / 2), -position), internship, percentage))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [(internship, percentage) for _, internship, percentage in scored[:k]]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_top_k_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    internships = catalog(rng, 300)
+    matcher = SkillMatcher.from_internships(internships)
+    engine = RecommendationEngine(internships, matcher)
+    for _ in range(50):
+        resume_skills = matcher.match(" ".join(rng.sample(VOCABULARY, rng.randint(0, 8))))
+        rating = rng.choice([rng.uniform(0, 10), float(rng.randint(0, 10))])
+        k, tolerance = rng.choice([1, 6, 20]), rng.choice([0.0, 1.0, 2.5])
+        assert engine.top_k(rating, resume_skills, k, tolerance) == \
+            linear_scan(internships, matcher, rating, resume_skills, k, tolerance)
+
+
+def test_top_k_by_skills_orders_by_overlap():
+    internships = [
+        {"id": 0, "skills_required": ["A", "B", "C", "D"], "score_range": [5, 10]},
+        {"id": 1, "skills_required": ["A", "B"], "score_range": [5, 10]},
+        {"id": 2, "skills_required": ["A", "Z"], "score_range": [5, 10]},
+        {"id": 3, "skills_required": ["Z"], "score_range": [5, 10]},
+    ]
+    matcher = SkillMatcher.from_internships(internships)
+    engine = RecommendationEngine(internships, matcher)
+    ranked = engine.top_k_by_skills(matcher.match("A B"), k=10)
+    assert [(internship["id"], percentage) for internship, percentage in ranked] == [(1, 100), (0, 50), (2, 50)]
+
+
+def test_non_positive_k():
+    internships = catalog(random.Random(0), 10)
+    engine = RecommendationEngine(internships, SkillMatcher.from_internships(internships))
+    assert engine.top_k(7.0, frozenset({0}), k=0) == []
+    assert engine.top_k_by_skills(frozenset({0}), k=0) == []
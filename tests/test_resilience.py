@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from resilience import (
+    AdmissionRejected,
+    CircuitBreaker,
+    CircuitOpenError,
+    ConcurrencyGovernor,
+    RateLimited,
+    ResilientCaller,
+    TokenBucket,
+    backoff_delay,
+)
+
+
+class Upstream(Exception):
+    def __init__(self, retryable=True, retry_after=None):
+        super().__init__("upstream error")
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def caller(breaker=None, max_retries=2, **governor):
+    return ResilientCaller(
+        ConcurrencyGovernor(**{"max_concurrent": 2, "max_queue": 2, "max_queue_wait": 1.0, **governor}),
+        TokenBucket(rate_per_second=1000, burst=100, max_wait=1.0),
+        breaker or CircuitBreaker(failure_threshold=3, reset_timeout=60),
+        is_retryable=lambda e: getattr(e, "retryable", False),
+        max_retries=max_retries,
+        base_delay=0.001,
+        max_delay=0.01,
+    )
+
+
+def test_governor_rejects_when_the_queue_is_full():
+    governor = ConcurrencyGovernor(max_concurrent=1, max_queue=1, max_queue_wait=1.0)
+
+    async def hold(release):
+        async with governor.slot():
+            await release.wait()
+
+    async def run():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(release))
+        waiter = asyncio.ensure_future(hold(release))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected):
+            async with governor.slot():
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+    asyncio.run(run())
+    assert governor.stats()["rejected_queue_full"] == 1
+    assert governor.stats()["active"] == 0
+
+
+def test_governor_rejects_after_the_queue_wait():
+    governor = ConcurrencyGovernor(max_concurrent=1, max_queue=5, max_queue_wait=0.01)
+
+    async def run():
+        async with governor.slot():
+            with pytest.raises(AdmissionRejected):
+                async with governor.slot():
+                    pass
+
+    asyncio.run(run())
+    assert governor.rejected_timeout == 1
+
+
+def test_token_bucket_rejects_waits_beyond_max_wait():
+    bucket = TokenBucket(rate_per_second=1, burst=1, max_wait=0.1)
+
+    async def run():
+        await bucket.acquire()
+        with pytest.raises(RateLimited) as excinfo:
+            await bucket.acquire()
+        return excinfo.value.retry_after
+
+    assert asyncio.run(run()) == pytest.approx(1.0, abs=0.05)
+    assert bucket.rejected == 1
+
+
+def test_breaker_opens_then_allows_one_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+    assert breaker.times_opened == 1
+
+
+def test_open_breaker_rejects_until_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert 0 < excinfo.value.retry_after <= 60
+
+
+def test_backoff_honours_retry_after_within_max_delay():
+    for attempt in range(5):
+        assert 0 <= backoff_delay(attempt, 0.5, 4.0) <= 4.0
+    assert backoff_delay(0, 0.001, 4.0, retry_after=2.0) >= 2.0
+    assert backoff_delay(0, 0.001, 4.0, retry_after=30.0) <= 4.0
+
+
+def test_caller_retries_retryable_errors():
+    resilient = caller()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Upstream()
+        return "ok"
+
+    assert asyncio.run(resilient.call(flaky)) == "ok"
+    assert (len(attempts), resilient.retries) == (3, 2)
+    assert resilient.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_caller_does_not_retry_permanent_errors():
+    resilient = caller()
+    attempts = []
+
+    async def broken():
+        attempts.append(1)
+        raise Upstream(retryable=False)
+
+    with pytest.raises(Upstream):
+        asyncio.run(resilient.call(broken))
+    assert len(attempts) == 1
+
+
+def test_caller_stops_at_the_open_breaker():
+    resilient = caller(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60), max_retries=5)
+
+    async def down():
+        raise Upstream()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient.call(down))
+    assert resilient.breaker.times_opened == 1
+    assert resilient.stats()["retries"] == 2
+
+
+def test_errors_that_are_not_upstream_failures_leave_the_breaker_closed():
+    resilient = caller(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    resilient.is_upstream_failure = lambda e: not isinstance(e, ValueError)
+    attempts = []
+
+    async def bad_payload():
+        attempts.append(1)
+        raise ValueError("model returned malformed JSON")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            asyncio.run(resilient.call(bad_payload))
+    assert len(attempts) == 3
+    assert resilient.breaker.stats()["state"] == CircuitBreaker.CLOSED
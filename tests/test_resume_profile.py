@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+import server as server_module
+from catalog import CatalogManager, build_snapshot
+from resume_profile import build_profile, profile_skills
+from semantic_ranker import resume_terms
+
+RESUME = "Python developer building REST APIs with SQL and Docker. Python scripts for data pipelines."
+
+
+def internships(skill_lists):
+    return [
+        {"id": i, "title": f"Intern {i}", "company": "Acme", "location": "Remote",
+         "skills_required": skills, "score_range": [4, 9], "category": "Backend Development",
+         "description": "Build APIs and data pipelines in Python."}
+        for i, skills in enumerate(skill_lists, start=1)
+    ]
+
+
+CATALOG = internships([["Python", "SQL"], ["Docker"], ["Figma"]])
+
+
+def test_profile_keeps_names_next_to_catalog_specific_ids():
+    snapshot = build_snapshot(CATALOG, "v1", 1, "file")
+    skills = snapshot.matcher.match(RESUME)
+    profile = build_profile(snapshot, skills, 7.5, "abc", RESUME)
+
+    assert profile["catalog_hash"] == "v1" and profile["rating"] == 7.5
+    assert set(profile["skills"]) == {"Python", "SQL", "Docker"}
+    assert profile["terms"]["python"] == 2
+    assert profile_skills(snapshot, profile) == skills
+
+
+def test_profile_skills_are_remapped_onto_a_changed_catalog():
+    old = build_snapshot(CATALOG, "v1", 1, "file")
+    profile = build_profile(old, old.matcher.match(RESUME), 7.5, "abc", RESUME)
+    # Same names, different IDs, and SQL is gone from the new catalog
+    new = build_snapshot(internships([["Figma"], ["Docker", "Go"], ["Python"]]), "v2", 2, "file")
+
+    remapped = profile_skills(new, profile)
+    assert {new.matcher.skill_names[skill_id] for skill_id in remapped} == {"Python", "Docker"}
+
+
+def test_skills_new_to_the_catalog_are_found_among_the_stored_terms():
+    resume = RESUME + " Deployed on Kubernetes (k8s) with machine learning models."
+    old = build_snapshot(CATALOG, "v1", 1, "file")
+    profile = build_profile(old, old.matcher.match(resume), 7.5, "abc", resume)
+    new = build_snapshot(internships([["Python", "Kubernetes", "Machine Learning"]]), "v2", 2, "file")
+
+    remapped = {new.matcher.skill_names[skill_id] for skill_id in profile_skills(new, profile)}
+    # Terms keep no word order, so a new multi-word skill waits for the resume to be analysed again
+    assert remapped == {"Python", "Kubernetes"}
+
+
+def test_stored_terms_rank_like_the_resume_text():
+    snapshot = build_snapshot(CATALOG, "v1", 1, "file")
+    skills = snapshot.matcher.match(RESUME)
+    from_text = snapshot.semantic.top_k(RESUME, skills, 7.0)
+    assert snapshot.semantic.top_k(resume_terms(RESUME), skills, 7.0) == from_text
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch, mongo_db):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(CATALOG))
+    catalog = CatalogManager(path)
+    asyncio.run(catalog.reload())
+    monkeypatch.setattr(server_module, "catalog", catalog)
+    monkeypatch.setattr(server_module, "db", mongo_db)
+    return server_module
+
+
+def stored_profile(server):
+    snapshot = server.catalog.current
+    return build_profile(snapshot, snapshot.matcher.match(RESUME), 7.0, "abc", RESUME)
+
+
+def test_stored_analysis_is_ranked_again_from_its_profile(server):
+    analysis_id = ObjectId()
+    asyncio.run(server.db.resume_analyses.insert_one({"_id": analysis_id, "profile": stored_profile(server)}))
+
+    response = TestClient(server.app).get(f"/api/analyses/{analysis_id}/recommendations", params={"top_k": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["analysis_id"] == str(analysis_id) and body["catalog_version"] == 1
+    assert [r["id"] for r in body["recommendations"]] == [1, 2]
+
+
+def test_analysis_still_in_the_write_buffer_is_found(server, monkeypatch):
+    analysis_id = ObjectId()
+    queued = {analysis_id: {"_id": analysis_id, "profile": stored_profile(server)}}
+    monkeypatch.setattr(server.analysis_writer, "get", queued.get)
+
+    response = TestClient(server.app).get(f"/api/analyses/{analysis_id}/recommendations")
+    assert response.status_code == 200
+
+
+def test_missing_and_profile_less_analyses(server):
+    client = TestClient(server.app)
+    assert client.get("/api/analyses/not-an-id/recommendations").status_code == 404
+    assert client.get(f"/api/analyses/{ObjectId()}/recommendations").status_code == 404
+
+    analysis_id = ObjectId()
+    asyncio.run(server.db.resume_analyses.insert_one({"_id": analysis_id, "analysis": {}}))
+    assert client.get(f"/api/analyses/{analysis_id}/recommendations").status_code == 409
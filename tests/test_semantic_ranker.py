@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from semantic_ranker import SemanticRanker, build_text_index, resume_terms
+from skill_matcher import SkillMatcher
+
+
+def internship(internship_id, skills, score_range=(5, 8), description="Build APIs."):
+    return {
+        "id": internship_id,
+        "title": f"Intern {internship_id}",
+        "category": "Engineering",
+        "description": description,
+        "skills_required": skills,
+        "score_range": list(score_range),
+    }
+
+
+def ranker(internships, **weights):
+    return SemanticRanker(internships, SkillMatcher.from_internships(internships), **weights)
+
+
+def test_rating_fit_falls_linearly_to_zero_at_the_tolerance_edge():
+    internships = [internship(n, ["Go"], score_range=(5, 6)) for n in range(3)]
+    rating_only = ranker(internships, semantic_weight=0.0, skill_weight=0.0, rating_weight=1.0)
+    assert rating_only.scores("", frozenset(), 5.5, tolerance=2.0)[0] == pytest.approx(1.0)
+    assert rating_only.scores("", frozenset(), 7.0, tolerance=2.0)[0] == pytest.approx(0.5)
+    assert rating_only.scores("", frozenset(), 8.0, tolerance=2.0)[0] == pytest.approx(0.0)
+    assert rating_only.scores("", frozenset(), 8.5, tolerance=2.0)[0] == -np.inf
+    # Zero tolerance keeps only postings whose range contains the rating
+    assert rating_only.scores("", frozenset(), 5.0, tolerance=0.0)[0] == pytest.approx(1.0)
+    assert rating_only.scores("", frozenset(), 4.9, tolerance=0.0)[0] == -np.inf
+
+
+def test_ties_at_the_cutoff_go_to_the_earliest_positions():
+    internships = [internship(0, ["Python", "Django"])] + [internship(n, ["Python"]) for n in range(1, 300)]
+    semantic = ranker(internships)
+    skills = SkillMatcher.from_internships(internships).match("python django")
+    for k in (2, 5, 17):
+        ids = [posting["id"] for posting, _ in semantic.top_k("", skills, 6.0, k=k)]
+        assert ids == list(range(k))
+
+
+def test_scores_match_a_dense_computation():
+    rng = np.random.default_rng(5)
+    vocabulary = ["python", "sql", "react", "docker", "design", "research", "mobile", "cloud"]
+    internships = [
+        internship(n, list(rng.choice(["Python", "SQL", "React", "Docker"], 2, replace=False)),
+                   description=" ".join(rng.choice(vocabulary, 6)))
+        for n in range(60)
+    ]
+    semantic = ranker(internships)
+    resume = "python docker cloud research python"
+    index = build_text_index(internships)
+
+    dense = np.zeros((len(internships), len(index.terms)))
+    for term_id in range(len(index.terms)):
+        for entry in range(index.indptr[term_id], index.indptr[term_id + 1]):
+            dense[index.docs[entry], term_id] = index.weights[entry]
+    query = np.zeros(len(index.terms))
+    for term, count in resume_terms(resume).items():
+        if term in semantic.vocabulary:
+            query[semantic.vocabulary[term]] = (1 + np.log(count)) * index.idf[semantic.vocabulary[term]]
+    query /= np.linalg.norm(query)
+
+    skills = SkillMatcher.from_internships(internships).match(resume)
+    scores = semantic.scores(resume, skills, 6.0, tolerance=1.0)
+    matcher = SkillMatcher.from_internships(internships)
+    for position, posting in enumerate(internships):
+        overlap = len(skills & matcher.match(" ".join(posting["skills_required"]))) / len(posting["skills_required"])
+        expected = 0.5 * dense[position] @ query + 0.35 * overlap + 0.15
+        assert scores[position] == pytest.approx(expected, abs=1e-5)
+
+    top = semantic.top_k(resume_terms(resume), skills, 6.0, k=5)
+    assert [score for _, score in top] == sorted((score for _, score in top), reverse=True)
+    assert top[0][1] == int(round(scores.max() * 100))
+
+
+def test_top_k_excludes_out_of_range_postings():
+    internships = [internship(1, ["Python"], score_range=(1, 2)), internship(2, ["Python"], score_range=(6, 9))]
+    assert [posting["id"] for posting, _ in ranker(internships).top_k("python", frozenset(), 7.0, k=6)] == [2]
+    assert ranker(internships).top_k("python", frozenset(), 7.0, k=0) == []
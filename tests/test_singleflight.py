@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"upstream_calls": 1, "coalesced_calls": 4, "in_flight": 0}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def run():
+        return await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0, "a")), flight.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert flight.upstream_calls == 2
+
+
+def test_errors_are_shared_then_forgotten():
+    flight = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        results = await asyncio.gather(flight.do("key", failing), flight.do("key", failing), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        # The failure is not cached: the next call goes upstream again
+        return await flight.do("key", lambda: asyncio.sleep(0, "recovered"))
+
+    assert asyncio.run(run()) == "recovered"
+    assert len(attempts) == 1
+    assert flight.upstream_calls == 2
+
+
+def test_one_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_call_is_cancelled_once_every_caller_leaves():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def run():
+        caller = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert cancelled == [1]
+    assert flight.stats()["in_flight"] == 0
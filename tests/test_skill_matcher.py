@@ -0,0 +1,51 @@
+from skill_matcher import SkillMatcher, tokenize
+
+SKILLS = ["Python", "Git", "SQL", "PostgreSQL", "Node.js", "C++", "CI/CD", "Machine Learning", "Learning", "REST APIs"]
+
+
+def names(matcher, text):
+    return {matcher.skill_names[skill_id] for skill_id in matcher.match(text)}
+
+
+def test_tokenize_keeps_skill_punctuation():
+    assert tokenize("C++, C# and Node.js. Python.") == ["c++", "c#", "and", "node.js", "python"]
+    assert tokenize("CI/CD") == ["ci", "cd"]
+
+
+def test_matches_whole_tokens_only():
+    matcher = SkillMatcher(SKILLS)
+    assert names(matcher, "GitHub and MySQLdb, PostgreSQL") == {"PostgreSQL"}
+    assert names(matcher, "git, sql") == {"Git", "SQL"}
+
+
+def test_overlapping_patterns_all_match():
+    matcher = SkillMatcher(SKILLS)
+    assert names(matcher, "Applied machine learning to C++ code") == {"Machine Learning", "Learning", "C++"}
+
+
+def test_aliases_map_to_canonical_skills():
+    matcher = SkillMatcher(SKILLS)
+    assert names(matcher, "Built RESTful APIs on nodejs with postgres and a ci cd pipeline") == {
+        "REST APIs", "Node.js", "PostgreSQL", "CI/CD",
+    }
+
+
+def test_aliases_of_skills_outside_the_catalog_are_ignored():
+    matcher = SkillMatcher(["Python"])
+    assert matcher.match("k8s and nodejs") == frozenset()
+
+
+def test_skill_id_and_duplicate_spellings():
+    matcher = SkillMatcher(["Node.js", "node.js", "Python"])
+    assert matcher.skill_names == ["Node.js", "Python"]
+    assert matcher.skill_id("NODE.JS") == matcher.skill_id("Node.js") == 0
+    assert matcher.skill_id("Rust") is None
+
+
+def test_from_internships():
+    matcher = SkillMatcher.from_internships([
+        {"skills_required": ["Python", "SQL"]},
+        {"skills_required": ["SQL", "Docker"]},
+        {},
+    ])
+    assert matcher.skill_names == ["Python", "SQL", "Docker"]
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server as server_module
+from candidate_index import CandidateIndex
+from startup import StartupProfile
+
+
+def test_steps_are_timed_and_reported():
+    profile = StartupProfile(import_seconds=0.25)
+    with profile.step("catalog"):
+        pass
+    report = profile.report()
+    assert report["import_seconds"] == 0.25 and "catalog" in report["steps"]
+    assert not report["ready"] and report["ready_after_seconds"] is None
+
+
+def test_a_failure_does_not_stick_once_a_retry_succeeds():
+    profile = StartupProfile()
+    profile.mark_failed("Warm-up failed: timeout")
+    assert not profile.ready and profile.report()["error"] == "Warm-up failed: timeout"
+
+    profile.mark_ready()
+    report = profile.report()
+    assert report["ready"] and report["error"] is None and report["failures"] == 1
+
+
+INDEXED = ("analysis_cache", "batch_jobs", "analysis_writer", "analytics", "status_checks")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    async def answered(*args):
+        return None
+
+    monkeypatch.setattr(server_module, "startup_profile", StartupProfile())
+    # A fresh index, as its catch-up task belongs to the event loop of the test that starts it
+    monkeypatch.setattr(server_module, "candidate_index", CandidateIndex())
+    monkeypatch.setattr(server_module.candidate_index, "rebuild", answered)
+    for component in INDEXED:
+        monkeypatch.setattr(getattr(server_module, component), "ensure_indexes", answered)
+    monkeypatch.setattr(server_module, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(server_module, "WARMUP_RETRY_BASE_DELAY", 0.001)
+    monkeypatch.setattr(server_module, "WARMUP_RETRY_MAX_DELAY", 0.01)
+    return server_module
+
+
+def test_warm_up_is_retried_until_the_worker_is_ready(server, monkeypatch):
+    attempts = []
+    readiness = []
+    client = TestClient(server.app)
+
+    async def warm_up():
+        attempts.append(1)
+        readiness.append(client.get("/api/health/ready").status_code)
+        if len(attempts) < 3:
+            raise ConnectionError("pdf pool not ready")
+
+    monkeypatch.setattr(server, "warm_up", warm_up)
+    asyncio.run(server.become_ready())
+
+    assert len(attempts) == 3 and readiness == [503, 503, 503]
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json()["failures"] == 2 and response.json()["error"] is None
+
+
+def test_liveness_answers_while_mongo_work_waits(server, monkeypatch):
+    async def unreachable(*args):
+        await asyncio.Event().wait()
+
+    async def started():
+        return None
+
+    for component in INDEXED:
+        monkeypatch.setattr(getattr(server, component), "ensure_indexes", unreachable)
+    monkeypatch.setattr(server.candidate_index, "rebuild", unreachable)
+    # Started in the lifespan but already off the startup path, see their own tests
+    for component in (server.analysis_writer, server.analytics, server.batch_jobs):
+        monkeypatch.setattr(component, "start", started)
+
+    with TestClient(server.app) as client:
+        assert client.get("/api/health/live").status_code == 200
+        response = client.get("/api/health/ready")
+        assert response.status_code == 503 and "catalog" in response.json()["steps"]
@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from status_checks import CursorError, StatusCheckStore, decode_cursor, encode_cursor
+
+START = datetime(2025, 1, 1)
+
+
+def seed(collection, count):
+    # Pairs share a timestamp, so the id tie-break matters
+    documents = [
+        {"id": f"check-{n:03d}", "client_name": f"client {n}", "timestamp": START + timedelta(seconds=n // 2)}
+        for n in range(count)
+    ]
+    asyncio.run(collection.insert_many([dict(document) for document in documents]))
+    return [document["id"] for document in documents]
+
+
+def test_cursor_round_trip_and_rejection():
+    cursor = encode_cursor({"timestamp": START, "id": "check-001"})
+    assert decode_cursor(cursor) == (START, "check-001")
+    for bad in ("not-a-cursor", "e30", ""):
+        with pytest.raises(CursorError):
+            decode_cursor(bad)
+
+
+def test_pages_walk_every_document_once_in_order(mongo_db):
+    ids = seed(mongo_db.status_checks, 25)
+    store = StatusCheckStore(mongo_db.status_checks)
+
+    async def walk():
+        seen, cursor, pages = [], None, 0
+        while True:
+            documents, cursor = await store.page(10, cursor)
+            seen.extend(document["id"] for document in documents)
+            pages += 1
+            if cursor is None:
+                return seen, pages
+
+    seen, pages = asyncio.run(walk())
+    assert seen == ids and pages == 3
+
+
+def test_page_projects_out_mongo_ids_and_ends_without_cursor(mongo_db):
+    seed(mongo_db.status_checks, 3)
+    documents, cursor = asyncio.run(StatusCheckStore(mongo_db.status_checks).page(3))
+    assert cursor is None
+    assert set(documents[0]) == {"id", "client_name", "timestamp"}
+
+
+def test_stream_resumes_after_a_cursor(mongo_db):
+    ids = seed(mongo_db.status_checks, 8)
+    store = StatusCheckStore(mongo_db.status_checks)
+
+    async def run():
+        _, cursor = await store.page(3)
+        return [document["id"] async for document in store.stream(cursor, limit=4)]
+
+    assert asyncio.run(run()) == ids[3:7]
+
+
+def test_unpaginated_request_still_returns_up_to_1000_documents(mongo_db, monkeypatch):
+    ids = seed(mongo_db.status_checks, 1001)
+    monkeypatch.setattr(server, "status_checks", StatusCheckStore(mongo_db.status_checks))
+    # No lifespan: the endpoint needs only the store
+    response = TestClient(server.app).get("/api/status")
+    assert response.status_code == 200
+    assert [document["id"] for document in response.json()] == ids[:1000]
+    assert "X-Next-Cursor" in response.headers
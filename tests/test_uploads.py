@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import BodySizeLimitMiddleware, UploadTooLarge, spool_upload
+
+PDF = b"%PDF-1.4\n" + b"x" * 200_000
+
+
+def spool(data, max_bytes, spool_dir):
+    async def run():
+        async with spool_upload(UploadFile(io.BytesIO(data), filename="resume.pdf"), max_bytes, spool_dir) as upload:
+            with open(upload.path, "rb") as f:
+                return upload, f.read()
+    return asyncio.run(run())
+
+
+def test_spools_to_disk_and_removes_the_file(tmp_path):
+    upload, stored = spool(PDF, len(PDF), str(tmp_path))
+    assert stored == PDF
+    assert upload.size == len(PDF)
+    assert upload.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert upload.filename == "resume.pdf"
+    assert not os.path.exists(upload.path)
+
+
+def test_rejects_oversized_uploads(tmp_path):
+    with pytest.raises(UploadTooLarge) as excinfo:
+        spool(PDF, len(PDF) - 1, str(tmp_path))
+    assert excinfo.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_rejects_non_pdf(tmp_path):
+    with pytest.raises(HTTPException) as excinfo:
+        spool(b"GIF89a" + b"x" * 2000, 10_000, str(tmp_path))
+    assert excinfo.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+def test_magic_may_follow_leading_bytes(tmp_path):
+    upload, _ = spool(b"\n" * 100 + PDF, 1_000_000, str(tmp_path))
+    assert upload.size == 100 + len(PDF)
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.post("/small")
+    @app.post("/batch/upload")
+    async def read_body(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=1000, path_limits={"/batch": 5000})
+    return app
+
+
+def test_middleware_enforces_path_limits():
+    client = TestClient(make_app())
+    assert client.post("/small", content=b"x" * 1000).json() == {"size": 1000}
+    assert client.post("/small", content=b"x" * 1001).status_code == 413
+    assert client.post("/batch/upload", content=b"x" * 5000).json() == {"size": 5000}
+    assert client.post("/batch/upload", content=b"x" * 5001).status_code == 413
+
+
+def test_middleware_counts_streamed_bodies():
+    def chunks():
+        for _ in range(3):
+            yield b"x" * 600
+
+    # No Content-Length: the limit is enforced while the body streams in
+    assert TestClient(make_app()).post("/small", content=chunks()).status_code == 413
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from bson import ObjectId, json_util
+
+from write_behind import WriteBehindBuffer
+
+
+def buffer(collection, spill_path, **options):
+    return WriteBehindBuffer(collection, spill_path, **{"flush_interval": 0.01, "retry_delay": 0.001, **options})
+
+
+def write_spill(path, documents):
+    path.write_text("".join(json_util.dumps(document) + "\n" for document in documents))
+
+
+def test_put_is_readable_before_and_after_the_flush(mongo_db, tmp_path):
+    writer = buffer(mongo_db.analyses, tmp_path / "spill.jsonl")
+
+    async def run():
+        await writer.start()
+        document_id = await writer.put({"filename": "cv.pdf"})
+        queued = writer.get(document_id)
+        await writer.stop()
+        return document_id, queued, await mongo_db.analyses.find_one({"_id": document_id})
+
+    document_id, queued, stored = asyncio.run(run())
+    assert queued["filename"] == stored["filename"] == "cv.pdf"
+    assert writer.get(document_id) is None
+    assert writer.stats()["written"] == 1
+
+
+def test_failed_batches_spill_and_replay_on_next_start(mongo_db, tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+
+    class Down:
+        name = "analyses"
+
+        async def insert_many(self, documents, ordered):
+            raise ConnectionError("mongo down")
+
+    async def run():
+        failing = buffer(Down(), spill_path, max_retries=1)
+        await failing.start()
+        await failing.put({"n": 1})
+        await failing.stop()
+        assert failing.spilled == 1 and spill_path.exists()
+
+        recovered = buffer(mongo_db.analyses, spill_path)
+        await recovered.start()
+        await recovered._replayer
+        await recovered.stop()
+        return recovered.replayed, await mongo_db.analyses.count_documents({})
+
+    assert asyncio.run(run()) == (1, 1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_start_does_not_wait_for_the_replay(mongo_db, tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    write_spill(spill_path, [{"_id": ObjectId(), "n": 1}])
+
+    class Slow:
+        name = "analyses"
+
+        async def insert_many(self, documents, ordered):
+            await asyncio.sleep(10)
+
+    async def run():
+        writer = buffer(Slow(), spill_path)
+        started = time.perf_counter()
+        await writer.start()
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.05)
+        await writer.stop()
+        return elapsed
+
+    assert asyncio.run(run()) < 1
+    # The interrupted replay leaves its claimed file to be picked up later
+    assert len(list(tmp_path.glob("spill.jsonl.claimed-*"))) == 1
+
+
+def test_concurrent_replays_insert_each_file_once(mongo_db, tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    documents = [{"_id": ObjectId(), "n": n} for n in range(50)]
+    write_spill(spill_path, documents[:25])
+    write_spill(tmp_path / "spill.jsonl.replay-1", documents[25:])
+    # Two workers sharing the spill directory, each with its own in-process lock
+    workers = [buffer(mongo_db.analyses, spill_path, max_batch=5) for _ in range(2)]
+
+    async def run():
+        await asyncio.gather(*(worker.replay_spill() for worker in workers))
+        return await mongo_db.analyses.count_documents({})
+
+    assert asyncio.run(run()) == 50
+    assert sum(worker.replayed for worker in workers) == 50
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_claims_left_by_exited_workers_are_replayed(mongo_db, tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    # No process has this pid, like a worker that died mid-replay
+    write_spill(tmp_path / "spill.jsonl.claimed-99999999-1", [{"_id": ObjectId(), "n": 1}])
+    writer = buffer(mongo_db.analyses, spill_path)
+
+    asyncio.run(writer.replay_spill())
+    assert writer.replayed == 1
+    assert list(tmp_path.iterdir()) == []